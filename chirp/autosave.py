@@ -0,0 +1,253 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Logs of unsaved changes to radio images, for recovery after a crash
+
+An AutosaveLog is a file with a JSON header line naming the radio model
+and the image file it was opened from, followed by records of the bytes
+of the memory map that have changed since, each as a big-endian offset
+and length and then the data. Only the changed bytes are appended each
+time, and the log is rewritten with one record per changed run when the
+records of bytes that were changed again take up more room than the
+changes themselves. An image that has no file yet (because it was just
+downloaded) is logged in full first.
+
+A log is removed when its image is saved or closed, so any log left
+behind belongs to a session that did not end normally, and recover()
+can rebuild the radio from it.
+"""
+
+import errno
+import hashlib
+import json
+import logging
+import os
+import struct
+
+from chirp import directory, memmap
+
+LOG = logging.getLogger(__name__)
+
+VERSION = 1
+RECORD = struct.Struct(">II")
+
+# Don't bother compacting a log with less than this many extra bytes
+COMPACT_SLACK = 4096
+
+# From the Windows API, for asking whether a process is still running
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_ERROR_ACCESS_DENIED = 5
+_STILL_ACTIVE = 259
+
+
+def file_hash(path):
+    """Return the hex SHA1 of the contents of the file at @path"""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _pid_running(pid):
+    """Return True if the process @pid is alive"""
+    if os.name == "nt":
+        return _pid_running_windows(pid)
+    try:
+        os.kill(pid, 0)
+    except OSError, e:
+        # EPERM means it is there, but run by someone else
+        return e.errno == errno.EPERM
+    return True
+
+
+def _pid_running_windows(pid):
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION,
+                                  False, pid)
+    if not handle:
+        return kernel32.GetLastError() == _ERROR_ACCESS_DENIED
+    try:
+        code = ctypes.c_ulong()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+            return True
+        return code.value == _STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+class AutosaveLog(object):
+    """Logs the changes to @radio's memory map at @path. @base is the
+    image file the radio was loaded from and has not changed since, or
+    None to log the whole image first. @filename is what the image is
+    called, to show when it is recovered."""
+
+    def __init__(self, path, radio, base=None, filename=None):
+        self.path = path
+        self._radio = radio
+        self._mmap = radio.get_mmap()
+        self._filename = filename or base
+        self.reset(base)
+
+    def _header(self, base):
+        header = {
+            "version": VERSION,
+            "radio": directory.get_driver(self._radio.__class__),
+            "filename": self._filename,
+            "base": base and os.path.abspath(base),
+            "base_hash": base and file_hash(base),
+            "size": len(self._mmap),
+            "pid": os.getpid(),
+            }
+        return json.dumps(header) + "\n"
+
+    def _write_records(self, f, runs):
+        for pos, length in runs:
+            f.write(RECORD.pack(pos, length))
+            f.write(self._mmap.get(pos, length))
+            self._written += RECORD.size + length
+        f.flush()
+        os.fsync(f.fileno())
+
+    def reset(self, base):
+        """Start over from @base, such as after the image was saved
+        there"""
+        self._header_data = self._header(base)
+        self._changed = set()
+        self._written = 0
+        runs = []
+        if not base:
+            runs = [(0, len(self._mmap))]
+            self._changed.update(range(len(self._mmap)))
+        with open(self.path, "wb") as f:
+            f.write(self._header_data)
+            self._write_records(f, runs)
+
+    def _runs(self, positions):
+        runs = []
+        for pos in sorted(positions):
+            if runs and pos == runs[-1][0] + runs[-1][1]:
+                runs[-1][1] += 1
+            else:
+                runs.append([pos, 1])
+        return runs
+
+    def write(self, ranges):
+        """Append the current contents of each (pos, length) in @ranges"""
+        positions = set()
+        for pos, length in ranges:
+            positions.update(range(pos, pos + length))
+        if not positions:
+            return
+        self._changed.update(positions)
+
+        with open(self.path, "ab") as f:
+            self._write_records(f, self._runs(positions))
+
+        if self._written - len(self._changed) > max(len(self._changed),
+                                                    COMPACT_SLACK):
+            self.compact()
+
+    def update(self, journal):
+        """Log the changes @journal has seen since the last update"""
+        self.write([(pos, length) for mmap, pos, length
+                    in journal.take_dirty() if mmap is self._mmap])
+
+    def compact(self):
+        """Rewrite the log with one record for each run of changed
+        bytes"""
+        LOG.debug("Compacting %s (%i bytes for %i changed)" %
+                  (self.path, self._written, len(self._changed)))
+        self._written = 0
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._header_data)
+            self._write_records(f, self._runs(self._changed))
+        if os.name != "posix":
+            # Windows won't rename over an existing file
+            os.remove(self.path)
+        os.rename(tmp, self.path)
+
+    def remove(self):
+        """Remove the log, once the changes are saved or discarded"""
+        try:
+            os.remove(self.path)
+        except OSError, e:
+            LOG.warning("Unable to remove %s: %s" % (self.path, e))
+
+
+def read_log(path):
+    """Return the header of the log at @path and a list of its (pos,
+    data) records. A record cut short by a crash is ignored."""
+    with open(path, "rb") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != VERSION:
+            raise ValueError("Unsupported autosave version %s" %
+                             header.get("version"))
+        # Paths were written as UTF-8, and are wanted back as bytes
+        for key, value in header.items():
+            if isinstance(value, unicode):
+                header[key] = value.encode("utf-8")
+        records = []
+        while True:
+            data = f.read(RECORD.size)
+            if len(data) < RECORD.size:
+                break
+            pos, length = RECORD.unpack(data)
+            data = f.read(length)
+            if len(data) < length:
+                break
+            records.append((pos, data))
+    return header, records
+
+
+def recover(path):
+    """Return the radio logged at @path with its logged changes, and the
+    log's header"""
+    header, records = read_log(path)
+    rclass = directory.get_radio(header["radio"])
+    if header["base"]:
+        if file_hash(header["base"]) != header["base_hash"]:
+            raise ValueError("%s has changed since it was opened" %
+                             header["base"])
+        radio = rclass(header["base"])
+        mmap = radio.get_mmap()
+    else:
+        mmap = memmap.MemoryMap("\x00" * header["size"])
+    for pos, data in records:
+        mmap.set(pos, data)
+    if header["base"]:
+        radio.process_mmap()
+    else:
+        radio = rclass(mmap)
+    return radio, header
+
+
+def find_logs(dirname):
+    """Return the paths of the logs in @dirname left behind by sessions
+    that are not running any more"""
+    paths = []
+    for name in sorted(os.listdir(dirname)):
+        if not name.endswith(".log"):
+            continue
+        path = os.path.join(dirname, name)
+        try:
+            header, records = read_log(path)
+        except Exception, e:
+            LOG.warning("Ignoring autosave log %s: %s" % (path, e))
+            continue
+        if header.get("pid") and _pid_running(header["pid"]):
+            continue
+        paths.append(path)
+    return paths
@@ -13,6 +13,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import bisect
+
 from chirp import chirp_common
 
 
@@ -83,3 +85,38 @@ class Band(object):
 
         return "%s-%s %s %s %s" % (
             self.limits[0], self.limits[1], self.name, self.duplex, desc)
+
+
+class BandIndex(object):
+    """An index of (possibly nested or overlapping) bands for finding the
+    ones that contain a frequency with a binary search"""
+
+    def __init__(self, bands):
+        self._edges = sorted(set([band.limits[0] for band in bands] +
+                                 [band.limits[1] for band in bands]))
+
+        # The matches at each edge, and in the gap below each edge (with
+        # one more gap above the last edge)
+        self._at = []
+        self._below = [[]]
+        for i, edge in enumerate(self._edges):
+            self._at.append(self._sorted(
+                [band for band in bands
+                 if band.limits[0] <= edge <= band.limits[1]]))
+            if i + 1 < len(self._edges):
+                self._below.append(self._sorted(
+                    [band for band in bands
+                     if band.limits[0] <= edge and
+                     band.limits[1] >= self._edges[i + 1]]))
+        self._below.append([])
+
+    @staticmethod
+    def _sorted(bands):
+        return sorted(bands, key=lambda x: x.width(), reverse=True)
+
+    def lookup(self, freq):
+        """Return the bands that contain @freq, widest first"""
+        i = bisect.bisect_left(self._edges, freq)
+        if i < len(self._edges) and self._edges[i] == freq:
+            return self._at[i]
+        return self._below[i]
@@ -0,0 +1,289 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Scripted memory edits against a single loaded radio
+
+A batch script has one command per line. Blank lines and anything after
+a '#' are ignored, and arguments are split like a shell would:
+
+  set-mem 10 name=SIMPLEX freq=146.520 tmode=Tone rtone=100.0
+  copy-mem 10 11
+  clear-mem 12 20-29
+  import-csv repeaters.csv 1-50 100
+
+Memory numbers may be a single location, a range like 20-29, or one of
+the radio's special channel names.
+"""
+
+import json
+import logging
+import shlex
+
+from chirp import chirp_common, errors, import_logic
+from chirp.drivers import generic_csv
+
+LOG = logging.getLogger(__name__)
+
+
+class BatchError(errors.RadioError):
+    """An error in a batch command"""
+    pass
+
+
+def _parse_bool(value):
+    if value.lower() in ["1", "true", "yes", "on"]:
+        return True
+    elif value.lower() in ["0", "false", "no", "off"]:
+        return False
+    raise ValueError("Invalid boolean `%s'" % value)
+
+
+# Parsers for the memory attributes that set-mem understands. Power is
+# matched by name against the radio's power levels instead.
+MEM_ATTRS = {
+    "freq":          chirp_common.parse_freq,
+    "offset":        chirp_common.parse_freq,
+    "rtone":         float,
+    "ctone":         float,
+    "dtcs":          int,
+    "rx_dtcs":       int,
+    "tuning_step":   float,
+    "empty":         _parse_bool,
+    "name":          str,
+    "duplex":        str,
+    "tmode":         str,
+    "cross_mode":    str,
+    "dtcs_polarity": str,
+    "mode":          str,
+    "skip":          str,
+    "comment":       str,
+    "power":         None,
+}
+
+# Attributes included in the JSON output of a memory
+JSON_ATTRS = ["number", "extd_number", "name", "freq", "duplex", "offset",
+              "tmode", "rtone", "ctone", "dtcs", "rx_dtcs", "dtcs_polarity",
+              "cross_mode", "mode", "tuning_step", "skip", "power",
+              "comment", "empty"]
+
+
+def memory_to_dict(mem):
+    """Return a dict of the JSON-safe attributes of @mem"""
+    values = {}
+    for attr in JSON_ATTRS:
+        value = getattr(mem, attr)
+        if attr == "power" and value is not None:
+            value = str(value)
+        values[attr] = value
+    return values
+
+
+def write_json(stream, mems):
+    """Write the memories from the iterable @mems to @stream as a JSON
+    list, one memory per line as they are produced"""
+    stream.write("[")
+    first = True
+    for mem in mems:
+        if not first:
+            stream.write(",")
+        first = False
+        stream.write("\n  %s" % json.dumps(memory_to_dict(mem),
+                                           sort_keys=True))
+    stream.write("\n]\n")
+
+
+class BatchRunner(object):
+    """Apply batch commands to @radio"""
+
+    def __init__(self, radio):
+        self._radio = radio
+        self._rf = radio.get_features()
+        self._commands = {
+            "set-mem": self.set_mem,
+            "copy-mem": self.copy_mem,
+            "clear-mem": self.clear_mem,
+            "import-csv": self.import_csv,
+        }
+
+    def _check_number(self, number):
+        start, end = self._rf.memory_bounds
+        if not self._rf.has_infinite_number and \
+                not (start <= number <= end):
+            raise BatchError("Memory number must be between %i and %i "
+                             "(got %i)" % (start, end, number))
+        return number
+
+    def _parse_number(self, value):
+        try:
+            number = int(value)
+        except ValueError:
+            if value in self._rf.valid_special_chans:
+                return value
+            raise BatchError("Invalid memory `%s'" % value)
+        return self._check_number(number)
+
+    def _parse_numbers(self, value):
+        if "-" in value[1:]:
+            first, last = value.split("-", 1)
+            first = self._parse_number(first)
+            last = self._parse_number(last)
+            if not isinstance(first, int) or not isinstance(last, int) or \
+                    last < first:
+                raise BatchError("Invalid memory range `%s'" % value)
+            return range(first, last + 1)
+        return [self._parse_number(value)]
+
+    def _get_memory(self, number):
+        try:
+            return self._radio.get_memory(number)
+        except errors.InvalidMemoryLocation, e:
+            raise BatchError(str(e))
+
+    def _set_memory(self, mem):
+        msgs = self._radio.validate_memory(mem)
+        errs = [x for x in msgs if isinstance(x, chirp_common.ValidationError)]
+        if errs:
+            raise BatchError("Memory %s is not valid: %s" %
+                             (mem.number, ", ".join(errs)))
+        for msg in msgs:
+            LOG.warn("Memory %s: %s" % (mem.number, msg))
+        self._radio.set_memory(mem)
+
+    def set_mem(self, args):
+        """set-mem NUMBER ATTR=VALUE..."""
+        if len(args) < 2:
+            raise BatchError("Usage: %s" % self.set_mem.__doc__)
+
+        values = []
+        for arg in args[1:]:
+            if "=" not in arg:
+                raise BatchError("Expected ATTR=VALUE, got `%s'" % arg)
+            attr, value = arg.split("=", 1)
+            if attr not in MEM_ATTRS:
+                raise BatchError("Unknown memory attribute `%s'" % attr)
+            if attr == "power":
+                levels = dict((str(x), x) for x in self._rf.valid_power_levels)
+                if value not in levels:
+                    raise BatchError("Invalid power level `%s'" % value)
+                value = levels[value]
+            else:
+                try:
+                    value = MEM_ATTRS[attr](value)
+                except ValueError:
+                    raise BatchError("Invalid value for %s: `%s'" %
+                                     (attr, value))
+            values.append((attr, value))
+
+        for number in self._parse_numbers(args[0]):
+            mem = self._get_memory(number)
+            if mem.empty:
+                LOG.info("creating new memory (#%s)" % number)
+                mem = chirp_common.Memory()
+                mem.number = number
+            try:
+                for attr, value in values:
+                    setattr(mem, attr, value)
+            except (ValueError, errors.InvalidValueError,
+                    chirp_common.ImmutableValueError), e:
+                raise BatchError(str(e))
+            self._set_memory(mem)
+
+    def copy_mem(self, args):
+        """copy-mem SOURCE DEST"""
+        if len(args) != 2:
+            raise BatchError("Usage: %s" % self.copy_mem.__doc__)
+        src = self._parse_number(args[0])
+        dst = self._parse_number(args[1])
+        mem = self._get_memory(src).dupe()
+        LOG.info("copying memory %s to %s" % (src, dst))
+        mem.number = dst
+        mem.immutable = []
+        self._set_memory(mem)
+
+    def clear_mem(self, args):
+        """clear-mem NUMBER..."""
+        if not args:
+            raise BatchError("Usage: %s" % self.clear_mem.__doc__)
+        for arg in args:
+            for number in self._parse_numbers(arg):
+                self._radio.erase_memory(number)
+
+    def import_csv(self, args):
+        """import-csv FILE [FIRST-LAST] [DEST]"""
+        if not 1 <= len(args) <= 3:
+            raise BatchError("Usage: %s" % self.import_csv.__doc__)
+
+        first = last = dest = None
+        if len(args) > 1:
+            try:
+                if "-" in args[1]:
+                    first, last = [int(x) for x in args[1].split("-", 1)]
+                else:
+                    first = last = int(args[1])
+            except ValueError:
+                raise BatchError("Invalid range `%s'" % args[1])
+        if len(args) > 2:
+            dest = self._parse_number(args[2])
+            if not isinstance(dest, int):
+                raise BatchError("Invalid destination `%s'" % args[2])
+
+        src_radio = generic_csv.CSVRadio(None)
+        src_rf = src_radio.get_features()
+        try:
+            for mem in src_radio.iter_memories(args[0]):
+                if first is not None and not first <= mem.number <= last:
+                    continue
+                number = mem.number
+                if dest is not None:
+                    number = dest + number - first
+                self._check_number(number)
+                try:
+                    dst_mem = import_logic.import_mem(self._radio, src_rf,
+                                                      mem,
+                                                      {"number": number})
+                except import_logic.ImportError, e:
+                    raise BatchError("Memory %i: %s" % (mem.number, e))
+                self._radio.set_memory(dst_mem)
+        except IOError, e:
+            raise BatchError("Unable to read %s: %s" % (args[0], e))
+
+    def run_line(self, line):
+        """Run the batch command in @line, returning False if it was
+        blank or only a comment"""
+        try:
+            args = shlex.split(line, comments=True)
+        except ValueError, e:
+            raise BatchError(str(e))
+        if not args:
+            return False
+        try:
+            command = self._commands[args[0]]
+        except KeyError:
+            raise BatchError("Unknown command `%s'" % args[0])
+        command(args[1:])
+        return True
+
+    def run(self, lines):
+        """Run each of the batch commands in @lines and return the number
+        of commands run. Stops at the first error with a BatchError naming
+        the line that caused it."""
+        count = 0
+        for lineno, line in enumerate(lines):
+            try:
+                if self.run_line(line):
+                    count += 1
+            except BatchError, e:
+                raise BatchError("Line %i: %s" % (lineno + 1, e))
+        return count
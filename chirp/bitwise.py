@@ -61,7 +61,7 @@ import struct
 import os
 import logging
 
-from chirp import bitwise_grammar
+from chirp import bitwise_grammar, stats
 from chirp.memmap import MemoryMap
 
 LOG = logging.getLogger(__name__)
@@ -175,6 +175,44 @@ class DataElement:
                                          self._offset)
 
 
+class arraySlice(list):
+    """A slice of an arrayDataElement, as returned by array[start:stop].
+    It is a list of the elements in the slice, which can also be moved
+    as raw bytes to another place in the array with move_to()"""
+
+    def __init__(self, array, start, stop, step):
+        list.__init__(self, array.get_value()[start:stop:step])
+        self._array = array
+        self._start = start
+        self._stop = max(start, stop)
+        self._step = step
+
+    def move_to(self, index, *paired):
+        """Copy the raw bytes of the elements in this slice so that the
+        first one lands at @index of the array, like memmove(). The
+        elements at the same indexes of each array in @paired (such as
+        the names that go with a memory array) are moved along with
+        them. Elements that are moved away from are left unchanged,
+        unless the destination overlaps them."""
+        if self._step != 1:
+            raise ValueError("Only contiguous slices can be moved")
+        count = self._stop - self._start
+        for array in (self._array,) + paired:
+            if index < 0 or index + count > len(array) or \
+                    self._stop > len(array):
+                raise IndexError("Unable to move elements %i-%i to %i "
+                                 "in an array of %i" % (self._start,
+                                                        self._stop - 1,
+                                                        index, len(array)))
+        if not count or index == self._start:
+            return
+
+        for array in (self._array,) + paired:
+            data, src, length = array._span(self._start, self._stop)
+            dst = array._span(index, index + count)[1]
+            data[dst] = data[src:src + length]
+
+
 class arrayDataElement(DataElement):
     def __repr__(self):
         if isinstance(self.__items[0], bcdDataElement):
@@ -205,11 +243,25 @@ class arrayDataElement(DataElement):
         self.__items[index].set_value(val)
 
     def __getitem__(self, index):
+        if isinstance(index, slice):
+            return arraySlice(self, *index.indices(len(self.__items)))
         return self.__items[index]
 
     def __len__(self):
         return len(self.__items)
 
+    def _span(self, start, stop):
+        """Return the data, byte offset and byte length of the elements
+        @start through @stop-1, which must be whole bytes laid out back
+        to back"""
+        items = self.__items[start:stop]
+        nbits = items[0].size()
+        first = items[0].get_offset()
+        if nbits % 8 or any(item.get_offset() != first + i * (nbits / 8)
+                            for i, item in enumerate(items)):
+            raise ValueError("Array elements are not contiguous bytes")
+        return items[0]._data, first, len(items) * (nbits / 8)
+
     def __str__(self):
         if isinstance(self.__items[0], charDataElement):
             return "".join([x.get_value() for x in self.__items])
@@ -681,6 +733,13 @@ class structDataElement(DataElement):
             self._generators[key] = value
             self._keys.append(key)
 
+    def _add_field(self, name, gen):
+        # Used by the Processor, where a repeated name (like "unknown")
+        # keeps its first field instead of writing to it
+        if name not in self._generators:
+            self._generators[name] = gen
+            self._keys.append(name)
+
     def __getattr__(self, name):
         try:
             return self._generators[name]
@@ -749,10 +808,31 @@ class Processor:
         self._offset = offset
         self._obj = None
         self._user_types = {}
+        self._ranges = []
+
+    def _reference(self, start, end):
+        if end <= start:
+            return
+        if self._ranges and self._ranges[-1][1] == start:
+            self._ranges[-1] = (self._ranges[-1][0], end)
+        else:
+            self._ranges.append((start, end))
+
+    def get_ranges(self):
+        """Return the sorted byte ranges that the parsed layout maps, as
+        (start, end) pairs with @end exclusive, merging any that overlap
+        or touch"""
+        merged = []
+        for start, end in sorted(self._ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            else:
+                merged.append((start, end))
+        return merged
 
     def do_symbol(self, symdef, gen):
         name = symdef[1]
-        self._generators[name] = gen
+        self._generators._add_field(name, gen)
 
     def do_bitfield(self, dtype, bitfield):
         bytes = self._types[dtype](self._data, 0).size() / 8
@@ -769,7 +849,8 @@ class Processor:
                 _shift = bitsleft
                 _subgen = self._types[dtype]
 
-            self._generators[name] = bitDE(self._data, self._offset)
+            self._generators._add_field(name,
+                                        bitDE(self._data, self._offset))
             bitsleft -= bits
 
         if bitsleft:
@@ -790,6 +871,7 @@ class Processor:
 
     def parse_defn(self, defn):
         dtype = defn[0]
+        start = self._offset
 
         if defn[1][0] == "bitfield":
             size = self.do_bitfield(dtype, defn[1][1])
@@ -816,9 +898,11 @@ class Processor:
                 res.append(gen)
 
             if count == 1:
-                self._generators[name] = res[0]
+                self._generators._add_field(name, res[0])
             else:
-                self._generators[name] = res
+                self._generators._add_field(name, res)
+
+        self._reference(start, self._offset)
 
     def parse_struct_decl(self, struct):
         block = struct[:-1]
@@ -844,9 +928,9 @@ class Processor:
             self._generators = tmp
 
         if count == 1:
-            self._generators[name] = result[0]
+            self._generators._add_field(name, result[0])
         else:
-            self._generators[name] = result
+            self._generators._add_field(name, result)
 
     def parse_struct_defn(self, struct):
         name = struct[0][1]
@@ -887,10 +971,74 @@ class Processor:
         return self._generators
 
 
+# Parsed layouts by (spec, offset), bound to no data, when enabled
+_LAYOUTS = None
+
+
+def enable_layout_cache():
+    """Keep each parsed layout, so that parsing the same spec again only
+    has to copy it onto the new data"""
+    global _LAYOUTS
+    if _LAYOUTS is None:
+        _LAYOUTS = {}
+
+
+def disable_layout_cache():
+    global _LAYOUTS
+    _LAYOUTS = None
+
+
+class _Empty:
+    pass
+
+
+def _rebind(element, data):
+    """Return a copy of the tree of DataElements at @element that reads
+    and writes @data instead"""
+    # The tree only depends on the spec, so a shallow copy of each
+    # element is all that is needed
+    new = _Empty()
+    new.__class__ = element.__class__
+    attrs = new.__dict__
+    attrs.update(element.__dict__)
+    if "_data" in attrs:
+        attrs["_data"] = data
+    items = attrs.get("_arrayDataElement__items")
+    if items is not None:
+        attrs["_arrayDataElement__items"] = [_rebind(item, data)
+                                             for item in items]
+    generators = attrs.get("_generators")
+    if generators is not None:
+        attrs["_generators"] = dict((name, _rebind(gen, data))
+                                    for name, gen in generators.iteritems())
+        attrs["_keys"] = list(attrs["_keys"])
+    return new
+
+
 def parse(spec, data, offset=0):
+    layouts = _LAYOUTS
+    if layouts is not None and (spec, offset) in layouts:
+        return _rebind(layouts[(spec, offset)], data)
+
+    with stats.timer("bitwise.parse"):
+        ast = bitwise_grammar.parse(spec)
+        p = Processor(data, offset)
+        tree = p.parse(ast)
+
+    if layouts is not None:
+        layouts[(spec, offset)] = _rebind(tree, None)
+    return tree
+
+
+def referenced_ranges(spec, offset=0):
+    """Return the byte ranges of an image that the layout in @spec maps,
+    following its #seekto and #seek directives, as a sorted list of
+    (start, end) pairs with @end exclusive. Nothing is read, so no image
+    is needed."""
     ast = bitwise_grammar.parse(spec)
-    p = Processor(data, offset)
-    return p.parse(ast)
+    p = Processor(None, offset)
+    p.parse(ast)
+    return p.get_ranges()
 
 if __name__ == "__main__":
     defn = """
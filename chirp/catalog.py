@@ -0,0 +1,280 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""A searchable index of the memories in a library of radio images
+
+A Catalog keeps the decoded memories of every image file under a
+directory in an SQLite database, so that questions like "which radios
+have 146.940 with tone 100.0" are a query instead of opening each image.
+Files are remembered by path, modification time and size, and their
+memories by a hash of the file contents, so a rescan only decodes the
+files that changed, and identical copies of an image are decoded once.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+
+from chirp import chirp_common, directory
+
+LOG = logging.getLogger(__name__)
+
+# The file types the GUI offers to open
+IMAGE_EXTENSIONS = (".img", ".csv", ".dat", ".eve", ".icf",
+                    ".vx5", ".vx6", ".vx7")
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_hash ON files (hash);
+CREATE TABLE IF NOT EXISTS images (
+    hash TEXT PRIMARY KEY,
+    vendor TEXT,
+    model TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS memories (
+    hash TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    name TEXT,
+    freq INTEGER NOT NULL,
+    duplex TEXT,
+    offset INTEGER,
+    tmode TEXT,
+    rtone INTEGER,
+    ctone INTEGER,
+    dtcs INTEGER,
+    mode TEXT,
+    comment TEXT
+);
+CREATE INDEX IF NOT EXISTS memories_hash ON memories (hash);
+CREATE INDEX IF NOT EXISTS memories_freq ON memories (freq);
+"""
+
+MEMORY_FIELDS = ["number", "name", "freq", "duplex", "offset", "tmode",
+                 "rtone", "ctone", "dtcs", "mode", "comment"]
+
+
+def _tenths(tone):
+    # Tones are stored in tenths of a Hz so they can be compared exactly
+    return int(round(tone * 10))
+
+
+def file_hash(path):
+    """Return the hex SHA1 of the contents of the file at @path"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), ""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CatalogHit(object):
+    """A memory found in the catalog: @memory is a chirp_common.Memory
+    from the image at @path for a @vendor @model radio"""
+
+    def __init__(self, path, vendor, model, memory):
+        self.path = path
+        self.vendor = vendor
+        self.model = model
+        self.memory = memory
+
+    def __str__(self):
+        return "%s (%s %s): %s" % (self.path, self.vendor, self.model,
+                                   self.memory)
+
+
+class ScanResult(object):
+    """How many files a Catalog.scan() decoded, found unchanged, could
+    not load and dropped because they were deleted"""
+
+    def __init__(self):
+        self.decoded = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.removed = 0
+
+    def __str__(self):
+        return ("%i decoded, %i unchanged, %i failed, %i removed" %
+                (self.decoded, self.unchanged, self.failed, self.removed))
+
+
+class Catalog(object):
+    """An index of radio images kept in the SQLite database at @path"""
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path)
+        # Memory names are byte strings in whatever the radio uses
+        self._db.text_factory = str
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            LOG.info("Creating catalog schema %i in %s (was %i)" %
+                     (SCHEMA_VERSION, path, version))
+            self._db.executescript("DROP TABLE IF EXISTS files;"
+                                   "DROP TABLE IF EXISTS images;"
+                                   "DROP TABLE IF EXISTS memories;")
+            self._db.execute("PRAGMA user_version = %i" % SCHEMA_VERSION)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _index_image(self, path, digest):
+        try:
+            radio = directory.get_radio_by_image(path)
+            lo, hi = radio.get_features().memory_bounds
+        except Exception, e:
+            LOG.warning("Unable to load %s: %s" % (path, e))
+            self._db.execute("INSERT INTO images VALUES (?, NULL, NULL, ?)",
+                             (digest, str(e)))
+            return False
+
+        rows = []
+        for number in range(lo, hi + 1):
+            try:
+                mem = radio.get_memory(number)
+            except Exception, e:
+                LOG.debug("Unable to get memory %i from %s: %s" %
+                          (number, path, e))
+                continue
+            if mem.empty:
+                continue
+            # Drivers sometimes leave bitwise values in memories
+            rows.append((digest, mem.number, str(mem.name), int(mem.freq),
+                         mem.duplex, int(mem.offset), mem.tmode,
+                         _tenths(mem.rtone), _tenths(mem.ctone),
+                         int(mem.dtcs), mem.mode, str(mem.comment)))
+        self._db.executemany(
+            "INSERT INTO memories VALUES (%s)" % ", ".join("?" * 12), rows)
+        self._db.execute("INSERT INTO images VALUES (?, ?, ?, NULL)",
+                         (digest, radio.VENDOR, radio.MODEL))
+        LOG.debug("Indexed %i memories from %s" % (len(rows), path))
+        return True
+
+    def _scan_file(self, path, result):
+        stat = os.stat(path)
+        known = self._db.execute(
+            "SELECT mtime, size FROM files WHERE path = ?",
+            (path,)).fetchone()
+        if known == (stat.st_mtime, stat.st_size):
+            result.unchanged += 1
+            return
+
+        digest = file_hash(path)
+        image = self._db.execute("SELECT error FROM images WHERE hash = ?",
+                                 (digest,)).fetchone()
+        if image is None:
+            if self._index_image(path, digest):
+                result.decoded += 1
+            else:
+                result.failed += 1
+        elif image[0] is not None:
+            result.failed += 1
+        else:
+            # Same contents as a file we already decoded
+            result.unchanged += 1
+        self._db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                         (path, stat.st_mtime, stat.st_size, digest))
+
+    def scan(self, root, status_fn=None):
+        """Index every image file under the directory @root, decoding
+        only the ones that are new or changed since the last scan, and
+        forget the ones that are gone. @status_fn is called with the path
+        of each file as it is scanned. Returns a ScanResult."""
+        root = os.path.abspath(root)
+        result = ScanResult()
+        seen = set()
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                ext = os.path.splitext(filename)[1].lower()
+                if ext not in IMAGE_EXTENSIONS:
+                    continue
+                path = os.path.join(dirpath, filename)
+                seen.add(path)
+                if status_fn:
+                    status_fn(path)
+                self._scan_file(path, result)
+
+        for path, in self._db.execute("SELECT path FROM files").fetchall():
+            if path.startswith(root + os.sep) and path not in seen:
+                self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+                result.removed += 1
+        for table in ("memories", "images"):
+            self._db.execute("DELETE FROM %s WHERE hash NOT IN "
+                             "(SELECT hash FROM files)" % table)
+        self._db.commit()
+
+        LOG.info("Scanned %s: %s" % (root, result))
+        return result
+
+    def search(self, freq=None, tone=None, name=None, mode=None):
+        """Return a CatalogHit for each memory matching all of the given
+        criteria: @freq is a frequency in Hz or a (low, high) range of
+        them, @tone a tone the memory transmits (Tone) or squelches on
+        (TSQL), @name part of the memory name in any case, and @mode a
+        mode like "FM"."""
+        clauses = []
+        params = []
+        if freq is not None:
+            if not isinstance(freq, tuple):
+                freq = (freq, freq)
+            clauses.append("m.freq BETWEEN ? AND ?")
+            params.extend(freq)
+        if tone is not None:
+            clauses.append("((m.tmode = 'Tone' AND m.rtone = ?) OR "
+                           "(m.tmode = 'TSQL' AND m.ctone = ?))")
+            params.extend([_tenths(tone)] * 2)
+        if name:
+            clauses.append("m.name LIKE ? ESCAPE '\\'")
+            params.append("%%%s%%" % name.replace("\\", "\\\\").replace(
+                "%", "\\%").replace("_", "\\_"))
+        if mode:
+            clauses.append("m.mode = ?")
+            params.append(mode)
+
+        query = ("SELECT f.path, i.vendor, i.model, %s FROM memories m "
+                 "JOIN images i ON i.hash = m.hash "
+                 "JOIN files f ON f.hash = m.hash" %
+                 ", ".join("m.%s" % field for field in MEMORY_FIELDS))
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY f.path, m.number"
+
+        hits = []
+        for row in self._db.execute(query, params):
+            path, vendor, model = row[:3]
+            mem = chirp_common.Memory()
+            for field, value in zip(MEMORY_FIELDS, row[3:]):
+                if field in ("rtone", "ctone"):
+                    value = value / 10.0
+                setattr(mem, field, value)
+            hits.append(CatalogHit(path, vendor, model, mem))
+        return hits
+
+    def get_failures(self):
+        """Return a list of (path, error) for the files that could not be
+        loaded"""
+        return self._db.execute(
+            "SELECT f.path, i.error FROM files f "
+            "JOIN images i ON i.hash = f.hash "
+            "WHERE i.error IS NOT NULL ORDER BY f.path").fetchall()
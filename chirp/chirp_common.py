@@ -14,11 +14,16 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import base64
+import collections
+import hashlib
 import json
 import logging
 import math
+import os
 import sys
-from chirp import errors, memmap, CHIRP_VERSION
+import threading
+from bisect import bisect_right
+from chirp import bitwise, errors, memmap, CHIRP_VERSION
 
 LOG = logging.getLogger(__name__)
 
@@ -237,62 +242,73 @@ class ImmutableValueError(ValueError):
     pass
 
 
-class Memory:
-    """Base class for a single radio memory"""
-    freq = 0
-    number = 0
-    extd_number = ""
-    name = ""
-    vfo = 0
-    rtone = 88.5
-    ctone = 88.5
-    dtcs = 23
-    rx_dtcs = 23
-    tmode = ""
-    cross_mode = "Tone->Tone"
-    dtcs_polarity = "NN"
-    skip = ""
-    power = None
-    duplex = ""
-    offset = 600000
-    mode = "FM"
-    tuning_step = 5.0
-
-    comment = ""
-
-    empty = False
-
-    immutable = []
-
-    # A RadioSettingGroup of additional settings supported by the radio,
-    # or an empty list if none
-    extra = []
+# Memory classes with the attribute names declared in __slots__ by each
+# class in their hierarchy, filled in as they are first used
+_MEMORY_SLOTS = {}
+
+
+def _memory_slots(cls):
+    try:
+        return _MEMORY_SLOTS[cls]
+    except KeyError:
+        pass
+
+    slots = []
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get("__slots__", ()):
+            if name not in slots and name != "__dict__":
+                slots.append(name)
+    _MEMORY_SLOTS[cls] = slots = (slots, frozenset(slots))
+    return slots
+
+
+class Memory(object):
+    """Base class for a single radio memory
+
+    The attributes of a memory are declared in __slots__, so subclasses
+    that add attributes should declare them there too.
+    """
+    # __dict__ is kept so that instances can still be patched (in tests)
+    __slots__ = ["freq", "number", "extd_number", "name", "vfo",
+                 "rtone", "ctone", "dtcs", "rx_dtcs", "tmode", "cross_mode",
+                 "dtcs_polarity", "skip", "power", "duplex", "offset", "mode",
+                 "tuning_step", "comment", "empty", "immutable", "extra",
+                 "__dict__"]
+
+    # Values for attributes that are not set by __init__()
+    _defaults = {
+        # A RadioSettingGroup of additional settings supported by the radio,
+        # or an empty list if none
+        "extra": [],
+    }
 
     def __init__(self, number=0, empty=False, name=""):
-        self.freq = 0
-        self.number = number
-        self.extd_number = ""
-        self.name = name
-        self.vfo = 0
-        self.rtone = 88.5
-        self.ctone = 88.5
-        self.dtcs = 23
-        self.rx_dtcs = 23
-        self.tmode = ""
-        self.cross_mode = "Tone->Tone"
-        self.dtcs_polarity = "NN"
-        self.skip = ""
-        self.power = None
-        self.duplex = ""
-        self.offset = 600000
-        self.mode = "FM"
-        self.tuning_step = 5.0
-
-        self.comment = ""
-
-        self.empty = empty
-
-        self.immutable = []
+        # Defaults are known to be valid, so skip __setattr__()
+        _set = object.__setattr__
+        _set(self, "freq", 0)
+        _set(self, "number", number)
+        _set(self, "extd_number", "")
+        _set(self, "name", name)
+        _set(self, "vfo", 0)
+        _set(self, "rtone", 88.5)
+        _set(self, "ctone", 88.5)
+        _set(self, "dtcs", 23)
+        _set(self, "rx_dtcs", 23)
+        _set(self, "tmode", "")
+        _set(self, "cross_mode", "Tone->Tone")
+        _set(self, "dtcs_polarity", "NN")
+        _set(self, "skip", "")
+        _set(self, "power", None)
+        _set(self, "duplex", "")
+        _set(self, "offset", 600000)
+        _set(self, "mode", "FM")
+        _set(self, "tuning_step", 5.0)
+
+        _set(self, "comment", "")
+
+        _set(self, "empty", empty)
+
+        _set(self, "immutable", [])
 
     _valid_map = {
         "rtone":          TONES + TONES_EXTRA,
@@ -309,21 +325,52 @@ class Memory:
         "dv_code":        [x for x in range(0, 100)],
     }
 
+    # The same, as sets for fast membership checks
+    _valid_sets = dict([(k, frozenset(v)) for k, v in _valid_map.items()])
+
+    def __getattr__(self, name):
+        # Only called for attributes that have not been set
+        try:
+            return self._defaults[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __getstate__(self):
+        """Return a dict of the attributes that have been set"""
+        state = dict(self.__dict__)
+        for name in _memory_slots(self.__class__)[0]:
+            try:
+                state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
     def __repr__(self):
         return "Memory[%i]" % self.number
 
     def dupe(self):
-        """Return a deep copy of @self"""
-        mem = self.__class__()
-        for k, v in self.__dict__.items():
-            mem.__dict__[k] = v
+        """Return a copy of @self"""
+        mem = self.__class__.__new__(self.__class__)
+        _get = object.__getattribute__
+        _set = object.__setattr__
+        for name in _memory_slots(self.__class__)[0]:
+            try:
+                _set(mem, name, _get(self, name))
+            except AttributeError:
+                pass
+        if self.__dict__:
+            mem.__dict__.update(self.__dict__)
 
         return mem
 
     def clone(self, source):
         """Absorb all of the properties of @source"""
-        for k, v in source.__dict__.items():
-            self.__dict__[k] = v
+        for k, v in source.__getstate__().items():
+            object.__setattr__(self, k, v)
 
     CSV_FORMAT = ["Location", "Name", "Frequency",
                   "Duplex", "Offset", "Tone",
@@ -333,18 +380,30 @@ class Memory:
                   "URCALL", "RPT1CALL", "RPT2CALL", "DVCODE"]
 
     def __setattr__(self, name, val):
-        if not hasattr(self, name):
+        if name not in _MEMORY_ATTRS and \
+                name not in _memory_slots(self.__class__)[1] and \
+                not hasattr(self, name):
             raise ValueError("No such attribute `%s'" % name)
 
         if name in self.immutable:
             raise ImmutableValueError("Field %s is not " % name +
                                       "mutable on this memory")
 
-        if name in self._valid_map and val not in self._valid_map[name]:
-            raise ValueError("`%s' is not in valid list: %s" %
-                             (val, self._valid_map[name]))
-
-        self.__dict__[name] = val
+        valid = self._valid_sets.get(name)
+        if valid is not None:
+            try:
+                ok = val in valid
+            except TypeError:
+                ok = False
+            if not ok:
+                # Unhashable, or added to one of the lists (like MODES) by
+                # a driver after the sets were made, so check the list too
+                ok = val in self._valid_map[name]
+            if not ok:
+                raise ValueError("`%s' is not in valid list: %s" %
+                                 (val, self._valid_map[name]))
+
+        object.__setattr__(self, name, val)
 
     def format_freq(self):
         """Return a properly-formatted string of this memory's frequency"""
@@ -512,12 +571,20 @@ class Memory:
         return True
 
 
+# The attributes of every Memory, checked before looking for any added by
+# a subclass
+_MEMORY_ATTRS = frozenset(_memory_slots(Memory)[0])
+
+
 class DVMemory(Memory):
     """A Memory with D-STAR attributes"""
-    dv_urcall = "CQCQCQ"
-    dv_rpt1call = ""
-    dv_rpt2call = ""
-    dv_code = 0
+    __slots__ = ["dv_urcall", "dv_rpt1call", "dv_rpt2call", "dv_code"]
+
+    _defaults = dict(Memory._defaults,
+                     dv_urcall="CQCQCQ",
+                     dv_rpt1call="",
+                     dv_rpt2call="",
+                     dv_code=0)
 
     def __str__(self):
         string = Memory.__str__(self)
@@ -623,6 +690,29 @@ class MappingModel(object):
         """Return a list of mappings that @memory is in"""
         raise NotImplementedError()
 
+    def get_all_memory_mappings(self, lo, hi):
+        """Return the mappings of every memory from @lo to @hi as a dict
+        of {number: (mappings, indexes)}, leaving out memories that are
+        in no mapping. @indexes is the memory's index in each of
+        @mappings for models with MappingModelIndexInterface, otherwise
+        empty. This default asks about each memory in turn; models
+        should override it to read the membership of all of them at
+        once."""
+        table = {}
+        for number in range(lo, hi + 1):
+            memory = self._radio.get_memory(number)
+            if memory.empty:
+                continue
+            mappings = self.get_memory_mappings(memory)
+            if not mappings:
+                continue
+            indexes = []
+            if isinstance(self, MappingModelIndexInterface):
+                indexes = [self.get_memory_index(memory, mapping)
+                           for mapping in mappings]
+            table[number] = (mappings, indexes)
+        return table
+
 
 class Bank(MemoryMapping):
     """Base class for a radio's Bank"""
@@ -714,6 +804,7 @@ class RadioFeatures:
         "has_nostep_tuning":    BOOLEAN,
         "has_comment":          BOOLEAN,
         "has_settings":         BOOLEAN,
+        "can_set_changed_only": BOOLEAN,
 
         # Attributes
         "valid_modes":          [],
@@ -746,6 +837,7 @@ class RadioFeatures:
             return
         elif name not in self._valid_map.keys():
             raise ValueError("No such attribute `%s'" % name)
+        self.__dict__["_validator"] = None
 
         if type(self._valid_map[name]) == tuple:
             # Tuple, cardinality must match
@@ -825,6 +917,9 @@ class RadioFeatures:
                   "with each memory")
         self.init("has_settings", False,
                   "Indicates that the radio supports general settings")
+        self.init("can_set_changed_only", False,
+                  "Indicates that set_settings() accepts changed_only=True " +
+                  "and then applies only the settings that have changed")
 
         self.init("valid_modes", list(MODES),
                   "Supported emission (or receive) modes")
@@ -882,129 +977,194 @@ class RadioFeatures:
     def validate_memory(self, mem):
         """Return a list of warnings and errors that will be encoundered
         if trying to set @mem on the current radio"""
+        return self._get_validator().validate(mem)
+
+    def validate_memories(self, mems):
+        """Validate each of @mems like validate_memory() and return a list
+        of the message lists, in the same order"""
+        validator = self._get_validator()
+        return [validator.validate(mem) for mem in mems]
+
+    def _get_validator(self):
+        # Compiled on first use and discarded whenever a feature is
+        # assigned. Drivers that modify a list in place must do so before
+        # validating anything.
+        if self.__dict__.get("_validator") is None:
+            self._validator = _MemoryValidator(self)
+        return self._validator
+
+
+class ValidationMessage(str):
+    """Base class for Validation Errors and Warnings"""
+    pass
+
+
+class ValidationWarning(ValidationMessage):
+    """A non-fatal warning during memory validation"""
+    pass
+
+
+class ValidationError(ValidationMessage):
+    """A fatal error during memory validation"""
+    pass
+
+
+class _MemoryValidator(object):
+    """The checks of RadioFeatures.validate_memory(), compiled once per
+    RadioFeatures into sets, a sorted band index and a character table"""
+
+    def __init__(self, rf):
+        def optset(values):
+            return values and frozenset(values) or None
+
+        if rf.has_infinite_number:
+            self.bounds = None
+        else:
+            self.bounds = rf.memory_bounds
+        self.special = frozenset(rf.valid_special_chans)
+        self.modes = optset(rf.valid_modes)
+        self.tmodes = optset(rf.valid_tmodes)
+        self.cross_modes = optset(rf.valid_cross_modes)
+        if rf.has_dtcs_polarity:
+            self.dtcs_pols = frozenset(rf.valid_dtcs_pols)
+        else:
+            self.dtcs_pols = None
+        self.duplexes = optset(rf.valid_duplexes)
+        if rf.has_nostep_tuning:
+            self.steps = None
+        else:
+            self.steps = optset(rf.valid_tuning_steps)
+        # Frequency -> required step message (or None), since the same
+        # frequencies come up again and again
+        self.step_msgs = {}
+
+        # PowerLevels compare by their dBm value
+        self.powers = optset([int(x) for x in rf.valid_power_levels])
+
+        # Overlapping and adjacent bands are merged so that a frequency is
+        # in range if it is below the end of the last band that starts at
+        # or below it
+        bands = []
+        for lo, hi in sorted(rf.valid_bands):
+            if bands and lo <= bands[-1][1]:
+                bands[-1][1] = max(bands[-1][1], hi)
+            else:
+                bands.append([lo, hi])
+        # An empty band first, which anything below the real ones lands in
+        bands.insert(0, [float("-inf"), float("-inf")])
+        self.band_starts = [lo for lo, hi in bands]
+        self.band_ends = [hi for lo, hi in bands]
+        self.check_bands = bool(rf.valid_bands)
+        self.check_tx = bool(rf.valid_bands and rf.valid_duplexes)
+
+        self.characters = rf.valid_characters
+        self.charset = frozenset(rf.valid_characters)
+
+    def step_msg(self, freq):
+        """Return the message for @freq needing an unsupported tuning
+        step, or None if it does not"""
+        try:
+            step = required_step(freq)
+            if step in self.steps:
+                msg = None
+            else:
+                msg = ValidationError("Frequency requires %.2fkHz step" %
+                                      step)
+        except errors.InvalidDataError, e:
+            msg = str(e)
+        self.step_msgs[freq] = msg
+        return msg
+
+    def validate(self, mem):
+        """Return the validation messages for @mem"""
         msgs = []
+        freq = mem.freq
+        duplex = mem.duplex
 
-        lo, hi = self.memory_bounds
-        if not self.has_infinite_number and \
-                (mem.number < lo or mem.number > hi) and \
-                mem.extd_number not in self.valid_special_chans:
+        if self.bounds is not None and \
+                not self.bounds[0] <= mem.number <= self.bounds[1] and \
+                mem.extd_number not in self.special:
             msg = ValidationWarning("Location %i is out of range" % mem.number)
             msgs.append(msg)
 
-        if (self.valid_modes and
-                mem.mode not in self.valid_modes and
-                mem.mode != "Auto"):
+        if self.modes and mem.mode not in self.modes and mem.mode != "Auto":
             msg = ValidationError("Mode %s not supported" % mem.mode)
             msgs.append(msg)
 
-        if self.valid_tmodes and mem.tmode not in self.valid_tmodes:
+        if self.tmodes and mem.tmode not in self.tmodes:
             msg = ValidationError("Tone mode %s not supported" % mem.tmode)
             msgs.append(msg)
-        else:
-            if mem.tmode == "Cross":
-                if self.valid_cross_modes and \
-                        mem.cross_mode not in self.valid_cross_modes:
-                    msg = ValidationError("Cross tone mode %s not supported" %
-                                          mem.cross_mode)
-                    msgs.append(msg)
-
-        if self.has_dtcs_polarity and \
-                mem.dtcs_polarity not in self.valid_dtcs_pols:
+        elif mem.tmode == "Cross" and self.cross_modes and \
+                mem.cross_mode not in self.cross_modes:
+            msg = ValidationError("Cross tone mode %s not supported" %
+                                  mem.cross_mode)
+            msgs.append(msg)
+
+        if self.dtcs_pols is not None and \
+                mem.dtcs_polarity not in self.dtcs_pols:
             msg = ValidationError("DTCS Polarity %s not supported" %
                                   mem.dtcs_polarity)
             msgs.append(msg)
 
-        if self.valid_dtcs_codes and \
-                mem.dtcs not in self.valid_dtcs_codes:
-            msg = ValidationError("DTCS Code %03i not supported" % mem.dtcs)
-        if self.valid_dtcs_codes and \
-                mem.rx_dtcs not in self.valid_dtcs_codes:
-            msg = ValidationError("DTCS Code %03i not supported" % mem.rx_dtcs)
+        if self.duplexes and duplex not in self.duplexes:
+            msg = ValidationError("Duplex %s not supported" % duplex)
+            msgs.append(msg)
 
-        if self.valid_duplexes and mem.duplex not in self.valid_duplexes:
-            msg = ValidationError("Duplex %s not supported" % mem.duplex)
+        if self.steps and mem.tuning_step not in self.steps:
+            msg = ValidationError("Tuning step %.2f not supported" %
+                                  mem.tuning_step)
             msgs.append(msg)
 
-        ts = mem.tuning_step
-        if self.valid_tuning_steps and ts not in self.valid_tuning_steps and \
-                not self.has_nostep_tuning:
-            msg = ValidationError("Tuning step %.2f not supported" % ts)
+        band_starts = self.band_starts
+        if self.check_bands and \
+                not freq < self.band_ends[bisect_right(band_starts, freq) - 1]:
+            msg = ValidationError(
+                ("Frequency {freq} is out "
+                 "of supported range").format(freq=format_freq(freq)))
             msgs.append(msg)
 
-        if self.valid_bands:
-            valid = False
-            for lo, hi in self.valid_bands:
-                if lo <= mem.freq < hi:
-                    valid = True
-                    break
-            if not valid:
+        if self.check_tx and duplex in ("split", "-", "+"):
+            if duplex == "split":
+                txfreq = mem.offset
+            elif duplex == "-":
+                txfreq = freq - mem.offset
+            else:
+                txfreq = freq + mem.offset
+            if not txfreq < \
+                    self.band_ends[bisect_right(band_starts, txfreq) - 1]:
                 msg = ValidationError(
-                    ("Frequency {freq} is out "
-                     "of supported range").format(freq=format_freq(mem.freq)))
+                    ("Tx freq {freq} is out "
+                     "of supported range").format(freq=format_freq(txfreq)))
                 msgs.append(msg)
 
-        if self.valid_bands and \
-                self.valid_duplexes and \
-                mem.duplex in ["split", "-", "+"]:
-            if mem.duplex == "split":
-                freq = mem.offset
-            elif mem.duplex == "-":
-                freq = mem.freq - mem.offset
-            elif mem.duplex == "+":
-                freq = mem.freq + mem.offset
-            valid = False
-            for lo, hi in self.valid_bands:
-                if lo <= freq < hi:
-                    valid = True
-                    break
-            if not valid:
-                msg = ValidationError(
-                    ("Tx freq {freq} is out "
-                     "of supported range").format(freq=format_freq(freq)))
+        if self.powers and mem.power is not None:
+            power = int(mem.power)
+            if power not in self.powers:
+                msg = ValidationWarning("Power level %s not supported" %
+                                        mem.power)
                 msgs.append(msg)
 
-        if mem.power and \
-                self.valid_power_levels and \
-                mem.power not in self.valid_power_levels:
-            msg = ValidationWarning("Power level %s not supported" % mem.power)
-            msgs.append(msg)
+        if self.steps:
+            msg = self.step_msgs.get(freq, False)
+            if msg is False:
+                msg = self.step_msg(freq)
+            if msg is not None:
+                msgs.append(msg)
 
-        if self.valid_tuning_steps and not self.has_nostep_tuning:
-            try:
-                step = required_step(mem.freq)
-                if step not in self.valid_tuning_steps:
-                    msg = ValidationError("Frequency requires %.2fkHz step" %
-                                          required_step(mem.freq))
-                    msgs.append(msg)
-            except errors.InvalidDataError, e:
-                msgs.append(str(e))
-
-        if self.valid_characters:
-            for char in mem.name:
-                if char not in self.valid_characters:
-                    msgs.append(ValidationWarning("Name character " +
-                                                  "`%s'" % char +
-                                                  " not supported"))
-                    break
+        if self.characters:
+            name = mem.name
+            if isinstance(name, str):
+                bad = name.translate(None, self.characters)
+            else:
+                bad = [char for char in name if char not in self.charset]
+            if bad:
+                msgs.append(ValidationWarning("Name character " +
+                                              "`%s'" % bad[0] +
+                                              " not supported"))
 
         return msgs
 
 
-class ValidationMessage(str):
-    """Base class for Validation Errors and Warnings"""
-    pass
-
-
-class ValidationWarning(ValidationMessage):
-    """A non-fatal warning during memory validation"""
-    pass
-
-
-class ValidationError(ValidationMessage):
-    """A fatal error during memory validation"""
-    pass
-
-
 class Alias(object):
     VENDOR = "Unknown"
     MODEL = "Unknown"
@@ -1055,13 +1215,82 @@ class Radio(Alias):
         self.set_memory(mem)
 
     def get_memories(self, lo=None, hi=None):
-        """Get all the memories between @lo and @hi"""
-        pass
+        """Get all the memories between @lo and @hi (inclusive, defaulting
+        to the radio's memory bounds). Locations that cannot be read are
+        skipped. The memories are decoded as they are iterated, so callers
+        that only need to look at each one in turn do not have to hold them
+        all at once."""
+        start, end = self.get_features().memory_bounds
+        if lo is None:
+            lo = start
+        if hi is None:
+            hi = end
+        for number in range(lo, hi + 1):
+            try:
+                yield self.get_memory(number)
+            except errors.InvalidMemoryLocation:
+                continue
 
     def set_memory(self, memory):
         """Set the memory object @memory"""
         pass
 
+    def set_memories(self, memories):
+        """Set each of the memory objects in @memories, in order. Empty
+        ones are erased with erase_memory(). Drivers that can store a run
+        of memories faster than one at a time may override this."""
+        for memory in memories:
+            if memory.empty:
+                self.erase_memory(memory.number)
+            else:
+                self.set_memory(memory)
+
+    def shift_memories(self, lo, hi, delta):
+        """Move the memories at @lo through @hi (inclusive) by @delta
+        locations, overwriting whatever is at the destination and erasing
+        the locations that are left behind. Returns the sorted list of
+        locations that changed."""
+        if not delta or hi < lo:
+            return []
+
+        memories = [self.get_memory(number) for number in range(lo, hi + 1)]
+        if delta > 0:
+            # Write from the far end, so that no source is overwritten
+            # before it has been moved
+            memories.reverse()
+        for memory in memories:
+            memory.number += delta
+        self.set_memories(memories)
+
+        src = set(range(lo, hi + 1))
+        dst = set(range(lo + delta, hi + delta + 1))
+        for number in sorted(src - dst):
+            self.erase_memory(number)
+
+        return sorted(src | dst)
+
+    def move_memories(self, moves):
+        """Rearrange memories in one operation. @moves is a dict of
+        {dest: src}, where src is the location whose current memory
+        should end up at dest, or None to erase dest. Locations that are
+        not a dest are left alone. Returns the sorted list of changed
+        locations."""
+        sources = set(src for src in moves.values() if src is not None)
+        current = dict((number, self.get_memory(number))
+                       for number in sources)
+
+        memories = []
+        for dest, src in sorted(moves.items()):
+            if src is None:
+                memory = Memory(dest, empty=True)
+            else:
+                memory = current[src].dupe()
+                memory.number = dest
+            memories.append(memory)
+        self.set_memories(memories)
+
+        return sorted(moves)
+
     def get_mapping_models(self):
         """Returns a list of MappingModel objects (or an empty list)"""
         if hasattr(self, "get_bank_model"):
@@ -1089,11 +1318,37 @@ class Radio(Alias):
         RadioFeatures.has_sub_devices is True"""
         return []
 
+    def _get_validation_features(self):
+        # Some drivers build their features from the image, so they are
+        # only kept while the memory object and the memory map are the
+        # ones they were built from and the map has not been written to
+        # since. Radios without a memory map are asked every time.
+        mmap = getattr(self, "_mmap", None)
+        generation = getattr(mmap, "generation", None)
+        if generation is None:
+            return self.get_features()
+        memobj = getattr(self, "_memobj", None)
+        cached = self.__dict__.get("_validation_features")
+        if cached is None or cached[0] is not memobj or \
+                cached[1] is not mmap or cached[2] != generation:
+            cached = (memobj, mmap, generation, self.get_features())
+            self._validation_features = cached
+        return cached[3]
+
     def validate_memory(self, mem):
         """Return a list of warnings and errors that will be encoundered
         if trying to set @mem on the current radio"""
-        rf = self.get_features()
-        return rf.validate_memory(mem)
+        return self._get_validation_features().validate_memory(mem)
+
+    def validate_memories(self, mems):
+        """Validate each of @mems like validate_memory() and return a list
+        of the message lists, in the same order"""
+        if type(self).validate_memory.__func__ is \
+                Radio.validate_memory.__func__:
+            return self._get_validation_features().validate_memories(mems)
+        # The driver adds its own checks, so they have to be run one
+        # memory at a time
+        return [self.validate_memory(mem) for mem in mems]
 
     def get_settings(self):
         """Returns a RadioSettings list containing one or more
@@ -1108,7 +1363,12 @@ class Radio(Alias):
         and adjusts the values in the radio accordingly. This function expects
         the entire RadioSettingGroup hierarchy returned from get_settings().
         If this function is implemented, the has_settings RadioFeatures flag
-        should be True and get_settings() must be implemented as well."""
+        should be True and get_settings() must be implemented as well.
+
+        Drivers that set the can_set_changed_only RadioFeatures flag also
+        accept a changed_only=True argument, in which case only settings
+        whose changed() is True are applied, and are marked unchanged as
+        they are."""
         pass
 
 
@@ -1158,27 +1418,36 @@ class FileBackedRadio(Radio):
         return raw_data[:idx], metadata
 
     @classmethod
-    def _make_metadata(cls):
-        return base64.b64encode(json.dumps(
-            {'rclass': cls.__name__,
-             'vendor': cls.VENDOR,
-             'model': cls.MODEL,
-             'variant': cls.VARIANT,
-             'chirp_version': CHIRP_VERSION,
-             }))
+    def _make_metadata(cls, extra=None):
+        metadata = dict(extra or {})
+        metadata.update({'rclass': cls.__name__,
+                         'vendor': cls.VENDOR,
+                         'model': cls.MODEL,
+                         'variant': cls.VARIANT,
+                         'chirp_version': CHIRP_VERSION,
+                         })
+        return base64.b64encode(json.dumps(metadata))
 
     def load_mmap(self, filename):
         """Load the radio's memory map from @filename"""
-        mapfile = file(filename, "rb")
-        data = mapfile.read()
+        cache = get_image_cache()
+        if cache:
+            entry = cache.load_file(filename)
+            data = entry.raw
+        else:
+            mapfile = file(filename, "rb")
+            data = mapfile.read()
+            mapfile.close()
         if self.MAGIC in data:
-            data, self._metadata = self._strip_metadata(data)
+            if cache:
+                data, self._metadata = entry.data, dict(entry.metadata)
+            else:
+                data, self._metadata = self._strip_metadata(data)
             if ('chirp_version' in self._metadata and
                     is_version_newer(self._metadata.get('chirp_version'))):
                 LOG.warning('Image is from version %s but we are %s' % (
                     self._metadata.get('chirp_version'), CHIRP_VERSION))
         self._mmap = memmap.MemoryMap(data)
-        mapfile.close()
         self.process_mmap()
 
     def save_mmap(self, filename):
@@ -1186,12 +1455,16 @@ class FileBackedRadio(Radio):
         try to open a file and write to it
         If IOError raise a File Access Error Exception
         """
+        cache = get_image_cache()
+        if cache:
+            cache.forget_file(filename)
         try:
             mapfile = file(filename, "wb")
             mapfile.write(self._mmap.get_packed())
             if filename.lower().endswith(".img"):
                 mapfile.write(self.MAGIC)
-                mapfile.write(self._make_metadata())
+                mapfile.write(self._make_metadata(
+                    getattr(self, "_metadata", None)))
             mapfile.close()
         except IOError:
             raise Exception("File Access Error")
@@ -1209,12 +1482,117 @@ class FileBackedRadio(Radio):
         self._metadata.update(values)
 
 
+class ImageCacheEntry(object):
+    """What loading the image file contents @raw found: the image @data
+    without the metadata, the @metadata, and the radio class detected
+    for it by file extension in @rclasses"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.data, self.metadata = FileBackedRadio._strip_metadata(raw)
+        self.rclasses = {}
+
+
+class ImageCache(object):
+    """Loaded image files, keyed by a hash of their contents, so that
+    opening the same image again skips decoding its metadata and
+    detecting its driver. Files are also remembered by path, size and
+    mtime so that an unchanged file is not read again; saving a file
+    forgets its path. Holds up to @size images."""
+
+    def __init__(self, size=32):
+        self.size = size
+        self._entries = collections.OrderedDict()
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def _touch(self, key, entry):
+        # Keep the entries in order of last use
+        self._entries.pop(key, None)
+        self._entries[key] = entry
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def get(self, raw):
+        """Return the entry for the file contents @raw"""
+        key = hashlib.sha1(raw).hexdigest()
+        with self._lock:
+            entry = self._entries.get(key) or ImageCacheEntry(raw)
+            self._touch(key, entry)
+        return key, entry
+
+    def load_file(self, filename):
+        """Return the entry for the contents of the file at @filename"""
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        stamp = (stat.st_size, stat.st_mtime)
+        with self._lock:
+            known = self._paths.get(path)
+            if known and known[0] == stamp and known[1] in self._entries:
+                entry = self._entries[known[1]]
+                self._touch(known[1], entry)
+                return entry
+
+        with open(path, "rb") as mapfile:
+            raw = mapfile.read()
+        key, entry = self.get(raw)
+        with self._lock:
+            self._paths[path] = (stamp, key)
+        return entry
+
+    def forget_file(self, filename):
+        """Forget what is known about the file at @filename, because it
+        is about to change"""
+        with self._lock:
+            self._paths.pop(os.path.abspath(filename), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._paths.clear()
+
+
+_IMAGE_CACHE = None
+
+
+def enable_image_cache(size=32):
+    """Cache up to @size loaded images, and the memory layouts drivers
+    parse for them, for the rest of the process"""
+    global _IMAGE_CACHE
+    _IMAGE_CACHE = ImageCache(size)
+    bitwise.enable_layout_cache()
+
+
+def disable_image_cache():
+    global _IMAGE_CACHE
+    _IMAGE_CACHE = None
+    bitwise.disable_layout_cache()
+
+
+def get_image_cache():
+    """Return the ImageCache, or None if it is not enabled"""
+    return _IMAGE_CACHE
+
+
 class CloneModeRadio(FileBackedRadio):
     """A clone-mode radio does a full memory dump in and out and we store
     an image of the radio into an image file"""
 
     _memsize = 0
 
+    # Names of the arrays in _memobj that hold one element per memory
+    # location, with location memory_bounds[0] at index 0 (like a
+    # "memory" array and its "names"). Drivers that set this get a
+    # shift_memories() that moves those elements as raw bytes.
+    _memory_arrays = ()
+
+    # Set sparse_download before sync_in() to have a driver that supports
+    # it download only the blocks its memory format maps. The rest of the
+    # image comes from sparse_base, the data of an earlier image of the
+    # same radio, if set, or is filled with 0xFF.
+    sparse_download = False
+    sparse_base = None
+
     def __init__(self, pipe):
         self.errors = []
         self._mmap = None
@@ -1245,6 +1623,106 @@ class CloneModeRadio(FileBackedRadio):
         # memories of the same size.
         return cls._memsize and len(filedata) == cls._memsize
 
+    def shift_memories(self, lo, hi, delta):
+        """Move the memories at @lo through @hi by @delta like
+        Radio.shift_memories(). If the driver lists its _memory_arrays,
+        their elements are moved as raw bytes, which keeps any settings
+        the driver does not decode and avoids a decode and encode of
+        each memory."""
+        if not self._memory_arrays or not delta or hi < lo:
+            return FileBackedRadio.shift_memories(self, lo, hi, delta)
+
+        first = self.get_features().memory_bounds[0]
+        arrays = [getattr(self._memobj, name) for name in self._memory_arrays]
+        arrays[0][lo - first:hi - first + 1].move_to(lo - first + delta,
+                                                     *arrays[1:])
+
+        src = set(range(lo, hi + 1))
+        dst = set(range(lo + delta, hi + delta + 1))
+        for number in sorted(src - dst):
+            self.erase_memory(number)
+
+        return sorted(src | dst)
+
+    def move_memories(self, moves):
+        """Rearrange memories like Radio.move_memories(). If the driver
+        lists its _memory_arrays, their elements are copied as raw
+        bytes."""
+        if not self._memory_arrays:
+            return FileBackedRadio.move_memories(self, moves)
+
+        first = self.get_features().memory_bounds[0]
+        arrays = [getattr(self._memobj, name) for name in self._memory_arrays]
+        saved = dict((src, [array[src - first].get_raw()
+                            for array in arrays])
+                     for src in set(moves.values()) if src is not None)
+
+        for dest, src in sorted(moves.items()):
+            if src is None:
+                self.erase_memory(dest)
+                continue
+            for array, data in zip(arrays, saved[src]):
+                array[dest - first].set_raw(data)
+
+        return sorted(moves)
+
+    def get_sparse_layout(self):
+        """Return the bitwise memory format that decides which blocks a
+        sparse download fetches, or None if the driver does not support
+        sparse downloads"""
+        return None
+
+    def get_download_blocks(self, start, end, block_size):
+        """Return the addresses of the @block_size blocks from @start to
+        @end to read from the radio. That is all of them, unless
+        sparse_download is set and the driver supports it, when it is
+        only the ones that its memory format maps."""
+        blocks = range(start, end, block_size)
+        layout = self.sparse_download and self.get_sparse_layout()
+        if not layout:
+            return blocks
+        ranges = bitwise.referenced_ranges(layout)
+        sparse = _blocks_in_ranges(blocks, block_size, ranges)
+        LOG.info("Sparse download of %i of %i blocks",
+                 len(sparse), len(blocks))
+        return sparse
+
+    def get_upload_blocks(self, start, end, block_size):
+        """Return the addresses of the @block_size blocks from @start to
+        @end to write to the radio. For an image from a sparse download
+        that is only the blocks that were read from the radio."""
+        blocks = range(start, end, block_size)
+        ranges = getattr(self, "_metadata", {}).get("sparse_ranges")
+        if ranges is None:
+            return blocks
+        return _blocks_in_ranges(blocks, block_size,
+                                 [tuple(r) for r in ranges])
+
+    def assemble_download(self, blocks, size):
+        """Return an image of @size bytes from @blocks, a dict of
+        {address: data} read from the radio. Anything not read comes
+        from sparse_base or is filled with 0xFF, and then the ranges
+        that were read are recorded in the image metadata as the ones
+        that are authoritative."""
+        ranges = []
+        for addr in sorted(blocks):
+            end = addr + len(blocks[addr])
+            if ranges and ranges[-1][1] == addr:
+                ranges[-1][1] = end
+            else:
+                ranges.append([addr, end])
+
+        if ranges == [[0, size]]:
+            self._metadata.pop("sparse_ranges", None)
+            return "".join(blocks[addr] for addr in sorted(blocks))
+
+        base = self.sparse_base or ""
+        data = list(base[:size] + "\xFF" * (size - len(base)))
+        for addr, block in blocks.items():
+            data[addr:addr + len(block)] = block
+        self._metadata["sparse_ranges"] = ranges
+        return "".join(data)
+
     def sync_in(self):
         "Initiate a radio-to-PC clone operation"
         pass
@@ -1254,6 +1732,18 @@ class CloneModeRadio(FileBackedRadio):
         pass
 
 
+def _blocks_in_ranges(blocks, block_size, ranges):
+    """Return the addresses in @blocks whose @block_size bytes overlap
+    any of the sorted (start, end) @ranges"""
+    starts = [start for start, end in ranges]
+    result = []
+    for addr in blocks:
+        i = bisect_right(starts, addr + block_size - 1) - 1
+        if i >= 0 and ranges[i][1] > addr:
+            result.append(addr)
+    return result
+
+
 class LiveRadio(Radio):
     """Base class for all Live-Mode radios"""
     pass
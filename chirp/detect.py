@@ -15,8 +15,10 @@
 
 import serial
 import logging
+import threading
+import time
 
-from chirp import chirp_common, errors, directory
+from chirp import chirp_common, errors, directory, platform, probecache
 from chirp.drivers import ic9x_ll, icf, kenwood_live, icomciv
 
 LOG = logging.getLogger(__name__)
@@ -43,33 +45,48 @@ def _icom_model_data_to_rclass(md):
                             (ord(md[0]), ord(md[1]), ord(md[2]), ord(md[3])))
 
 
-def _detect_icom_radio(ser):
+def _probe_icf(ser):
     # ICOM VHF/UHF Clone-type radios @ 9600 baud
+    ser.baudrate = 9600
+    md = icf.get_model_data(DetectorRadio(ser))
+    return _icom_model_data_to_rclass(md)
 
-    try:
-        ser.baudrate = 9600
-        md = icf.get_model_data(DetectorRadio(ser))
-        return _icom_model_data_to_rclass(md)
-    except errors.RadioError, e:
-        LOG.error("_detect_icom_radio: %s", e)
 
+def _probe_ic9x(ser):
     # ICOM IC-91/92 Live-mode radios @ 4800/38400 baud
-
     ser.baudrate = 4800
-    try:
-        ic9x_ll.send_magic(ser)
-        return _icom_model_data_to_rclass("ic9x")
-    except errors.RadioError:
-        pass
+    ic9x_ll.send_magic(ser)
+    return _icom_model_data_to_rclass("ic9x")
+
 
+def _make_civ_probe(rate):
     # ICOM CI/V Radios @ various bauds
+    def _probe_civ(ser):
+        ser.baudrate = rate
+        return icomciv.probe_model(ser)
+    return _probe_civ
+
+
+ICOM_PROBES = [
+    ("icf", _probe_icf),
+    ("ic9x", _probe_ic9x),
+    ("civ9600", _make_civ_probe(9600)),
+    ("civ4800", _make_civ_probe(4800)),
+    ("civ19200", _make_civ_probe(19200)),
+]
+
 
-    for rate in [9600, 4800, 19200]:
+def _detect_icom_radio(ser, port=None):
+    cache = probecache.get_cache()
+    probes = cache.order("icom", port, ICOM_PROBES, key=lambda p: p[0])
+    for name, probe in probes:
         try:
-            ser.baudrate = rate
-            return icomciv.probe_model(ser)
-        except errors.RadioError:
-            pass
+            rclass = probe(ser)
+        except errors.RadioError, e:
+            LOG.debug("_detect_icom_radio: %s probe failed: %s", name, e)
+            continue
+        cache.remember("icom", port, name)
+        return rclass
 
     ser.close()
 
@@ -81,7 +98,7 @@ def detect_icom_radio(port):
     ser = serial.Serial(port=port, timeout=0.5)
 
     try:
-        result = _detect_icom_radio(ser)
+        result = _detect_icom_radio(ser, port)
     except Exception:
         ser.close()
         raise
@@ -114,3 +131,51 @@ DETECT_FUNCTIONS = {
     "Icom":    detect_icom_radio,
     "Kenwood": detect_kenwoodlive_radio,
 }
+
+
+def detect_radios(vendor, ports=None, timeout=None, prefer=None):
+    """Probe all of @ports (by default every serial port) for a @vendor
+    radio at the same time. Returns a dict of port: radio class for the
+    ports where one was found. If @timeout is given, ports that are still
+    being probed after that many seconds are left out. If @prefer is
+    set, return as soon as a radio is found on that port, or on any
+    other port once that one has been probed without finding one."""
+    detect_fn = DETECT_FUNCTIONS[vendor]
+    if ports is None:
+        ports = platform.get_platform().list_serial_ports()
+
+    found = {}
+    pending = set(ports)
+    done = threading.Condition()
+
+    def _probe(port):
+        try:
+            rclass = detect_fn(port)
+        except Exception, e:
+            LOG.debug("No %s radio on %s: %s", vendor, port, e)
+            rclass = None
+        with done:
+            pending.discard(port)
+            if rclass:
+                found[port] = rclass
+            done.notify()
+
+    for port in ports:
+        thread = threading.Thread(target=_probe, args=(port,),
+                                  name="detect-%s" % port)
+        thread.daemon = True
+        thread.start()
+
+    def _settled():
+        # The preferred port has a radio, or has none and another has
+        return prefer in found or (found and prefer not in pending)
+
+    deadline = timeout is not None and time.time() + timeout
+    with done:
+        while pending and not (prefer and _settled()):
+            wait = deadline and deadline - time.time()
+            if deadline and wait <= 0:
+                LOG.warning("Gave up probing %s", ", ".join(sorted(pending)))
+                break
+            done.wait(wait or None)
+        return dict(found)
@@ -0,0 +1,233 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Binary comparison of radio images"""
+
+import bisect
+import os
+
+from chirp import bitwise, memmap, util
+
+# Number of bytes compared at once when looking for changes
+BLOCK_SIZE = 256
+
+# Number of bytes per line of hexdump output (see util.hexprint())
+LINE_SIZE = 8
+
+
+def _raw(data):
+    if isinstance(data, memmap.MemoryMap):
+        return data.get_packed()
+    return data
+
+
+def compare(data_a, data_b, block_size=BLOCK_SIZE):
+    """Compare @data_a and @data_b (MemoryMap objects or strings) and return
+    a sorted list of (start, end) byte ranges that differ between them.
+    Bytes past the end of the shorter one are considered different."""
+    data_a = _raw(data_a)
+    data_b = _raw(data_b)
+    view_a = memoryview(data_a)
+    view_b = memoryview(data_b)
+    length = min(len(data_a), len(data_b))
+
+    ranges = []
+    for block in range(0, length, block_size):
+        end = min(block + block_size, length)
+        if view_a[block:end] == view_b[block:end]:
+            continue
+
+        for i in range(block, end):
+            if data_a[i] == data_b[i]:
+                continue
+            if ranges and ranges[-1][1] == i:
+                ranges[-1][1] = i + 1
+            else:
+                ranges.append([i, i + 1])
+
+    if len(data_a) != len(data_b):
+        tail = max(len(data_a), len(data_b))
+        if ranges and ranges[-1][1] == length:
+            ranges[-1][1] = tail
+        else:
+            ranges.append([length, tail])
+
+    return [tuple(r) for r in ranges]
+
+
+class FieldIndex(object):
+    """An index of the fields of a bitwise object by their byte offset
+
+    Structures and arrays of structures are broken down into their members,
+    while arrays of other types (like strings and BCD frequencies) are a
+    single field. Fields are named by their path from the top of the
+    object, like "memory[37].rxfreq".
+    """
+
+    def __init__(self, memobj):
+        fields = []
+        self._walk(memobj, "", fields)
+        fields.sort(key=lambda f: f[0])
+        self._fields = fields
+        self._starts = [f[0] for f in fields]
+        self._maxsize = max([f[1] - f[0] for f in fields] or [0])
+
+    def _walk(self, obj, path, fields):
+        if isinstance(obj, bitwise.structDataElement):
+            for name, child in obj.items():
+                self._walk(child, path and "%s.%s" % (path, name) or name,
+                           fields)
+        elif isinstance(obj, bitwise.arrayDataElement):
+            if not len(obj):
+                return
+            if isinstance(obj[0], (bitwise.structDataElement,
+                                   bitwise.arrayDataElement)):
+                for i, child in enumerate(obj):
+                    self._walk(child, "%s[%i]" % (path, i), fields)
+            else:
+                last = obj[len(obj) - 1]
+                fields.append((obj[0].get_offset(),
+                               last.get_offset() + self._bytes(last),
+                               path, None))
+        elif isinstance(obj, bitwise.bitDataElement):
+            fields.append((obj.get_offset(),
+                           obj.get_offset() + obj._subgen._size,
+                           path, obj))
+        else:
+            fields.append((obj.get_offset(),
+                           obj.get_offset() + self._bytes(obj),
+                           path, None))
+
+    @staticmethod
+    def _bytes(element):
+        if isinstance(element, bitwise.bitDataElement):
+            return element._subgen._size
+        return element._size
+
+    def __len__(self):
+        return len(self._fields)
+
+    def lookup(self, start, end, data_a=None, data_b=None):
+        """Return the names of the fields that overlap the byte range
+        @start-@end, in offset order. If @data_a and @data_b are provided,
+        bitfields whose bits are the same in both are left out."""
+        data_a = _raw(data_a)
+        data_b = _raw(data_b)
+
+        first = bisect.bisect_left(self._starts, start - self._maxsize)
+        last = bisect.bisect_left(self._starts, end)
+
+        names = []
+        for fstart, fend, path, bitfield in self._fields[first:last]:
+            if fend <= start:
+                continue
+            if bitfield is not None and data_a is not None and \
+                    data_b is not None and \
+                    self._bits(bitfield, data_a) == \
+                    self._bits(bitfield, data_b):
+                continue
+            names.append(path)
+        return names
+
+    @staticmethod
+    def _bits(bitfield, data):
+        offset = bitfield.get_offset()
+        try:
+            value = bitfield._subgen(data, offset).get_value()
+        except Exception:
+            # Past the end of this image
+            return None
+        mask = bitwise.bits_between(bitfield._shift - bitfield._nbits,
+                                    bitfield._shift)
+        return value & mask
+
+
+def compare_fields(memobj, data_a, data_b, ranges=None):
+    """Compare @data_a and @data_b like compare(), and return a list of
+    (start, end, fields) for each changed range, where fields is the list
+    of names of the fields of @memobj that it covers. If @ranges is
+    provided, it is used instead of comparing the data again."""
+    data_a = _raw(data_a)
+    data_b = _raw(data_b)
+    if ranges is None:
+        ranges = compare(data_a, data_b)
+    index = FieldIndex(memobj)
+    return [(start, end, index.lookup(start, end, data_a, data_b))
+            for start, end in ranges]
+
+
+def _lines(data, first, last, addrfmt):
+    """Hexdump lines @first through @last-1 of @data"""
+    chunk = data[first * LINE_SIZE:last * LINE_SIZE]
+    if not chunk:
+        return []
+    return util.hexprint(chunk, addrfmt=addrfmt,
+                         offset=first * LINE_SIZE).rstrip("\n").split("\n")
+
+
+def hexdiff(data_a, data_b, diffsonly=False, addrfmt=None, ranges=None):
+    """Return a hexdump of @data_a with lines that differ in @data_b
+    marked with '-' and followed by the @data_b version marked with '+'.
+    If @diffsonly is True, only the differing lines are included, with
+    runs of identical lines shown as a blank line. Only the differing
+    lines are formatted in that case, so it is fast on large images."""
+    data_a = _raw(data_a)
+    data_b = _raw(data_b)
+    if ranges is None:
+        ranges = compare(data_a, data_b)
+
+    changed = []
+    for start, end in ranges:
+        first = start / LINE_SIZE
+        last = (end + LINE_SIZE - 1) / LINE_SIZE
+        if changed and changed[-1][1] >= first:
+            changed[-1][1] = max(changed[-1][1], last)
+        else:
+            changed.append([first, last])
+
+    nlines = (max(len(data_a), len(data_b)) + LINE_SIZE - 1) / LINE_SIZE
+    if not diffsonly:
+        lines_a = _lines(data_a, 0, nlines, addrfmt)
+
+    out = []
+    pos = 0
+    for first, last in changed + [[nlines, nlines]]:
+        if first > pos:
+            if diffsonly:
+                if out:
+                    out.append("")
+            else:
+                out.extend(" %s" % line for line in lines_a[pos:first])
+        if first == last:
+            break
+        for line_a, line_b in map(None,
+                                  _lines(data_a, first, last, addrfmt),
+                                  _lines(data_b, first, last, addrfmt)):
+            if line_a is not None:
+                out.append("-%s" % line_a)
+            if line_b is not None:
+                out.append("+%s" % line_b)
+        pos = last
+
+    return os.linesep.join(out) + os.linesep
+
+
+def format_fields(changes):
+    """Return a printable summary of the result of compare_fields()"""
+    out = []
+    for start, end, fields in changes:
+        out.append("0x%04X-0x%04X: %s" % (start, end - 1,
+                                          ", ".join(fields) or "(unmapped)"))
+    return os.linesep.join(out)
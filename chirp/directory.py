@@ -19,7 +19,7 @@ import tempfile
 import logging
 
 from chirp.drivers import icf, rfinder
-from chirp import chirp_common, util, radioreference, errors
+from chirp import chirp_common, util, radioreference, errors, stats
 
 LOG = logging.getLogger(__name__)
 
@@ -61,12 +61,15 @@ def register(cls):
     DRV_TO_RADIO[ident] = cls
     RADIO_TO_DRV[cls] = ident
     LOG.info("Registered %s = %s" % (ident, cls.__name__))
+    if _INSTRUMENTED:
+        _instrument(cls)
 
     return cls
 
 
 DRV_TO_RADIO = {}
 RADIO_TO_DRV = {}
+_INSTRUMENTED = False
 
 
 def get_radio(driver):
@@ -87,6 +90,27 @@ def get_driver(rclass):
         raise Exception("Unknown radio type `%s'" % rclass)
 
 
+def _driver_name(radio):
+    return RADIO_TO_DRV.get(radio.__class__, radio.__class__.__name__)
+
+
+def _instrument(rclass):
+    for method in ("get_memory", "set_memory"):
+        stats.instrument(rclass, method,
+                         lambda radio, method=method: "driver.%s.%s" % (
+                             _driver_name(radio), method))
+
+
+def instrument_drivers():
+    """Time the get_memory() and set_memory() calls of all the registered
+    drivers, and of those registered from now on, such as by loading a
+    module, under "driver.<id>.<method>" in chirp.stats"""
+    global _INSTRUMENTED
+    _INSTRUMENTED = True
+    for rclass in DRV_TO_RADIO.values():
+        _instrument(rclass)
+
+
 def icf_to_image(icf_file, img_file):
     # FIXME: Why is this here?
     """Convert an ICF file to a .img file"""
@@ -140,6 +164,16 @@ def get_radio_by_image(image_file):
         LOG.info("Auto-converted %s -> %s" % (image_file, tempf))
         image_file = tempf
 
+    cache = chirp_common.get_image_cache()
+    if cache and os.path.exists(image_file):
+        # Drivers match on the contents and the extension
+        entry = cache.load_file(image_file)
+        ext = os.path.splitext(image_file)[1]
+        if ext not in entry.rclasses:
+            entry.rclasses[ext] = _detect_image_class(
+                entry.raw, entry.metadata, image_file)
+        return entry.rclasses[ext](image_file)
+
     if os.path.exists(image_file):
         f = file(image_file, "rb")
         filedata = f.read()
@@ -148,14 +182,17 @@ def get_radio_by_image(image_file):
         filedata = ""
 
     data, metadata = chirp_common.FileBackedRadio._strip_metadata(filedata)
+    return _detect_image_class(filedata, metadata, image_file)(image_file)
+
 
+def _detect_image_class(filedata, metadata, image_file):
     for rclass in DRV_TO_RADIO.values():
         if not issubclass(rclass, chirp_common.FileBackedRadio):
             continue
 
         # If no metadata, we do the old thing
         if not metadata and rclass.match_model(filedata, image_file):
-            return rclass(image_file)
+            return rclass
 
         meta_vendor = metadata.get('vendor')
         meta_model = metadata.get('model')
@@ -172,7 +209,7 @@ def get_radio_by_image(image_file):
                     MODEL = meta_model
                     VARIANT = metadata.get('variant')
 
-                return DynamicRadioAlias(image_file)
+                return DynamicRadioAlias
 
     if metadata:
         e = errors.ImageMetadataInvalidModel("Unsupported model %s %s" % (
@@ -20,9 +20,9 @@ import time
 import struct
 import logging
 from chirp import chirp_common, directory, memmap
-from chirp import bitwise, errors, util
+from chirp import bitwise, errors, tonecodec, util
 from chirp.settings import RadioSettingGroup, RadioSetting, \
-    RadioSettingValueBoolean, RadioSettingValueList
+    RadioSettingValueBoolean, RadioSettingValueList, get_setting_paths
 
 LOG = logging.getLogger(__name__)
 
@@ -358,6 +358,7 @@ class BaofengCommonHT(chirp_common.CloneModeRadio,
 
         rf = chirp_common.RadioFeatures()
         rf.has_settings = True
+        rf.can_set_changed_only = True
         rf.has_bank = False
         rf.has_tuning_step = False
         rf.can_odd_split = True
@@ -438,38 +439,21 @@ class BaofengCommonHT(chirp_common.CloneModeRadio,
         mem.name = mem.name.rstrip()
 
         dtcs_pol = ["N", "N"]
-
-        if _mem.txtone in [0, 0xFFFF]:
-            txmode = ""
-        elif _mem.txtone >= 0x0258:
-            txmode = "Tone"
-            mem.rtone = int(_mem.txtone) / 10.0
-        elif _mem.txtone <= 0x0258:
-            txmode = "DTCS"
-            if _mem.txtone > 0x69:
-                index = _mem.txtone - 0x6A
-                dtcs_pol[0] = "R"
-            else:
-                index = _mem.txtone - 1
-            mem.dtcs = self.DTCS_CODES[index]
-        else:
-            LOG.warn("Bug: txtone is %04x" % _mem.txtone)
-
-        if _mem.rxtone in [0, 0xFFFF]:
-            rxmode = ""
-        elif _mem.rxtone >= 0x0258:
-            rxmode = "Tone"
-            mem.ctone = int(_mem.rxtone) / 10.0
-        elif _mem.rxtone <= 0x0258:
-            rxmode = "DTCS"
-            if _mem.rxtone >= 0x6A:
-                index = _mem.rxtone - 0x6A
-                dtcs_pol[1] = "R"
-            else:
-                index = _mem.rxtone - 1
-            mem.rx_dtcs = self.DTCS_CODES[index]
-        else:
-            LOG.warn("Bug: rxtone is %04x" % _mem.rxtone)
+        tone_word = tonecodec.get_indexed_tone_word(self.DTCS_CODES)
+
+        txmode, txval, txpol = tone_word.decode(_mem.txtone)
+        if txmode == "Tone":
+            mem.rtone = txval
+        elif txmode == "DTCS":
+            mem.dtcs = txval
+            dtcs_pol[0] = txpol
+
+        rxmode, rxval, rxpol = tone_word.decode(_mem.rxtone)
+        if rxmode == "Tone":
+            mem.ctone = rxval
+        elif rxmode == "DTCS":
+            mem.rx_dtcs = rxval
+            dtcs_pol[1] = rxpol
 
         if txmode == "Tone" and not rxmode:
             mem.tmode = "Tone"
@@ -573,39 +557,11 @@ class BaofengCommonHT(chirp_common.CloneModeRadio,
             except IndexError:
                 _nam.name[i] = "\xFF"
 
-        rxmode = txmode = ""
-        if mem.tmode == "Tone":
-            _mem.txtone = int(mem.rtone * 10)
-            _mem.rxtone = 0
-        elif mem.tmode == "TSQL":
-            _mem.txtone = int(mem.ctone * 10)
-            _mem.rxtone = int(mem.ctone * 10)
-        elif mem.tmode == "DTCS":
-            rxmode = txmode = "DTCS"
-            _mem.txtone = self.DTCS_CODES.index(mem.dtcs) + 1
-            _mem.rxtone = self.DTCS_CODES.index(mem.dtcs) + 1
-        elif mem.tmode == "Cross":
-            txmode, rxmode = mem.cross_mode.split("->", 1)
-            if txmode == "Tone":
-                _mem.txtone = int(mem.rtone * 10)
-            elif txmode == "DTCS":
-                _mem.txtone = self.DTCS_CODES.index(mem.dtcs) + 1
-            else:
-                _mem.txtone = 0
-            if rxmode == "Tone":
-                _mem.rxtone = int(mem.ctone * 10)
-            elif rxmode == "DTCS":
-                _mem.rxtone = self.DTCS_CODES.index(mem.rx_dtcs) + 1
-            else:
-                _mem.rxtone = 0
-        else:
-            _mem.rxtone = 0
-            _mem.txtone = 0
-
-        if txmode == "DTCS" and mem.dtcs_polarity[0] == "R":
-            _mem.txtone += 0x69
-        if rxmode == "DTCS" and mem.dtcs_polarity[1] == "R":
-            _mem.rxtone += 0x69
+        tone_word = tonecodec.get_indexed_tone_word(self.DTCS_CODES)
+        ((txmode, txtone, txpol),
+         (rxmode, rxtone, rxpol)) = chirp_common.split_tone_encode(mem)
+        _mem.txtone = tone_word.encode(txmode, txtone, txpol)
+        _mem.rxtone = tone_word.encode(rxmode, rxtone, rxpol)
 
         _mem.scan = mem.skip != "S"
         _mem.wide = mem.mode == "FM"
@@ -626,33 +582,25 @@ class BaofengCommonHT(chirp_common.CloneModeRadio,
             _mem.pttid = 0
             _mem.scode = 0
 
-    def set_settings(self, settings):
-        _settings = self._memobj.settings
+    def set_settings(self, settings, changed_only=False):
+        paths = get_setting_paths(self, self._memobj.settings)
         _mem = self._memobj
         for element in settings:
             if not isinstance(element, RadioSetting):
+                if changed_only and not element.changed():
+                    continue
                 if element.get_name() == "fm_preset":
                     self._set_fm_preset(element)
+                    if changed_only:
+                        element.clear_changed()
                 else:
-                    self.set_settings(element)
+                    self.set_settings(element, changed_only)
                     continue
             else:
+                if changed_only and not element.changed():
+                    continue
                 try:
-                    name = element.get_name()
-                    if "." in name:
-                        bits = name.split(".")
-                        obj = self._memobj
-                        for bit in bits[:-1]:
-                            if "/" in bit:
-                                bit, index = bit.split("/", 1)
-                                index = int(index)
-                                obj = getattr(obj, bit)[index]
-                            else:
-                                obj = getattr(obj, bit)
-                        setting = bits[-1]
-                    else:
-                        obj = _settings
-                        setting = element.get_name()
+                    obj, setting = paths.resolve(element.get_name())
 
                     if element.has_apply_callback():
                         LOG.debug("Using apply callback")
@@ -660,6 +608,9 @@ class BaofengCommonHT(chirp_common.CloneModeRadio,
                     elif element.value.get_mutable():
                         LOG.debug("Setting %s = %s" % (setting, element.value))
                         setattr(obj, setting, element.value)
+                    # Only once applied, so a failure is tried again
+                    if changed_only:
+                        element.clear_changed()
                 except Exception, e:
                     LOG.debug(element.get_name())
                     raise
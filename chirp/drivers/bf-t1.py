@@ -27,7 +27,7 @@
 
 from time import sleep
 from chirp import chirp_common, directory, memmap
-from chirp import bitwise, errors, util
+from chirp import bitwise, errors, tonecodec, util
 from chirp.settings import RadioSetting, RadioSettingGroup, \
                 RadioSettingValueBoolean, RadioSettingValueList, \
                 RadioSettingValueInteger, RadioSettingValueString, \
@@ -56,6 +56,8 @@ MODES = ["NFM", "FM"]
 SKIP_VALUES = ["S", ""]
 TONES = chirp_common.TONES
 DTCS = sorted(chirp_common.DTCS_CODES + [645])
+TONE_TABLE = tonecodec.get_table(TONES)
+DTCS_TABLE = tonecodec.get_table(DTCS)
 
 # Special channels
 SPECIALS = {
@@ -589,7 +591,7 @@ class BFT1(chirp_common.CloneModeRadio, chirp_common.ExperimentalRadio):
         elif mode == 'Tone':
             # caching errors for analog tones.
             try:
-                memtone.set_value(TONES.index(tone) + 1)
+                memtone.set_value(TONE_TABLE.index(tone) + 1)
                 meminv.set_value(0)
             except:
                 msg = "TCSS Tone '%d' is not supported" % tone
@@ -599,7 +601,7 @@ class BFT1(chirp_common.CloneModeRadio, chirp_common.ExperimentalRadio):
         elif mode == 'DTCS':
             # caching errors for digital tones.
             try:
-                memtone.set_value(DTCS.index(tone) + 51)
+                memtone.set_value(DTCS_TABLE.index(tone) + 51)
                 if pol == "R":
                     meminv.set_value(True)
                 else:
@@ -21,11 +21,12 @@ import logging
 
 from time import sleep
 from chirp import chirp_common, directory, memmap
-from chirp import bitwise, errors, util
+from chirp import bitwise, errors, tonecodec, util
 from chirp.settings import RadioSettingGroup, RadioSetting, \
     RadioSettingValueBoolean, RadioSettingValueList, \
     RadioSettingValueString, RadioSettingValueInteger, \
-    RadioSettingValueFloat, RadioSettings, InvalidValueError
+    RadioSettingValueFloat, RadioSettings, InvalidValueError, \
+    get_setting_paths
 from textwrap import dedent
 
 LOG = logging.getLogger(__name__)
@@ -46,6 +47,7 @@ MODES = ["FM", "NFM"]
 SKIP_VALUES = ["S", ""]
 TONES = chirp_common.TONES
 DTCS = sorted(chirp_common.DTCS_CODES + [645])
+TONE_WORD = tonecodec.get_indexed_tone_word(DTCS)
 
 # lists related to "extra" settings
 PTTID_LIST = ["OFF", "BOT", "EOT", "BOTH"]
@@ -582,8 +584,11 @@ def _download(radio):
             LOG.info("Dummy first block read done, got this:\n\n %s",
                      util.hexprint(discard))
 
+    # all the blocks, or only the mapped ones for a sparse download
+    blocks = radio.get_download_blocks(0, MEM_SIZE, BLOCK_SIZE)
+
     # reset the progress bar in the UI
-    status.max = MEM_SIZE / BLOCK_SIZE
+    status.max = len(blocks)
     status.msg = "Cloning from radio..."
     status.cur = 0
     radio.status_fn(status)
@@ -591,8 +596,8 @@ def _download(radio):
     # cleaning the serial buffer
     _clean_buffer(radio)
 
-    data = ""
-    for addr in range(0, MEM_SIZE, BLOCK_SIZE):
+    data = {}
+    for i, addr in enumerate(blocks):
         # sending the read request
         _send(radio, _make_frame("S", addr, BLOCK_SIZE))
 
@@ -600,14 +605,14 @@ def _download(radio):
         d = _recv(radio, addr)
 
         # aggregate the data
-        data += d
+        data[addr] = d
 
         # UI Update
-        status.cur = addr / BLOCK_SIZE
+        status.cur = i
         status.msg = "Cloning from radio..."
         radio.status_fn(status)
 
-    return data
+    return radio.assemble_download(data, MEM_SIZE)
 
 
 def _upload(radio):
@@ -626,8 +631,11 @@ def _upload(radio):
     # get the data to upload to radio
     data = radio.get_mmap()
 
+    # all the blocks, or only the ones read by a sparse download
+    blocks = radio.get_upload_blocks(0, MEM_SIZE, TX_BLOCK_SIZE)
+
     # Reset the UI progress
-    status.max = MEM_SIZE / TX_BLOCK_SIZE
+    status.max = len(blocks)
     status.cur = 0
     status.msg = "Cloning to radio..."
     radio.status_fn(status)
@@ -640,7 +648,7 @@ def _upload(radio):
     _clean_buffer(radio)
 
     # the fun start here
-    for addr in range(0, MEM_SIZE, TX_BLOCK_SIZE):
+    for i, addr in enumerate(blocks):
         # getting the block of data to send
         d = data[addr:addr + TX_BLOCK_SIZE]
 
@@ -649,7 +657,7 @@ def _upload(radio):
 
         # first block must not send the ACK at the beginning for the
         # ones that has the extra id, since this have to do a extra step
-        if addr == 0 and radio._id2 is not False:
+        if i == 0 and radio._id2 is not False:
             frame = frame[1:]
 
         # send the frame
@@ -666,7 +674,7 @@ def _upload(radio):
             raise errors.RadioError("Bad ACK writing block 0x%04x:" % addr)
 
         # UI Update
-        status.cur = addr / TX_BLOCK_SIZE
+        status.cur = i
         status.msg = "Cloning to radio..."
         radio.status_fn(status)
 
@@ -726,7 +734,9 @@ class BTechMobileCommon(chirp_common.CloneModeRadio,
     _uhf_range = (400000000, 521000000)
     _350_range = (350000000, 391000000)
     _upper = 199
+    _memory_arrays = ("memory", "names")
     _magic = MSTRING
+    _mem_format = None
     _fileid = None
     _id2 = False
     btech3 = False
@@ -771,6 +781,7 @@ class BTechMobileCommon(chirp_common.CloneModeRadio,
 
         rf = chirp_common.RadioFeatures()
         rf.has_settings = True
+        rf.can_set_changed_only = True
         rf.has_bank = False
         rf.has_tuning_step = False
         rf.can_odd_split = True
@@ -846,6 +857,9 @@ class BTechMobileCommon(chirp_common.CloneModeRadio,
 
         return msgs
 
+    def get_sparse_layout(self):
+        return self._mem_format
+
     def sync_in(self):
         """Download from radio"""
         data = _download(self)
@@ -867,41 +881,17 @@ class BTechMobileCommon(chirp_common.CloneModeRadio,
     def _decode_tone(self, val):
         """Parse the tone data to decode from mem, it returns:
         Mode (''|DTCS|Tone), Value (None|###), Polarity (None,N,R)"""
-        pol = None
-
-        if val in [0, 65535]:
-            return '', None, None
-        elif val > 0x0258:
-            a = val / 10.0
-            return 'Tone', a, pol
-        else:
-            if val > 0x69:
-                index = val - 0x6A
-                pol = "R"
-            else:
-                index = val - 1
-                pol = "N"
-
-            tone = DTCS[index]
-            return 'DTCS', tone, pol
+        return TONE_WORD.decode(val)
 
     def _encode_tone(self, memval, mode, val, pol):
         """Parse the tone data to encode from UI to mem"""
         if mode == '' or mode is None:
             memval.set_raw("\x00\x00")
-        elif mode == 'Tone':
-            memval.set_value(val * 10)
-        elif mode == 'DTCS':
-            # detect the index in the DTCS list
+        elif mode in ('Tone', 'DTCS'):
             try:
-                index = DTCS.index(val)
-                if pol == "N":
-                    index += 1
-                else:
-                    index += 0x6A
-                memval.set_value(index)
-            except:
-                msg = "Digital Tone '%d' is not supported" % value
+                memval.set_value(TONE_WORD.encode(mode, val, pol))
+            except ValueError:
+                msg = "Digital Tone '%d' is not supported" % val
                 LOG.error(msg)
                 raise errors.RadioError(msg)
         else:
@@ -3076,32 +3066,24 @@ class BTechMobileCommon(chirp_common.CloneModeRadio,
 
         return top
 
-    def set_settings(self, settings):
-        _settings = self._memobj.settings
+    def set_settings(self, settings, changed_only=False):
+        paths = get_setting_paths(self, self._memobj.settings)
         for element in settings:
             if not isinstance(element, RadioSetting):
+                if changed_only and not element.changed():
+                    continue
                 if element.get_name() == "fm_preset":
                     self._set_fm_preset(element)
+                    if changed_only:
+                        element.clear_changed()
                 else:
-                    self.set_settings(element)
+                    self.set_settings(element, changed_only)
                     continue
             else:
+                if changed_only and not element.changed():
+                    continue
                 try:
-                    name = element.get_name()
-                    if "." in name:
-                        bits = name.split(".")
-                        obj = self._memobj
-                        for bit in bits[:-1]:
-                            if "/" in bit:
-                                bit, index = bit.split("/", 1)
-                                index = int(index)
-                                obj = getattr(obj, bit)[index]
-                            else:
-                                obj = getattr(obj, bit)
-                        setting = bits[-1]
-                    else:
-                        obj = _settings
-                        setting = element.get_name()
+                    obj, setting = paths.resolve(element.get_name())
 
                     if element.has_apply_callback():
                         LOG.debug("Using apply callback")
@@ -3109,6 +3091,9 @@ class BTechMobileCommon(chirp_common.CloneModeRadio,
                     elif element.value.get_mutable():
                         LOG.debug("Setting %s = %s" % (setting, element.value))
                         setattr(obj, setting, element.value)
+                    # Only once applied, so a failure is tried again
+                    if changed_only:
+                        element.clear_changed()
                 except Exception, e:
                     LOG.debug(element.get_name())
                     raise
@@ -3422,6 +3407,7 @@ class BTech(BTechMobileCommon):
     BANDS = 2
     COLOR_LCD = False
     NAME_LENGTH = 6
+    _mem_format = MEM_FORMAT
 
     def set_options(self):
         """This is to read the options from the image and set it in the
@@ -3459,7 +3445,7 @@ class BTech(BTechMobileCommon):
         """Process the mem map into the mem object"""
 
         # Get it
-        self._memobj = bitwise.parse(MEM_FORMAT, self._mmap)
+        self._memobj = bitwise.parse(self._mem_format, self._mmap)
 
         # load specific parameters from the radio image
         self.set_options()
@@ -3918,12 +3904,13 @@ class BTechColor(BTechMobileCommon):
     COLOR_LCD = True
     NAME_LENGTH = 8
     LIST_TMR = LIST_TMR16
+    _mem_format = COLOR_MEM_FORMAT
 
     def process_mmap(self):
         """Process the mem map into the mem object"""
 
         # Get it
-        self._memobj = bitwise.parse(COLOR_MEM_FORMAT, self._mmap)
+        self._memobj = bitwise.parse(self._mem_format, self._mmap)
 
         # load specific parameters from the radio image
         self.set_options()
@@ -4089,6 +4076,8 @@ class DB25G(BTechColor):
     _magic = MSTRING_KT8900D
     _fileid = [DB25G_fp1, DB25G_fp]
     _gmrs = True
+    # GMRS channels are tied to their location, so they can't be moved
+    _memory_arrays = ()
     _power_levels = [chirp_common.PowerLevel("High", watts=25),
                      chirp_common.PowerLevel("Mid", watts=15),
                      chirp_common.PowerLevel("Low", watts=5)]
@@ -4407,12 +4396,13 @@ class BTechGMRS(BTechMobileCommon):
     COLOR_LCD2 = True
     NAME_LENGTH = 7
     UPLOAD_MEM_SIZE = 0X3400
+    _mem_format = GMRS_MEM_FORMAT
 
     def process_mmap(self):
         """Process the mem map into the mem object"""
 
         # Get it
-        self._memobj = bitwise.parse(GMRS_MEM_FORMAT, self._mmap)
+        self._memobj = bitwise.parse(self._mem_format, self._mmap)
 
         # load specific parameters from the radio image
         self.set_options()
@@ -4754,12 +4744,13 @@ class QYTColorHT(BTechMobileCommon):
     COLOR_LCD3 = True
     NAME_LENGTH = 8
     LIST_TMR = LIST_TMR15
+    _mem_format = COLORHT_MEM_FORMAT
 
     def process_mmap(self):
         """Process the mem map into the mem object"""
 
         # Get it
-        self._memobj = bitwise.parse(COLORHT_MEM_FORMAT, self._mmap)
+        self._memobj = bitwise.parse(self._mem_format, self._mmap)
 
         # load specific parameters from the radio image
         self.set_options()
@@ -548,6 +548,14 @@ class FT1BankModel(chirp_common.BankModel):
 
         return banks
 
+    def get_all_memory_mappings(self, lo, hi):
+        table = {}
+        for bank in self.get_mappings():
+            for channel in self._channel_numbers_in_bank(bank):
+                if lo <= channel <= hi:
+                    table.setdefault(channel, ([], []))[0].append(bank)
+        return table
+
 
 # Note: other radios like FTM3200Radio subclass this radio
 @directory.register
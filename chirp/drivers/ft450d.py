@@ -670,7 +670,7 @@ class FT450DRadio(yaesu_clone.YaesuCloneModeRadio):
 
         for key in cur_mem.immutable:
             if key != "extd_number":
-                if cur_mem.__dict__[key] != mem.__dict__[key]:
+                if getattr(cur_mem, key) != getattr(mem, key):
                     raise errors.RadioError("Editing field `%s' " % key +
                                         "is not supported on this channel")
 
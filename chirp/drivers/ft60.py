@@ -337,6 +337,21 @@ class FT60BankModel(chirp_common.BankModel):
                 banks.append(bank)
         return banks
 
+    def get_all_memory_mappings(self, lo, hi):
+        table = {}
+        _memory = self._radio._memobj.memory
+        for bank in self.get_mappings():
+            # One bit per memory, eight memories per byte
+            bits = [ord(b) for b in
+                    self._radio._memobj.banks[bank.index].memory.get_raw()]
+            for number in range(max(lo, 1), min(hi, len(bits) * 8) + 1):
+                if bits[(number - 1) / 8] & (1 << ((number - 1) & 7)):
+                    table.setdefault(number, ([], []))[0].append(bank)
+        for number in table.keys():
+            if not _memory[number - 1].used:
+                del table[number]
+        return table
+
 
 @directory.register
 class FT60Radio(yaesu_clone.YaesuCloneModeRadio):
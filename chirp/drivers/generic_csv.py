@@ -27,6 +27,41 @@ class OmittedHeaderError(Exception):
     pass
 
 
+class ColumnMap(list):
+    """A list of CSV headers with a precompiled header->column index.
+
+    This behaves like the plain list of headers read from the file, but
+    membership tests and index() lookups are constant-time, and the columns
+    that map to memory attributes (per @attr_map) are resolved once instead
+    of for every line of the file."""
+
+    def __init__(self, headers, attr_map=None):
+        list.__init__(self, headers)
+        self.source = headers
+        self._index = {}
+        for i, header in enumerate(headers):
+            self._index.setdefault(header, i)
+
+        # (column, header, type, attribute) for each mapped column, in
+        # header order
+        self.columns = []
+        for header, i in sorted(self._index.items(), key=lambda x: x[1]):
+            try:
+                typ, attr = (attr_map or {})[header]
+            except KeyError:
+                continue
+            self.columns.append((i, header, typ, attr))
+
+    def __contains__(self, header):
+        return header in self._index
+
+    def index(self, header):
+        try:
+            return self._index[header]
+        except KeyError:
+            raise ValueError("%s is not in list" % header)
+
+
 def get_datum_by_header(headers, data, header):
     """Return the column corresponding to @headers[@header] from @data"""
     if header not in headers:
@@ -46,6 +81,24 @@ def write_memory(writer, mem):
     writer.writerow(mem.to_csv())
 
 
+def write_memories(writer, mems):
+    """Write all the non-empty memories from the iterable @mems using
+    @writer in a single pass"""
+    writer.writerows(mem.to_csv() for mem in mems if not mem.empty)
+
+
+def write_csv(filename, mems):
+    """Write a CHIRP-format CSV file of @mems to @filename. The memories
+    may come from any iterable, so they need not all be held in memory"""
+    f = file(filename, "wb")
+    try:
+        writer = csv.writer(f, delimiter=chirp_common.SEPCHAR)
+        writer.writerow(chirp_common.Memory.CSV_FORMAT)
+        write_memories(writer, mems)
+    finally:
+        f.close()
+
+
 @directory.register
 class CSVRadio(chirp_common.FileBackedRadio):
     """A driver for Generic CSV files"""
@@ -82,6 +135,8 @@ class CSVRadio(chirp_common.FileBackedRadio):
         self.memories = []
         self.file_has_rTone = None  # Set in load(), used in _clean_tmode()
         self.file_has_cTone = None
+        self._column_map = None
+        self._cleaners = {}
 
         self._filename = pipe
         if self._filename and os.path.exists(self._filename):
@@ -110,16 +165,37 @@ class CSVRadio(chirp_common.FileBackedRadio):
 
         return rf
 
+    def _get_column_map(self, headers):
+        """Return a ColumnMap for @headers, reusing the one compiled for
+        the previous line if the headers are the same"""
+        if isinstance(headers, ColumnMap):
+            return headers
+        if self._column_map is None or self._column_map.source is not headers:
+            self._column_map = ColumnMap(headers, self.ATTR_MAP)
+        return self._column_map
+
+    def _get_cleaners(self, mem):
+        """Return the _clean_* methods that apply to @mem's attributes"""
+        try:
+            return self._cleaners[mem.__class__]
+        except KeyError:
+            pass
+        cleaners = []
+        for attr in dir(mem):
+            fname = "_clean_%s" % attr
+            if hasattr(self, fname):
+                cleaners.append(getattr(self, fname))
+        self._cleaners[mem.__class__] = cleaners
+        return cleaners
+
     def _clean(self, headers, line, mem):
         """Runs post-processing functions on new mem objects.
 
         This is useful for parsing other CSV dialects when multiple columns
         convert to a single Chirp column."""
 
-        for attr in dir(mem):
-            fname = "_clean_%s" % attr
-            if hasattr(self, fname):
-                mem = getattr(self, fname)(headers, line, mem)
+        for cleaner in self._get_cleaners(mem):
+            mem = cleaner(headers, line, mem)
 
         return mem
 
@@ -135,6 +211,8 @@ class CSVRadio(chirp_common.FileBackedRadio):
         return mem
 
     def _parse_csv_data_line(self, headers, line):
+        headers = self._get_column_map(headers)
+
         mem = chirp_common.Memory()
         try:
             if get_datum_by_header(headers, line, "Mode") == "DV":
@@ -142,47 +220,51 @@ class CSVRadio(chirp_common.FileBackedRadio):
         except OmittedHeaderError:
             pass
 
-        for header in headers:
+        for column, header, typ, attr in headers.columns:
             try:
-                typ, attr = self.ATTR_MAP[header]
-            except KeyError:
+                val = line[column]
+            except IndexError:
                 continue
             try:
-                val = get_datum_by_header(headers, line, header)
                 if not val and typ == int:
                     val = None
                 else:
                     val = typ(val)
                 if hasattr(mem, attr):
                     setattr(mem, attr, val)
-            except OmittedHeaderError, e:
-                pass
             except Exception, e:
                 raise Exception("[%s] %s" % (attr, e))
 
         return self._clean(headers, line, mem)
 
-    def load(self, filename=None):
+    def _open(self, filename=None):
         if filename is None and self._filename is None:
             raise errors.RadioError("Need a location to load from")
 
         if filename:
             self._filename = filename
 
-        self._blank()
+        return file(self._filename, "rU")
 
-        f = file(self._filename, "rU")
-        header = f.readline().strip()
+    def iter_memories(self, filename=None):
+        """Parse the CSV file and yield each valid memory as it is read,
+        without storing them in the radio. Lines that fail to parse are
+        logged and recorded in self.errors, as with load()."""
+        f = self._open(filename)
+        try:
+            for mem in self._iter_csv(f):
+                yield mem
+        finally:
+            f.close()
 
-        f.seek(0, 0)
+    def _iter_csv(self, f):
         reader = csv.reader(f, delimiter=chirp_common.SEPCHAR, quotechar='"')
 
-        good = 0
         lineno = 0
         for line in reader:
             lineno += 1
             if lineno == 1:
-                header = line
+                header = self._get_column_map(line)
                 self.file_has_rTone = "rToneFreq" in header
                 self.file_has_cTone = "cToneFreq" in header
                 continue
@@ -203,9 +285,21 @@ class CSVRadio(chirp_common.FileBackedRadio):
                 self.errors.append("Line %i: %s" % (lineno, e))
                 continue
 
-            self._grow(mem.number)
-            self.memories[mem.number] = mem
-            good += 1
+            yield mem
+
+    def load(self, filename=None):
+        f = self._open(filename)
+
+        self._blank()
+
+        good = 0
+        try:
+            for mem in self._iter_csv(f):
+                self._grow(mem.number)
+                self.memories[mem.number] = mem
+                good += 1
+        finally:
+            f.close()
 
         if not good:
             LOG.error(self.errors)
@@ -218,14 +312,7 @@ class CSVRadio(chirp_common.FileBackedRadio):
         if filename:
             self._filename = filename
 
-        f = file(self._filename, "wb")
-        writer = csv.writer(f, delimiter=chirp_common.SEPCHAR)
-        writer.writerow(chirp_common.Memory.CSV_FORMAT)
-
-        for mem in self.memories:
-            write_memory(writer, mem)
-
-        f.close()
+        write_csv(self._filename, self.memories)
 
     # MMAP compatibility
     def save_mmap(self, filename):
@@ -21,7 +21,7 @@ import unittest
 import logging
 
 from chirp import chirp_common, directory, memmap
-from chirp import bitwise, errors, util
+from chirp import bitwise, errors, tonecodec, util
 from chirp.settings import RadioSetting, RadioSettingGroup, \
     RadioSettingValueInteger, RadioSettingValueList, \
     RadioSettingValueBoolean, RadioSettings
@@ -347,28 +347,10 @@ class H777Radio(chirp_common.CloneModeRadio):
         return repr(self._memobj.memory[number - 1])
 
     def _decode_tone(self, val):
-        val = int(val)
-        if val == 16665:
-            return '', None, None
-        elif val >= 12000:
-            return 'DTCS', val - 12000, 'R'
-        elif val >= 8000:
-            return 'DTCS', val - 8000, 'N'
-        else:
-            return 'Tone', val / 10.0, None
+        return tonecodec.get_bcd_tone(val)
 
     def _encode_tone(self, memval, mode, value, pol):
-        if mode == '':
-            memval[0].set_raw(0xFF)
-            memval[1].set_raw(0xFF)
-        elif mode == 'Tone':
-            memval.set_value(int(value * 10))
-        elif mode == 'DTCS':
-            flag = 0x80 if pol == 'N' else 0xC0
-            memval.set_value(value)
-            memval[1].set_bits(flag)
-        else:
-            raise Exception("Internal error: invalid mode `%s'" % mode)
+        tonecodec.set_bcd_tone(memval, mode, value, pol)
 
     def get_memory(self, number):
         _mem = self._memobj.memory[number - 1]
@@ -37,20 +37,22 @@ DV_MEM_LEN = 60
 # Dirty hack until I clean up this IC9x mess
 class IC9xMemory(chirp_common.Memory):
     """A dirty hack to stash bank information in a memory"""
-    _bank = None
-    _bank_index = 0
+    __slots__ = ["_bank", "_bank_index"]
 
     def __init__(self):
         chirp_common.Memory.__init__(self)
+        self._bank = None
+        self._bank_index = 0
 
 
 class IC9xDVMemory(chirp_common.DVMemory):
     """See above dirty hack"""
-    _bank = None
-    _bank_index = 0
+    __slots__ = ["_bank", "_bank_index"]
 
     def __init__(self):
         chirp_common.DVMemory.__init__(self)
+        self._bank = None
+        self._bank_index = 0
 
 
 def _ic9x_parse_frames(buf):
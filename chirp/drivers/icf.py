@@ -551,6 +551,19 @@ class IcomBankModel(chirp_common.BankModel):
         else:
             return [self.get_mappings()[index]]
 
+    def get_all_memory_mappings(self, lo, hi):
+        banks = self.get_mappings()
+        table = {}
+        for number in range(lo, hi + 1):
+            index = self._radio._get_bank(number)
+            if index is None or self._radio.get_memory(number).empty:
+                continue
+            indexes = []
+            if isinstance(self, chirp_common.MappingModelIndexInterface):
+                indexes.append(self._radio._get_bank_index(number))
+            table[number] = ([banks[index]], indexes)
+        return table
+
 
 class IcomIndexedBankModel(IcomBankModel,
                            chirp_common.MappingModelIndexInterface):
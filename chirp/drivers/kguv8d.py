@@ -19,6 +19,7 @@ import time
 import os
 import logging
 from chirp import util, chirp_common, bitwise, memmap, errors, directory
+from chirp import tonecodec
 from chirp.settings import RadioSetting, RadioSettingGroup, \
     RadioSettingValueBoolean, RadioSettingValueList, \
     RadioSettingValueInteger, RadioSettingValueString, \
@@ -497,7 +498,7 @@ class KGUV8DRadio(chirp_common.CloneModeRadio,
 
     def _get_tone(self, _mem, mem):
         def _get_dcs(val):
-            code = int("%03o" % (val & 0x07FF))
+            code = tonecodec.octal_to_dcs(val)
             pol = (val & 0x8000) and "R" or "N"
             return code, pol
 
@@ -585,7 +586,7 @@ class KGUV8DRadio(chirp_common.CloneModeRadio,
 
     def _set_tone(self, mem, _mem):
         def _set_dcs(code, pol):
-            val = int("%i" % code, 8) + 0x2800
+            val = tonecodec.dcs_to_octal(code) + 0x2800
             if pol == "R":
                 val += 0x8000
             return val
@@ -26,6 +26,7 @@ import logging
 import struct
 import string
 from chirp import util, chirp_common, bitwise, memmap, errors, directory
+from chirp import tonecodec
 from chirp.settings import RadioSetting, RadioSettingValue, \
      RadioSettingGroup, \
      RadioSettingValueBoolean, RadioSettingValueList, \
@@ -1141,7 +1142,7 @@ class KGUV9DPlusRadio(chirp_common.CloneModeRadio,
         from the UI fields
         """
         def _set_dcs(code, pol):
-            val = int("%i" % code, 8) | 0x8000
+            val = tonecodec.dcs_to_octal(code) | 0x8000
             if pol == "R":
                 val |= 0x4000
             return val
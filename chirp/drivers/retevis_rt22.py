@@ -19,7 +19,7 @@ import struct
 import logging
 
 from chirp import chirp_common, directory, memmap
-from chirp import bitwise, errors, util
+from chirp import bitwise, errors, tonecodec, util
 from chirp.settings import RadioSetting, RadioSettingGroup, \
     RadioSettingValueInteger, RadioSettingValueList, \
     RadioSettingValueBoolean, RadioSettings, \
@@ -413,7 +413,7 @@ class RT22Radio(chirp_common.CloneModeRadio):
 
     def _get_tone(self, _mem, mem):
         def _get_dcs(val):
-            code = int("%03o" % (val & 0x07FF))
+            code = tonecodec.octal_to_dcs(val)
             pol = (val & 0x8000) and "R" or "N"
             return code, pol
 
@@ -508,7 +508,7 @@ class RT22Radio(chirp_common.CloneModeRadio):
 
     def _set_tone(self, mem, _mem):
         def _set_dcs(code, pol):
-            val = int("%i" % code, 8) + 0x2800
+            val = tonecodec.dcs_to_octal(code) + 0x2800
             if pol == "R":
                 val += 0x8000
             return val
@@ -20,7 +20,7 @@ import re
 import logging
 
 from chirp import chirp_common, directory, memmap
-from chirp import bitwise, errors, util
+from chirp import bitwise, errors, tonecodec, util
 from chirp.settings import RadioSetting, RadioSettingGroup, \
     RadioSettingValueInteger, RadioSettingValueList, \
     RadioSettingValueBoolean, RadioSettingValueString, \
@@ -431,33 +431,11 @@ class RT23Radio(chirp_common.CloneModeRadio):
     def decode_tone(self, val):
         """Parse the tone data to decode from mem, it returns:
         Mode (''|DTCS|Tone), Value (None|###), Polarity (None,N,R)"""
-        if val.get_raw() == "\xFF\xFF":
-            return '', None, None
-
-        val = int(val)
-        if val >= 12000:
-            a = val - 12000
-            return 'DTCS', a, 'R'
-        elif val >= 8000:
-            a = val - 8000
-            return 'DTCS', a, 'N'
-        else:
-            a = val / 10.0
-            return 'Tone', a, None
+        return tonecodec.get_bcd_tone(val)
 
     def encode_tone(self, memval, mode, value, pol):
         """Parse the tone data to encode from UI to mem"""
-        if mode == '':
-            memval[0].set_raw(0xFF)
-            memval[1].set_raw(0xFF)
-        elif mode == 'Tone':
-            memval.set_value(int(value * 10))
-        elif mode == 'DTCS':
-            flag = 0x80 if pol == 'N' else 0xC0
-            memval.set_value(value)
-            memval[1].set_bits(flag)
-        else:
-            raise Exception("Internal error: invalid mode `%s'" % mode)
+        tonecodec.set_bcd_tone(memval, mode, value, pol)
 
     def get_memory(self, number):
         mem = chirp_common.Memory()
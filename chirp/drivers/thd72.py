@@ -15,7 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from chirp import chirp_common, errors, util, directory
-from chirp import bitwise, memmap
+from chirp import bitwise, memmap, probecache
 from chirp.settings import RadioSettingGroup, RadioSetting, RadioSettings
 from chirp.settings import RadioSettingValueInteger, RadioSettingValueString
 from chirp.settings import RadioSettingValueList, RadioSettingValueBoolean
@@ -257,7 +257,10 @@ class THD72Radio(chirp_common.CloneModeRadio):
         self._dirty_blocks = []
 
     def _detect_baud(self):
-        for baud in [9600, 19200, 38400, 57600]:
+        # Try the rate the radio last answered at on this port first
+        port = getattr(self.pipe, "port", None)
+        cache = probecache.get_cache()
+        for baud in cache.order("thd72", port, [9600, 19200, 38400, 57600]):
             self.pipe.baudrate = baud
             try:
                 self.pipe.write("\r\r")
@@ -267,6 +270,7 @@ class THD72Radio(chirp_common.CloneModeRadio):
             try:
                 id = self.get_id()
                 LOG.info("Radio %s at %i baud" % (id, baud))
+                cache.remember("thd72", port, baud)
                 return True
             except errors.RadioError:
                 pass
@@ -402,9 +406,17 @@ class THD72Radio(chirp_common.CloneModeRadio):
         if mem.number < 999:
             flag.skip = chirp_common.SKIP_VALUES.index(mem.skip)
 
+    def get_sparse_layout(self):
+        return mem_format
+
     def sync_in(self):
         self._detect_baud()
-        self._mmap = self.download()
+        blocks = [addr / 256 for addr in
+                  self.get_download_blocks(0, self._memsize, 256)]
+        data = self.download(raw=True, blocks=blocks)
+        self._mmap = memmap.MemoryMap(self.assemble_download(
+            dict((i * 256, data[i * 256:(i + 1) * 256]) for i in blocks),
+            self._memsize))
         self.process_mmap()
 
     def sync_out(self):
@@ -412,7 +424,8 @@ class THD72Radio(chirp_common.CloneModeRadio):
         if len(self._dirty_blocks):
             self.upload(self._dirty_blocks)
         else:
-            self.upload()
+            self.upload([addr / 256 for addr in self.get_upload_blocks(
+                0, self._memsize - 512, 256)])
 
     def read_block(self, block, count=256):
         self.pipe.write(struct.pack("<cBHB", "R", 0, block, 0))
@@ -19,11 +19,12 @@ import os
 import logging
 
 from chirp import chirp_common, errors, util, directory, memmap
-from chirp import bitwise
+from chirp import bitwise, tonecodec
 from chirp.settings import RadioSetting, RadioSettingGroup, \
     RadioSettingValueInteger, RadioSettingValueList, \
     RadioSettingValueBoolean, RadioSettingValueString, \
-    RadioSettingValueFloat, InvalidValueError, RadioSettings
+    RadioSettingValueFloat, InvalidValueError, RadioSettings, \
+    get_setting_paths, LazyRadioSettingGroup
 from textwrap import dedent
 
 LOG = logging.getLogger(__name__)
@@ -699,6 +700,7 @@ UV5R_POWER_LEVELS3 = [chirp_common.PowerLevel("High", watts=8.00),
                       chirp_common.PowerLevel("Low",  watts=1.00)]
 
 UV5R_DTCS = sorted(chirp_common.DTCS_CODES + [645])
+UV5R_TONE_WORD = tonecodec.get_indexed_tone_word(UV5R_DTCS)
 
 UV5R_CHARSET = chirp_common.CHARSET_UPPER_NUMERIC + \
     "!@#$%^&*()+-=[]:\";'<>?,./"
@@ -741,6 +743,7 @@ class BaofengUV5R(chirp_common.CloneModeRadio):
     # offset of fw version in image file
     _fw_ver_file_start = 0x1838
     _fw_ver_file_stop = 0x1846
+    _memory_arrays = ("memory", "names")
 
     _ranges_main = [
                     (0x0008, 0x1808),
@@ -779,6 +782,7 @@ class BaofengUV5R(chirp_common.CloneModeRadio):
     def get_features(self):
         rf = chirp_common.RadioFeatures()
         rf.has_settings = True
+        rf.can_set_changed_only = True
         rf.has_bank = False
         rf.has_cross = True
         rf.has_rx_dtcs = True
@@ -915,37 +919,19 @@ class BaofengUV5R(chirp_common.CloneModeRadio):
 
         dtcs_pol = ["N", "N"]
 
-        if _mem.txtone in [0, 0xFFFF]:
-            txmode = ""
-        elif _mem.txtone >= 0x0258:
-            txmode = "Tone"
-            mem.rtone = int(_mem.txtone) / 10.0
-        elif _mem.txtone <= 0x0258:
-            txmode = "DTCS"
-            if _mem.txtone > 0x69:
-                index = _mem.txtone - 0x6A
-                dtcs_pol[0] = "R"
-            else:
-                index = _mem.txtone - 1
-            mem.dtcs = UV5R_DTCS[index]
-        else:
-            LOG.warn("Bug: txtone is %04x" % _mem.txtone)
-
-        if _mem.rxtone in [0, 0xFFFF]:
-            rxmode = ""
-        elif _mem.rxtone >= 0x0258:
-            rxmode = "Tone"
-            mem.ctone = int(_mem.rxtone) / 10.0
-        elif _mem.rxtone <= 0x0258:
-            rxmode = "DTCS"
-            if _mem.rxtone >= 0x6A:
-                index = _mem.rxtone - 0x6A
-                dtcs_pol[1] = "R"
-            else:
-                index = _mem.rxtone - 1
-            mem.rx_dtcs = UV5R_DTCS[index]
-        else:
-            LOG.warn("Bug: rxtone is %04x" % _mem.rxtone)
+        txmode, txval, txpol = UV5R_TONE_WORD.decode(_mem.txtone)
+        if txmode == "Tone":
+            mem.rtone = txval
+        elif txmode == "DTCS":
+            mem.dtcs = txval
+            dtcs_pol[0] = txpol
+
+        rxmode, rxval, rxpol = UV5R_TONE_WORD.decode(_mem.rxtone)
+        if rxmode == "Tone":
+            mem.ctone = rxval
+        elif rxmode == "DTCS":
+            mem.rx_dtcs = rxval
+            dtcs_pol[1] = rxpol
 
         if txmode == "Tone" and not rxmode:
             mem.tmode = "Tone"
@@ -1072,39 +1058,10 @@ class BaofengUV5R(chirp_common.CloneModeRadio):
             except IndexError:
                 _nam.name[i] = "\xFF"
 
-        rxmode = txmode = ""
-        if mem.tmode == "Tone":
-            _mem.txtone = int(mem.rtone * 10)
-            _mem.rxtone = 0
-        elif mem.tmode == "TSQL":
-            _mem.txtone = int(mem.ctone * 10)
-            _mem.rxtone = int(mem.ctone * 10)
-        elif mem.tmode == "DTCS":
-            rxmode = txmode = "DTCS"
-            _mem.txtone = UV5R_DTCS.index(mem.dtcs) + 1
-            _mem.rxtone = UV5R_DTCS.index(mem.dtcs) + 1
-        elif mem.tmode == "Cross":
-            txmode, rxmode = mem.cross_mode.split("->", 1)
-            if txmode == "Tone":
-                _mem.txtone = int(mem.rtone * 10)
-            elif txmode == "DTCS":
-                _mem.txtone = UV5R_DTCS.index(mem.dtcs) + 1
-            else:
-                _mem.txtone = 0
-            if rxmode == "Tone":
-                _mem.rxtone = int(mem.ctone * 10)
-            elif rxmode == "DTCS":
-                _mem.rxtone = UV5R_DTCS.index(mem.rx_dtcs) + 1
-            else:
-                _mem.rxtone = 0
-        else:
-            _mem.rxtone = 0
-            _mem.txtone = 0
-
-        if txmode == "DTCS" and mem.dtcs_polarity[0] == "R":
-            _mem.txtone += 0x69
-        if rxmode == "DTCS" and mem.dtcs_polarity[1] == "R":
-            _mem.rxtone += 0x69
+        ((txmode, txtone, txpol),
+         (rxmode, rxtone, rxpol)) = chirp_common.split_tone_encode(mem)
+        _mem.txtone = UV5R_TONE_WORD.encode(txmode, txtone, txpol)
+        _mem.rxtone = UV5R_TONE_WORD.encode(rxmode, rxtone, rxpol)
 
         _mem.scan = mem.skip != "S"
         _mem.wide = mem.mode == "FM"
@@ -1154,13 +1111,8 @@ class BaofengUV5R(chirp_common.CloneModeRadio):
         return band_tag
 
     def _get_settings(self):
-        _ani = self._memobj.ani
         _fm_presets = self._memobj.fm_presets
         _settings = self._memobj.settings
-        _squelch = self._memobj.squelch_new
-        _vfoa = self._memobj.vfoa
-        _vfob = self._memobj.vfob
-        _wmchannel = self._memobj.wmchannel
         basic = RadioSettingGroup("basic", "Basic Settings")
         advanced = RadioSettingGroup("advanced", "Advanced Settings")
 
@@ -1371,275 +1323,301 @@ class BaofengUV5R(chirp_common.CloneModeRadio):
             return group
 
         if self.MODEL != "UV-6":
-            other = RadioSettingGroup("other", "Other Settings")
-            group.append(other)
-
-            def _filter(name):
-                filtered = ""
-                for char in str(name):
-                    if char in chirp_common.CHARSET_ASCII:
-                        filtered += char
-                    else:
-                        filtered += " "
-                return filtered
-
-            _msg = self._memobj.firmware_msg
-            val = RadioSettingValueString(0, 7, _filter(_msg.line1))
-            val.set_mutable(False)
-            rs = RadioSetting("firmware_msg.line1", "Firmware Message 1", val)
-            other.append(rs)
-
-            val = RadioSettingValueString(0, 7, _filter(_msg.line2))
-            val.set_mutable(False)
-            rs = RadioSetting("firmware_msg.line2", "Firmware Message 2", val)
-            other.append(rs)
-
-            _msg = self._memobj.sixpoweron_msg
-            rs = RadioSetting("sixpoweron_msg.line1", "6+Power-On Message 1",
-                              RadioSettingValueString(
-                                  0, 7, _filter(_msg.line1)))
-            other.append(rs)
-            rs = RadioSetting("sixpoweron_msg.line2", "6+Power-On Message 2",
-                              RadioSettingValueString(
-                                  0, 7, _filter(_msg.line2)))
-            other.append(rs)
-
-            _msg = self._memobj.poweron_msg
-            rs = RadioSetting("poweron_msg.line1", "Power-On Message 1",
-                              RadioSettingValueString(
-                                  0, 7, _filter(_msg.line1)))
-            other.append(rs)
-            rs = RadioSetting("poweron_msg.line2", "Power-On Message 2",
-                              RadioSettingValueString(
-                                  0, 7, _filter(_msg.line2)))
-            other.append(rs)
-
-            rs = RadioSetting("ponmsg", "Power-On Message",
-                              RadioSettingValueList(
-                                  PONMSG_LIST, PONMSG_LIST[_settings.ponmsg]))
-            other.append(rs)
+            group.append(LazyRadioSettingGroup(
+                "other", "Other Settings", self._get_other_settings))
+            group.append(LazyRadioSettingGroup(
+                "workmode", "Work Mode Settings",
+                self._get_workmode_settings))
 
-            if self._is_orig():
-                limit = "limits_old"
-            else:
-                limit = "limits_new"
-
-            vhf_limit = getattr(self._memobj, limit).vhf
-            rs = RadioSetting("%s.vhf.lower" % limit, "VHF Lower Limit (MHz)",
-                              RadioSettingValueInteger(1, 1000,
-                                                       vhf_limit.lower))
-            other.append(rs)
-
-            rs = RadioSetting("%s.vhf.upper" % limit, "VHF Upper Limit (MHz)",
-                              RadioSettingValueInteger(1, 1000,
-                                                       vhf_limit.upper))
-            other.append(rs)
-
-            rs = RadioSetting("%s.vhf.enable" % limit, "VHF TX Enabled",
-                              RadioSettingValueBoolean(vhf_limit.enable))
-            other.append(rs)
-
-            uhf_limit = getattr(self._memobj, limit).uhf
-            rs = RadioSetting("%s.uhf.lower" % limit, "UHF Lower Limit (MHz)",
-                              RadioSettingValueInteger(1, 1000,
-                                                       uhf_limit.lower))
-            other.append(rs)
-            rs = RadioSetting("%s.uhf.upper" % limit, "UHF Upper Limit (MHz)",
-                              RadioSettingValueInteger(1, 1000,
-                                                       uhf_limit.upper))
-            other.append(rs)
-            rs = RadioSetting("%s.uhf.enable" % limit, "UHF TX Enabled",
-                              RadioSettingValueBoolean(uhf_limit.enable))
-            other.append(rs)
+        fm_preset = RadioSettingGroup("fm_preset", "FM Radio Preset")
+        group.append(fm_preset)
 
-        if self.MODEL != "UV-6":
-            workmode = RadioSettingGroup("workmode", "Work Mode Settings")
-            group.append(workmode)
+        if _fm_presets <= 108.0 * 10 - 650:
+            preset = _fm_presets / 10.0 + 65
+        elif _fm_presets >= 65.0 * 10 and _fm_presets <= 108.0 * 10:
+            preset = _fm_presets / 10.0
+        else:
+            preset = 76.0
+        rs = RadioSetting("fm_presets", "FM Preset(MHz)",
+                          RadioSettingValueFloat(65, 108.0, preset, 0.1, 1))
+        fm_preset.append(rs)
 
-            rs = RadioSetting("displayab", "Display",
-                              RadioSettingValueList(
-                                  AB_LIST, AB_LIST[_settings.displayab]))
-            workmode.append(rs)
+        group.append(LazyRadioSettingGroup(
+            "dtmf", "DTMF Settings", self._get_dtmf_settings))
 
-            rs = RadioSetting("workmode", "VFO/MR Mode",
-                              RadioSettingValueList(
-                                  WORKMODE_LIST,
-                                  WORKMODE_LIST[_settings.workmode]))
-            workmode.append(rs)
+        if not self._is_orig() and self._aux_block:
+            group.append(LazyRadioSettingGroup(
+                "service", "Service Settings",
+                self._get_service_settings))
 
-            rs = RadioSetting("keylock", "Keypad Lock",
-                              RadioSettingValueBoolean(_settings.keylock))
-            workmode.append(rs)
+        return group
 
-            rs = RadioSetting("wmchannel.mrcha", "MR A Channel",
-                              RadioSettingValueInteger(0, 127,
-                                                       _wmchannel.mrcha))
-            workmode.append(rs)
+    def _get_other_settings(self):
+        _settings = self._memobj.settings
+        other = []
 
-            rs = RadioSetting("wmchannel.mrchb", "MR B Channel",
-                              RadioSettingValueInteger(0, 127,
-                                                       _wmchannel.mrchb))
-            workmode.append(rs)
+        def _filter(name):
+            filtered = ""
+            for char in str(name):
+                if char in chirp_common.CHARSET_ASCII:
+                    filtered += char
+                else:
+                    filtered += " "
+            return filtered
+
+        _msg = self._memobj.firmware_msg
+        val = RadioSettingValueString(0, 7, _filter(_msg.line1))
+        val.set_mutable(False)
+        rs = RadioSetting("firmware_msg.line1", "Firmware Message 1", val)
+        other.append(rs)
+
+        val = RadioSettingValueString(0, 7, _filter(_msg.line2))
+        val.set_mutable(False)
+        rs = RadioSetting("firmware_msg.line2", "Firmware Message 2", val)
+        other.append(rs)
+
+        _msg = self._memobj.sixpoweron_msg
+        rs = RadioSetting("sixpoweron_msg.line1", "6+Power-On Message 1",
+                          RadioSettingValueString(
+                              0, 7, _filter(_msg.line1)))
+        other.append(rs)
+        rs = RadioSetting("sixpoweron_msg.line2", "6+Power-On Message 2",
+                          RadioSettingValueString(
+                              0, 7, _filter(_msg.line2)))
+        other.append(rs)
+
+        _msg = self._memobj.poweron_msg
+        rs = RadioSetting("poweron_msg.line1", "Power-On Message 1",
+                          RadioSettingValueString(
+                              0, 7, _filter(_msg.line1)))
+        other.append(rs)
+        rs = RadioSetting("poweron_msg.line2", "Power-On Message 2",
+                          RadioSettingValueString(
+                              0, 7, _filter(_msg.line2)))
+        other.append(rs)
+
+        rs = RadioSetting("ponmsg", "Power-On Message",
+                          RadioSettingValueList(
+                              PONMSG_LIST, PONMSG_LIST[_settings.ponmsg]))
+        other.append(rs)
 
-            def convert_bytes_to_freq(bytes):
-                real_freq = 0
-                for byte in bytes:
-                    real_freq = (real_freq * 10) + byte
-                return chirp_common.format_freq(real_freq * 10)
-
-            def my_validate(value):
-                value = chirp_common.parse_freq(value)
-                if 17400000 <= value and value < 40000000:
-                    msg = ("Can't be between 174.00000-400.00000")
-                    raise InvalidValueError(msg)
-                return chirp_common.format_freq(value)
-
-            def apply_freq(setting, obj):
-                value = chirp_common.parse_freq(str(setting.value)) / 10
-                obj.band = value >= 40000000
-                for i in range(7, -1, -1):
-                    obj.freq[i] = value % 10
-                    value /= 10
-
-            val1a = RadioSettingValueString(0, 10,
-                                            convert_bytes_to_freq(_vfoa.freq))
-            val1a.set_validate_callback(my_validate)
-            rs = RadioSetting("vfoa.freq", "VFO A Frequency", val1a)
-            rs.set_apply_callback(apply_freq, _vfoa)
-            workmode.append(rs)
+        if self._is_orig():
+            limit = "limits_old"
+        else:
+            limit = "limits_new"
+
+        vhf_limit = getattr(self._memobj, limit).vhf
+        rs = RadioSetting("%s.vhf.lower" % limit, "VHF Lower Limit (MHz)",
+                          RadioSettingValueInteger(1, 1000,
+                                                   vhf_limit.lower))
+        other.append(rs)
+
+        rs = RadioSetting("%s.vhf.upper" % limit, "VHF Upper Limit (MHz)",
+                          RadioSettingValueInteger(1, 1000,
+                                                   vhf_limit.upper))
+        other.append(rs)
+
+        rs = RadioSetting("%s.vhf.enable" % limit, "VHF TX Enabled",
+                          RadioSettingValueBoolean(vhf_limit.enable))
+        other.append(rs)
+
+        uhf_limit = getattr(self._memobj, limit).uhf
+        rs = RadioSetting("%s.uhf.lower" % limit, "UHF Lower Limit (MHz)",
+                          RadioSettingValueInteger(1, 1000,
+                                                   uhf_limit.lower))
+        other.append(rs)
+        rs = RadioSetting("%s.uhf.upper" % limit, "UHF Upper Limit (MHz)",
+                          RadioSettingValueInteger(1, 1000,
+                                                   uhf_limit.upper))
+        other.append(rs)
+        rs = RadioSetting("%s.uhf.enable" % limit, "UHF TX Enabled",
+                          RadioSettingValueBoolean(uhf_limit.enable))
+        other.append(rs)
+
+        return other
+
+    def _get_workmode_settings(self):
+        _settings = self._memobj.settings
+        _vfoa = self._memobj.vfoa
+        _vfob = self._memobj.vfob
+        _wmchannel = self._memobj.wmchannel
+        workmode = []
 
-            val1b = RadioSettingValueString(0, 10,
-                                            convert_bytes_to_freq(_vfob.freq))
-            val1b.set_validate_callback(my_validate)
-            rs = RadioSetting("vfob.freq", "VFO B Frequency", val1b)
-            rs.set_apply_callback(apply_freq, _vfob)
-            workmode.append(rs)
+        rs = RadioSetting("displayab", "Display",
+                          RadioSettingValueList(
+                              AB_LIST, AB_LIST[_settings.displayab]))
+        workmode.append(rs)
+
+        rs = RadioSetting("workmode", "VFO/MR Mode",
+                          RadioSettingValueList(
+                              WORKMODE_LIST,
+                              WORKMODE_LIST[_settings.workmode]))
+        workmode.append(rs)
+
+        rs = RadioSetting("keylock", "Keypad Lock",
+                          RadioSettingValueBoolean(_settings.keylock))
+        workmode.append(rs)
+
+        rs = RadioSetting("wmchannel.mrcha", "MR A Channel",
+                          RadioSettingValueInteger(0, 127,
+                                                   _wmchannel.mrcha))
+        workmode.append(rs)
+
+        rs = RadioSetting("wmchannel.mrchb", "MR B Channel",
+                          RadioSettingValueInteger(0, 127,
+                                                   _wmchannel.mrchb))
+        workmode.append(rs)
+
+        def convert_bytes_to_freq(bytes):
+            real_freq = 0
+            for byte in bytes:
+                real_freq = (real_freq * 10) + byte
+            return chirp_common.format_freq(real_freq * 10)
+
+        def my_validate(value):
+            value = chirp_common.parse_freq(value)
+            if 17400000 <= value and value < 40000000:
+                msg = ("Can't be between 174.00000-400.00000")
+                raise InvalidValueError(msg)
+            return chirp_common.format_freq(value)
+
+        def apply_freq(setting, obj):
+            value = chirp_common.parse_freq(str(setting.value)) / 10
+            obj.band = value >= 40000000
+            for i in range(7, -1, -1):
+                obj.freq[i] = value % 10
+                value /= 10
+
+        val1a = RadioSettingValueString(0, 10,
+                                        convert_bytes_to_freq(_vfoa.freq))
+        val1a.set_validate_callback(my_validate)
+        rs = RadioSetting("vfoa.freq", "VFO A Frequency", val1a)
+        rs.set_apply_callback(apply_freq, _vfoa)
+        workmode.append(rs)
+
+        val1b = RadioSettingValueString(0, 10,
+                                        convert_bytes_to_freq(_vfob.freq))
+        val1b.set_validate_callback(my_validate)
+        rs = RadioSetting("vfob.freq", "VFO B Frequency", val1b)
+        rs.set_apply_callback(apply_freq, _vfob)
+        workmode.append(rs)
+
+        rs = RadioSetting("vfoa.sftd", "VFO A Shift",
+                          RadioSettingValueList(
+                              SHIFTD_LIST, SHIFTD_LIST[_vfoa.sftd]))
+        workmode.append(rs)
+
+        rs = RadioSetting("vfob.sftd", "VFO B Shift",
+                          RadioSettingValueList(
+                              SHIFTD_LIST, SHIFTD_LIST[_vfob.sftd]))
+        workmode.append(rs)
+
+        def convert_bytes_to_offset(bytes):
+            real_offset = 0
+            for byte in bytes:
+                real_offset = (real_offset * 10) + byte
+            return chirp_common.format_freq(real_offset * 1000)
+
+        def apply_offset(setting, obj):
+            value = chirp_common.parse_freq(str(setting.value)) / 1000
+            for i in range(5, -1, -1):
+                obj.offset[i] = value % 10
+                value /= 10
+
+        val1a = RadioSettingValueString(
+            0, 10, convert_bytes_to_offset(_vfoa.offset))
+        rs = RadioSetting("vfoa.offset",
+                          "VFO A Offset (0.0-999.999)", val1a)
+        rs.set_apply_callback(apply_offset, _vfoa)
+        workmode.append(rs)
+
+        val1b = RadioSettingValueString(
+            0, 10, convert_bytes_to_offset(_vfob.offset))
+        rs = RadioSetting("vfob.offset",
+                          "VFO B Offset (0.0-999.999)", val1b)
+        rs.set_apply_callback(apply_offset, _vfob)
+        workmode.append(rs)
 
-            rs = RadioSetting("vfoa.sftd", "VFO A Shift",
+        if self._tri_power:
+            if _vfoa.txpower3 > 0x02:
+                val = 0x00
+            else:
+                val = _vfoa.txpower3
+            rs = RadioSetting("vfoa.txpower3", "VFO A Power",
                               RadioSettingValueList(
-                                  SHIFTD_LIST, SHIFTD_LIST[_vfoa.sftd]))
+                                  TXPOWER3_LIST,
+                                  TXPOWER3_LIST[val]))
             workmode.append(rs)
 
-            rs = RadioSetting("vfob.sftd", "VFO B Shift",
+            if _vfob.txpower3 > 0x02:
+                val = 0x00
+            else:
+                val = _vfob.txpower3
+            rs = RadioSetting("vfob.txpower3", "VFO B Power",
                               RadioSettingValueList(
-                                  SHIFTD_LIST, SHIFTD_LIST[_vfob.sftd]))
+                                  TXPOWER3_LIST,
+                                  TXPOWER3_LIST[val]))
             workmode.append(rs)
-
-            def convert_bytes_to_offset(bytes):
-                real_offset = 0
-                for byte in bytes:
-                    real_offset = (real_offset * 10) + byte
-                return chirp_common.format_freq(real_offset * 1000)
-
-            def apply_offset(setting, obj):
-                value = chirp_common.parse_freq(str(setting.value)) / 1000
-                for i in range(5, -1, -1):
-                    obj.offset[i] = value % 10
-                    value /= 10
-
-            val1a = RadioSettingValueString(
-                0, 10, convert_bytes_to_offset(_vfoa.offset))
-            rs = RadioSetting("vfoa.offset",
-                              "VFO A Offset (0.0-999.999)", val1a)
-            rs.set_apply_callback(apply_offset, _vfoa)
+        else:
+            rs = RadioSetting("vfoa.txpower", "VFO A Power",
+                              RadioSettingValueList(
+                                  TXPOWER_LIST,
+                                  TXPOWER_LIST[_vfoa.txpower]))
             workmode.append(rs)
 
-            val1b = RadioSettingValueString(
-                0, 10, convert_bytes_to_offset(_vfob.offset))
-            rs = RadioSetting("vfob.offset",
-                              "VFO B Offset (0.0-999.999)", val1b)
-            rs.set_apply_callback(apply_offset, _vfob)
+            rs = RadioSetting("vfob.txpower", "VFO B Power",
+                              RadioSettingValueList(
+                                  TXPOWER_LIST,
+                                  TXPOWER_LIST[_vfob.txpower]))
             workmode.append(rs)
 
-            if self._tri_power:
-                if _vfoa.txpower3 > 0x02:
-                    val = 0x00
-                else:
-                    val = _vfoa.txpower3
-                rs = RadioSetting("vfoa.txpower3", "VFO A Power",
-                                  RadioSettingValueList(
-                                      TXPOWER3_LIST,
-                                      TXPOWER3_LIST[val]))
-                workmode.append(rs)
-
-                if _vfob.txpower3 > 0x02:
-                    val = 0x00
-                else:
-                    val = _vfob.txpower3
-                rs = RadioSetting("vfob.txpower3", "VFO B Power",
-                                  RadioSettingValueList(
-                                      TXPOWER3_LIST,
-                                      TXPOWER3_LIST[val]))
-                workmode.append(rs)
-            else:
-                rs = RadioSetting("vfoa.txpower", "VFO A Power",
-                                  RadioSettingValueList(
-                                      TXPOWER_LIST,
-                                      TXPOWER_LIST[_vfoa.txpower]))
-                workmode.append(rs)
-
-                rs = RadioSetting("vfob.txpower", "VFO B Power",
-                                  RadioSettingValueList(
-                                      TXPOWER_LIST,
-                                      TXPOWER_LIST[_vfob.txpower]))
-                workmode.append(rs)
-
-            rs = RadioSetting("vfoa.widenarr", "VFO A Bandwidth",
+        rs = RadioSetting("vfoa.widenarr", "VFO A Bandwidth",
+                          RadioSettingValueList(
+                              BANDWIDTH_LIST,
+                              BANDWIDTH_LIST[_vfoa.widenarr]))
+        workmode.append(rs)
+
+        rs = RadioSetting("vfob.widenarr", "VFO B Bandwidth",
+                          RadioSettingValueList(
+                              BANDWIDTH_LIST,
+                              BANDWIDTH_LIST[_vfob.widenarr]))
+        workmode.append(rs)
+
+        rs = RadioSetting("vfoa.scode", "VFO A PTT-ID",
+                          RadioSettingValueList(
+                              PTTIDCODE_LIST, PTTIDCODE_LIST[_vfoa.scode]))
+        workmode.append(rs)
+
+        rs = RadioSetting("vfob.scode", "VFO B PTT-ID",
+                          RadioSettingValueList(
+                              PTTIDCODE_LIST, PTTIDCODE_LIST[_vfob.scode]))
+        workmode.append(rs)
+
+        if not self._is_orig():
+            rs = RadioSetting("vfoa.step", "VFO A Tuning Step",
                               RadioSettingValueList(
-                                  BANDWIDTH_LIST,
-                                  BANDWIDTH_LIST[_vfoa.widenarr]))
+                                  STEP291_LIST, STEP291_LIST[_vfoa.step]))
             workmode.append(rs)
-
-            rs = RadioSetting("vfob.widenarr", "VFO B Bandwidth",
+            rs = RadioSetting("vfob.step", "VFO B Tuning Step",
                               RadioSettingValueList(
-                                  BANDWIDTH_LIST,
-                                  BANDWIDTH_LIST[_vfob.widenarr]))
+                                  STEP291_LIST, STEP291_LIST[_vfob.step]))
             workmode.append(rs)
-
-            rs = RadioSetting("vfoa.scode", "VFO A PTT-ID",
+        else:
+            rs = RadioSetting("vfoa.step", "VFO A Tuning Step",
                               RadioSettingValueList(
-                                  PTTIDCODE_LIST, PTTIDCODE_LIST[_vfoa.scode]))
+                                  STEP_LIST, STEP_LIST[_vfoa.step]))
             workmode.append(rs)
-
-            rs = RadioSetting("vfob.scode", "VFO B PTT-ID",
+            rs = RadioSetting("vfob.step", "VFO B Tuning Step",
                               RadioSettingValueList(
-                                  PTTIDCODE_LIST, PTTIDCODE_LIST[_vfob.scode]))
+                                  STEP_LIST, STEP_LIST[_vfob.step]))
             workmode.append(rs)
 
-            if not self._is_orig():
-                rs = RadioSetting("vfoa.step", "VFO A Tuning Step",
-                                  RadioSettingValueList(
-                                      STEP291_LIST, STEP291_LIST[_vfoa.step]))
-                workmode.append(rs)
-                rs = RadioSetting("vfob.step", "VFO B Tuning Step",
-                                  RadioSettingValueList(
-                                      STEP291_LIST, STEP291_LIST[_vfob.step]))
-                workmode.append(rs)
-            else:
-                rs = RadioSetting("vfoa.step", "VFO A Tuning Step",
-                                  RadioSettingValueList(
-                                      STEP_LIST, STEP_LIST[_vfoa.step]))
-                workmode.append(rs)
-                rs = RadioSetting("vfob.step", "VFO B Tuning Step",
-                                  RadioSettingValueList(
-                                      STEP_LIST, STEP_LIST[_vfob.step]))
-                workmode.append(rs)
+        return workmode
 
-        fm_preset = RadioSettingGroup("fm_preset", "FM Radio Preset")
-        group.append(fm_preset)
-
-        if _fm_presets <= 108.0 * 10 - 650:
-            preset = _fm_presets / 10.0 + 65
-        elif _fm_presets >= 65.0 * 10 and _fm_presets <= 108.0 * 10:
-            preset = _fm_presets / 10.0
-        else:
-            preset = 76.0
-        rs = RadioSetting("fm_presets", "FM Preset(MHz)",
-                          RadioSettingValueFloat(65, 108.0, preset, 0.1, 1))
-        fm_preset.append(rs)
-
-        dtmf = RadioSettingGroup("dtmf", "DTMF Settings")
-        group.append(dtmf)
+    def _get_dtmf_settings(self):
+        _ani = self._memobj.ani
+        _settings = self._memobj.settings
+        dtmf = []
 
         if str(self._memobj.firmware_msg.line1) == "HN5RV01":
             dtmfchars = "0123456789ABCD*#"
@@ -1733,25 +1711,26 @@ class BaofengUV5R(chirp_common.CloneModeRadio):
                           RadioSettingValueInteger(0, 50, _settings.pttlt))
         dtmf.append(rs)
 
-        if not self._is_orig() and self._aux_block:
-            service = RadioSettingGroup("service", "Service Settings")
-            group.append(service)
-
-            for band in ["vhf", "uhf"]:
-                for index in range(0, 10):
-                    key = "squelch_new.%s.sql%i" % (band, index)
-                    if band == "vhf":
-                        _obj = self._memobj.squelch_new.vhf
-                    elif band == "uhf":
-                        _obj = self._memobj.squelch_new.uhf
-                    name = "%s Squelch %i" % (band.upper(), index)
-                    rs = RadioSetting(key, name,
-                                      RadioSettingValueInteger(
-                                          0, 123,
-                                          getattr(_obj, "sql%i" % (index))))
-                    service.append(rs)
+        return dtmf
 
-        return group
+    def _get_service_settings(self):
+        service = []
+
+        for band in ["vhf", "uhf"]:
+            for index in range(0, 10):
+                key = "squelch_new.%s.sql%i" % (band, index)
+                if band == "vhf":
+                    _obj = self._memobj.squelch_new.vhf
+                elif band == "uhf":
+                    _obj = self._memobj.squelch_new.uhf
+                name = "%s Squelch %i" % (band.upper(), index)
+                rs = RadioSetting(key, name,
+                                  RadioSettingValueInteger(
+                                      0, 123,
+                                      getattr(_obj, "sql%i" % (index))))
+                service.append(rs)
+
+        return service
 
     def get_settings(self):
         try:
@@ -1761,32 +1740,24 @@ class BaofengUV5R(chirp_common.CloneModeRadio):
             LOG.error("Failed to parse settings: %s", traceback.format_exc())
             return None
 
-    def set_settings(self, settings):
-        _settings = self._memobj.settings
+    def set_settings(self, settings, changed_only=False):
+        paths = get_setting_paths(self, self._memobj.settings)
         for element in settings:
             if not isinstance(element, RadioSetting):
+                if changed_only and not element.changed():
+                    continue
                 if element.get_name() == "fm_preset":
                     self._set_fm_preset(element)
+                    if changed_only:
+                        element.clear_changed()
                 else:
-                    self.set_settings(element)
+                    self.set_settings(element, changed_only)
                     continue
             else:
+                if changed_only and not element.changed():
+                    continue
                 try:
-                    name = element.get_name()
-                    if "." in name:
-                        bits = name.split(".")
-                        obj = self._memobj
-                        for bit in bits[:-1]:
-                            if "/" in bit:
-                                bit, index = bit.split("/", 1)
-                                index = int(index)
-                                obj = getattr(obj, bit)[index]
-                            else:
-                                obj = getattr(obj, bit)
-                        setting = bits[-1]
-                    else:
-                        obj = _settings
-                        setting = element.get_name()
+                    obj, setting = paths.resolve(element.get_name())
 
                     if element.has_apply_callback():
                         LOG.debug("Using apply callback")
@@ -1794,6 +1765,9 @@ class BaofengUV5R(chirp_common.CloneModeRadio):
                     elif element.value.get_mutable():
                         LOG.debug("Setting %s = %s" % (setting, element.value))
                         setattr(obj, setting, element.value)
+                    # Only once applied, so a failure is tried again
+                    if changed_only:
+                        element.clear_changed()
                 except Exception, e:
                     LOG.debug(element.get_name())
                     raise
@@ -2084,6 +2058,8 @@ class RadioddityUV5GRadio(BaofengUV5R):
     _basetype = BASETYPE_UV5R
     _idents = [UV5R_MODEL_UV5G]
     _gmrs = True
+    # GMRS channels are tied to their location, so they can't be moved
+    _memory_arrays = ()
 
     @classmethod
     def match_model(cls, filename, filedata):
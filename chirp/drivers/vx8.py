@@ -498,6 +498,14 @@ class VX8BankModel(chirp_common.BankModel):
 
         return banks
 
+    def get_all_memory_mappings(self, lo, hi):
+        table = {}
+        for bank in self.get_mappings():
+            for channel in self._channel_numbers_in_bank(bank):
+                if lo <= channel <= hi:
+                    table.setdefault(channel, ([], []))[0].append(bank)
+        return table
+
 
 def _wipe_memory(mem):
     mem.set_raw("\x00" * (mem.size() / 8))
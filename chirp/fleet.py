@@ -0,0 +1,186 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Programming one image into several radios at once
+
+A FleetProgrammer uploads a clone-mode image to a radio on each of a
+list of serial ports. Every port gets its own thread, its own copy of
+the radio and its own result, so a slow or failing radio does not hold
+up or break the others, and the whole fleet takes about as long as its
+slowest radio.
+"""
+
+import functools
+import logging
+import threading
+import time
+
+import serial
+
+from chirp import chirp_common, errors, memmap, stats
+
+LOG = logging.getLogger(__name__)
+
+
+class FleetResult(object):
+    """The outcome of programming the radio on @port"""
+
+    def __init__(self, port):
+        self.port = port
+        self.error = None
+        # None if not verified, else the list of memories that differ
+        self.mismatches = None
+        self.elapsed = 0
+
+    @property
+    def ok(self):
+        """True if the radio was programmed (and verified, if asked)"""
+        return self.error is None and not self.mismatches
+
+    def __str__(self):
+        if self.error is not None:
+            state = "FAILED: %s" % self.error
+        elif self.mismatches:
+            state = "VERIFY FAILED: memories %s differ" % (
+                ", ".join(str(number) for number in self.mismatches))
+        elif self.mismatches is not None:
+            state = "OK, verified"
+        else:
+            state = "OK"
+        return "%s: %s (%.1fs)" % (self.port, state, self.elapsed)
+
+
+def open_port(port, rclass):
+    """Open serial @port the way the clone dialogs do for @rclass"""
+    pipe = serial.Serial(port=port,
+                         baudrate=rclass.BAUD_RATE,
+                         rtscts=rclass.HARDWARE_FLOW,
+                         timeout=0.25)
+    pipe.flushInput()
+    return pipe
+
+
+def copy_radio(source):
+    """Return a new radio of the same class as @source with a copy of its
+    image, so that each port uploads from its own instance"""
+    radio = source.__class__(
+        memmap.MemoryMap(source.get_mmap().get_packed()))
+    radio._metadata = dict(getattr(source, "_metadata", {}))
+    return radio
+
+
+def compare_memories(expected, actual):
+    """Return the numbers of the memories that differ between radios
+    @expected and @actual"""
+    lo, hi = expected.get_features().memory_bounds
+    differ = []
+    for number in range(lo, hi + 1):
+        states = []
+        for radio in (expected, actual):
+            state = radio.get_memory(number).__getstate__()
+            state.pop("extra", None)
+            states.append(state)
+        if states[0] != states[1]:
+            differ.append(number)
+    return differ
+
+
+def format_report(results, elapsed=None):
+    """Return a summary of @results, one line per port and a total"""
+    lines = [str(result) for result in results]
+    total = "%i of %i radios programmed" % (
+        len([result for result in results if result.ok]), len(results))
+    if elapsed is not None:
+        total += " in %.1fs" % elapsed
+    lines.append(total)
+    return "\n".join(lines)
+
+
+class FleetProgrammer(object):
+    """Uploads the image of the clone-mode radio @source to a radio on
+    each of @ports at the same time. If @verify is set, each radio's
+    memories are read back and compared after the upload. @status_fn is
+    called from the worker threads as status_fn(port, status) with the
+    chirp_common.Status of each port."""
+
+    def __init__(self, source, ports, verify=False, status_fn=None,
+                 open_fn=open_port):
+        if not isinstance(source, chirp_common.CloneModeRadio):
+            raise errors.InvalidDataError(
+                "%s is not a clone mode radio" % source.get_name())
+        self._source = source
+        self._open_fn = open_fn
+        self._pipes = {}
+        self._lock = threading.Lock()
+        self.verify = verify
+        self.status_fn = status_fn
+        self.results = [FleetResult(port) for port in ports]
+        self.elapsed = 0
+
+    def _status(self, port, status):
+        if self.status_fn:
+            self.status_fn(port, status)
+
+    def _program(self, result):
+        start = time.time()
+        port = result.port
+        status_fn = functools.partial(self._status, port)
+        pipe = None
+        try:
+            pipe = self._open_fn(port, self._source.__class__)
+            with self._lock:
+                self._pipes[port] = pipe
+
+            radio = copy_radio(self._source)
+            radio.set_pipe(pipe)
+            radio.status_fn = status_fn
+            with stats.transfer(radio, "out"):
+                radio.sync_out()
+
+            if self.verify:
+                readback = self._source.__class__(pipe)
+                readback.status_fn = status_fn
+                with stats.transfer(readback, "in"):
+                    readback.sync_in()
+                result.mismatches = compare_memories(radio, readback)
+        except Exception, e:
+            LOG.exception("Programming the radio on %s failed" % port)
+            result.error = e
+        finally:
+            if pipe is not None:
+                pipe.close()
+            result.elapsed = time.time() - start
+            LOG.info("Fleet %s", result)
+
+    def run(self):
+        """Program all the radios and return the list of FleetResults,
+        in the order of the ports"""
+        start = time.time()
+        threads = [threading.Thread(target=self._program, args=(result,),
+                                    name="fleet-%s" % result.port)
+                   for result in self.results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.time() - start
+        return self.results
+
+    def cancel(self):
+        """Abort by closing all the open ports, which fails the clone
+        on each of them"""
+        with self._lock:
+            for pipe in self._pipes.values():
+                pipe.close()
@@ -190,9 +190,9 @@ def _import_duplex(dst_radio, srcrf, mem):
                                             "offset is abnormally large.")
 
 
-def import_mem(dst_radio, src_features, src_mem, overrides={}):
-    """Perform import logic to create a destination memory from
-    src_mem that will be compatible with @dst_radio"""
+def convert_mem(dst_radio, src_features, src_mem, overrides={}):
+    """Create a destination memory from @src_mem like import_mem(), but
+    without validating the result against @dst_radio"""
     dst_rf = dst_radio.get_features()
 
     if isinstance(src_mem, chirp_common.DVMemory):
@@ -209,7 +209,7 @@ def import_mem(dst_radio, src_features, src_mem, overrides={}):
     dst_mem.immutable = []
 
     for k, v in overrides.items():
-        dst_mem.__dict__[k] = v
+        setattr(dst_mem, k, v)
 
     helpers = [_import_name,
                _import_power,
@@ -222,15 +222,104 @@ def import_mem(dst_radio, src_features, src_mem, overrides={}):
     for helper in helpers:
         helper(dst_radio, src_features, dst_mem)
 
-    msgs = dst_radio.validate_memory(dst_mem)
+    return dst_mem
+
+
+def check_validation(msgs):
+    """Raise DestNotCompatible if the validation messages in @msgs
+    include any errors"""
     errs = [x for x in msgs if isinstance(x, chirp_common.ValidationError)]
     if errs:
         raise DestNotCompatible("Unable to create import memory: %s" %
                                 ", ".join(errs))
 
+
+def import_mem(dst_radio, src_features, src_mem, overrides={}):
+    """Perform import logic to create a destination memory from
+    src_mem that will be compatible with @dst_radio"""
+    dst_mem = convert_mem(dst_radio, src_features, src_mem, overrides)
+    check_validation(dst_radio.validate_memory(dst_mem))
     return dst_mem
 
 
+class ImportCandidate(object):
+    """A source memory prepared for import by iter_import_candidates()
+
+    @number is the source location. If it could not be read, @error is
+    the reason and the rest are None. Otherwise @src_mem is the source
+    memory and @dst_mem the converted one, or None if it is not
+    compatible with the destination, in which case @msgs are the
+    validation messages for @src_mem itself.
+    """
+
+    def __init__(self, number, src_mem=None, dst_mem=None, msgs=None,
+                 error=None):
+        self.number = number
+        self.src_mem = src_mem
+        self.dst_mem = dst_mem
+        self.msgs = msgs or []
+        self.error = error
+
+
+def _prepare_batch(dst_radio, candidates):
+    """Validate the memories of @candidates in one call, falling back
+    to the source memory for any that do not convert cleanly"""
+    pending = [c for c in candidates if c.src_mem is not None]
+    results = dst_radio.validate_memories(
+        [c.dst_mem or c.src_mem for c in pending])
+
+    failed = []
+    for candidate, msgs in zip(pending, results):
+        candidate.msgs = msgs
+        if candidate.dst_mem is None:
+            continue
+        try:
+            check_validation(msgs)
+        except DestNotCompatible:
+            candidate.dst_mem = None
+            failed.append(candidate)
+
+    if failed:
+        results = dst_radio.validate_memories([c.src_mem for c in failed])
+        for candidate, msgs in zip(failed, results):
+            candidate.msgs = msgs
+
+
+def iter_import_candidates(dst_radio, src_radio, batch_size=50):
+    """Read, convert and validate each non-empty memory of @src_radio
+    for import into @dst_radio, yielding lists of up to @batch_size
+    ImportCandidates in location order"""
+    src_rf = src_radio.get_features()
+    start, end = src_rf.memory_bounds
+
+    batch = []
+    for number in range(start, end + 1):
+        try:
+            src_mem = src_radio.get_memory(number)
+        except errors.InvalidMemoryLocation:
+            continue
+        except Exception, e:
+            LOG.error("Unable to read memory %i: %s" % (number, e))
+            batch.append(ImportCandidate(number, error=str(e)))
+        else:
+            if src_mem.empty:
+                continue
+            try:
+                dst_mem = convert_mem(dst_radio, src_rf, src_mem)
+            except DestNotCompatible:
+                dst_mem = None
+            batch.append(ImportCandidate(number, src_mem, dst_mem))
+
+        if len(batch) >= batch_size:
+            _prepare_batch(dst_radio, batch)
+            yield batch
+            batch = []
+
+    if batch:
+        _prepare_batch(dst_radio, batch)
+        yield batch
+
+
 def _get_bank_model(radio):
     for model in radio.get_mapping_models():
         if isinstance(model, chirp_common.BankModel):
@@ -21,8 +21,13 @@ class MemoryMap:
     A pythonic memory map interface
     """
 
+    _journal = None
+
     def __init__(self, data):
         self._data = list(data)
+        # Counts the changes made, so users can tell that the map has
+        # changed since they last looked at it
+        self.generation = 0
 
     def printable(self, start=None, end=None):
         """Return a printable representation of the memory map"""
@@ -45,9 +50,14 @@ class MemoryMap:
 
     def set(self, pos, value):
         """Set a chunk of memory at @pos to @value"""
+        self.generation += 1
         if isinstance(value, int):
+            if self._journal is not None:
+                self._journal.record(self, pos, self._data[pos])
             self._data[pos] = chr(value)
         elif isinstance(value, str):
+            if self._journal is not None:
+                self._journal.record(self, pos, self.get(pos, len(value)))
             for byte in value:
                 self._data[pos] = byte
                 pos += 1
@@ -55,6 +65,11 @@ class MemoryMap:
             raise ValueError("Unsupported type %s for value" %
                              type(value).__name__)
 
+    def set_journal(self, journal):
+        """Call @journal.record(map, pos, old) with the bytes about to be
+        overwritten before each change, until called with None"""
+        self._journal = journal
+
     def get_packed(self):
         """Return the entire memory map as raw data"""
         return "".join(self._data)
@@ -83,6 +98,7 @@ class MemoryMap:
 
     def truncate(self, size):
         """Truncate the memory map to @size"""
+        self.generation += 1
         self._data = self._data[:size]
 
 
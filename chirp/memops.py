@@ -0,0 +1,142 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Sorting, de-duplication and compaction of a radio's memories
+
+Each operation looks at the memories in a range of locations and plans
+where each of them should go, as a dict of {dest: src} for
+Radio.move_memories(). Only the locations whose contents change are in
+the plan, so applying it takes as few writes as possible.
+"""
+
+import logging
+
+from chirp import chirp_common, errors
+
+LOG = logging.getLogger(__name__)
+
+# Memory attributes that can be sorted on
+SORT_KEYS = ["freq", "name", "mode", "duplex", "offset", "tmode", "rtone",
+             "ctone", "dtcs", "rx_dtcs", "skip", "comment"]
+
+# Memory attributes that must all match for a memory to be a duplicate,
+# along with the tones that its tone mode uses
+DUPLICATE_FIELDS = ["freq", "duplex", "offset", "mode", "tmode"]
+
+# Tone attributes, all of which are compared for tone modes that
+# split_tone_encode() does not know
+TONE_FIELDS = ["rtone", "ctone", "dtcs", "rx_dtcs", "dtcs_polarity",
+               "cross_mode"]
+
+
+def _sort_value(mem, key):
+    value = getattr(mem, key)
+    if isinstance(value, basestring):
+        return value.strip().upper()
+    return value
+
+
+def _tones(mem):
+    if mem.tmode in ("", "Tone", "TSQL", "DTCS", "Cross"):
+        return chirp_common.split_tone_encode(mem)
+    return tuple(getattr(mem, field) for field in TONE_FIELDS)
+
+
+def find_duplicates(mems, fields=DUPLICATE_FIELDS):
+    """Return the memories in @mems that match an earlier non-empty one
+    in all of @fields and in the tones they use"""
+    seen = set()
+    duplicates = []
+    for mem in mems:
+        if mem.empty:
+            continue
+        key = tuple(getattr(mem, field) for field in fields) + _tones(mem)
+        if key in seen:
+            duplicates.append(mem)
+        else:
+            seen.add(key)
+    return duplicates
+
+
+def plan(mems, lo, hi, sort=None, reverse=False, dedupe=False,
+         compact=False):
+    """Plan a rearrangement of @mems, the memories at locations @lo
+    through @hi. Memories are sorted by the list of attribute names in
+    @sort, if given, duplicates are removed if @dedupe is set, and empty
+    locations are squeezed out if @compact is set (sorting always
+    compacts). Returns a dict of {dest: src} for Radio.move_memories()."""
+    for key in sort or []:
+        if key not in SORT_KEYS:
+            raise errors.InvalidValueError("Unable to sort by `%s'" % key)
+
+    present = [mem for mem in mems
+               if not mem.empty and lo <= mem.number <= hi]
+    occupied = set(mem.number for mem in present)
+
+    if dedupe:
+        duplicates = set(mem.number for mem in find_duplicates(present))
+        present = [mem for mem in present if mem.number not in duplicates]
+
+    if sort:
+        present.sort(key=lambda mem: [_sort_value(mem, key)
+                                      for key in sort],
+                     reverse=reverse)
+
+    if sort or compact:
+        layout = dict((lo + i, mem.number) for i, mem in enumerate(present))
+    else:
+        layout = dict((mem.number, mem.number) for mem in present)
+
+    moves = {}
+    for number in range(lo, hi + 1):
+        src = layout.get(number)
+        if src == number or (src is None and number not in occupied):
+            continue
+        moves[number] = src
+    return moves
+
+
+def plan_delete(start, count, following):
+    """Plan deleting the @count locations from @start and moving the
+    memories at @following, the locations of the run right after them,
+    up to take their place. Deleted locations that nothing moves into
+    are erased, as are those the run leaves behind. Returns a dict of
+    {dest: src} for Radio.move_memories()."""
+    moves = {}
+    for i, src in enumerate(following):
+        moves[start + i] = src
+    for number in range(start + len(following),
+                        start + len(following) + count):
+        moves[number] = None
+    return moves
+
+
+def rearrange(radio, lo=None, hi=None, **kwargs):
+    """Rearrange the memories of @radio at locations @lo through @hi
+    (all of them by default) as planned by plan() with @kwargs. Returns
+    the sorted list of locations that changed."""
+    rf = radio.get_features()
+    if lo is None:
+        lo = rf.memory_bounds[0]
+    if hi is None:
+        hi = rf.memory_bounds[1]
+
+    mems = [radio.get_memory(number) for number in range(lo, hi + 1)]
+    moves = plan(mems, lo, hi, **kwargs)
+    if not moves:
+        return []
+    LOG.info("Rearranging %i memories between %i and %i",
+             len(moves), lo, hi)
+    return radio.move_memories(moves)
@@ -0,0 +1,31 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Serial line timing
+
+How long data takes on the wire of a serial port, from its baud rate
+and character framing, for telling the time a clone spends sending and
+receiving from the time the line sits idle.
+"""
+
+
+def char_time(pipe, baudrate=None):
+    """Return the seconds one character takes on the wire of @pipe,
+    at @baudrate if given or else the pipe's own"""
+    baudrate = baudrate or getattr(pipe, "baudrate", None) or 9600
+    bits = 1 + getattr(pipe, "bytesize", 8) + getattr(pipe, "stopbits", 1)
+    if getattr(pipe, "parity", "N") not in ("N", None):
+        bits += 1
+    return float(bits) / baudrate
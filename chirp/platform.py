@@ -98,6 +98,14 @@ class Platform:
 
         return logdir
 
+    def autosave_dir(self):
+        """Return the directory unsaved changes are logged in"""
+        savedir = os.path.join(self.config_dir(), "autosave")
+        if not os.path.isdir(savedir):
+            os.mkdir(savedir)
+
+        return savedir
+
     def filter_filename(self, filename):
         """Filter @filename for platform-forbidden characters"""
         return filename
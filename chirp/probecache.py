@@ -0,0 +1,95 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Remembering which probe last found a radio on each port
+
+Detecting a radio means trying several protocols and baud rates in turn,
+each costing a read timeout when nothing answers. The same radio is
+usually plugged into the same port next time, so trying whatever worked
+last time first makes detection take one round trip instead of several.
+"""
+
+import logging
+import threading
+
+LOG = logging.getLogger(__name__)
+
+
+class _MemoryStore(object):
+    """A store that forgets everything when the program exits"""
+
+    def __init__(self):
+        self._values = {}
+
+    def get(self, key):
+        return self._values.get(key)
+
+    def set(self, key, value):
+        self._values[key] = value
+
+
+class ProbeCache(object):
+    """Remembers the last successful probe of each kind for each port in
+    @store, which is anything with get(key) and set(key, value) of
+    strings, such as a section of the GUI config"""
+
+    def __init__(self, store=None):
+        self._store = store or _MemoryStore()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(kind, port):
+        return "%s@%s" % (kind, port)
+
+    def get(self, kind, port):
+        """Return the name of the @kind probe that last worked on @port,
+        or None"""
+        if port is None:
+            return None
+        with self._lock:
+            return self._store.get(self._key(kind, port))
+
+    def order(self, kind, port, candidates, key=str):
+        """Return @candidates with the one that last worked on @port
+        first, otherwise in their original order. @key gives the name
+        of each candidate."""
+        last = self.get(kind, port)
+        return sorted(candidates, key=lambda c: key(c) != last)
+
+    def remember(self, kind, port, candidate):
+        """Record that the @kind probe named @candidate worked on @port"""
+        if port is None:
+            return
+        with self._lock:
+            key = self._key(kind, port)
+            if self._store.get(key) != str(candidate):
+                LOG.debug("Remembering %s probe %s for %s",
+                          kind, candidate, port)
+                self._store.set(key, str(candidate))
+
+
+_CACHE = ProbeCache()
+
+
+def get_cache():
+    """Return the shared ProbeCache"""
+    return _CACHE
+
+
+def set_store(store):
+    """Keep the shared ProbeCache in @store, for example so that it
+    persists in the config between runs"""
+    global _CACHE
+    _CACHE = ProbeCache(store)
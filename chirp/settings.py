@@ -48,6 +48,11 @@ class RadioSettingValue:
         """Returns True if the setting has been changed since init"""
         return self._has_changed
 
+    def clear_changed(self):
+        """Marks the setting as unchanged, such as once it has been
+        applied to the radio"""
+        self._has_changed = False
+
     def set_validate_callback(self, callback):
         self._validate_callback = callback
 
@@ -286,6 +291,59 @@ def zero_indexed_seq_map(user_options):
     return zip(user_options, mem_vals)
 
 
+class SettingPathResolver(object):
+
+    """Resolves dotted setting names to an (object, attribute) pair
+
+    Many drivers name their settings after the path to the memory object
+    field they control, like "settings.squelch", where "name/2" indexes
+    into an array. Names without a dot are attributes of @default. Each
+    name is resolved once and cached, so it must be discarded along with
+    @root when the memory object is reparsed.
+
+    """
+
+    def __init__(self, root, default=None):
+        self.root = root
+        self.default = default
+        self._cache = {}
+
+    def resolve(self, name):
+        """Returns the (object, attribute) pair for setting @name"""
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+
+        if "." in name:
+            bits = name.split(".")
+            obj = self.root
+            for bit in bits[:-1]:
+                if "/" in bit:
+                    bit, index = bit.split("/", 1)
+                    obj = getattr(obj, bit)[int(index)]
+                else:
+                    obj = getattr(obj, bit)
+            result = (obj, bits[-1])
+        else:
+            result = (self.default, name)
+
+        self._cache[name] = result
+        return result
+
+
+def get_setting_paths(radio, default):
+    """Returns the SettingPathResolver for @radio's memory object, with
+    names without a dot resolved in @default. It is kept on @radio and
+    replaced when the memory object is reparsed."""
+    paths = getattr(radio, "_setting_paths", None)
+    if paths is None or paths.root is not radio._memobj or \
+            paths.default is not default:
+        paths = SettingPathResolver(radio._memobj, default)
+        radio._setting_paths = paths
+    return paths
+
+
 class RadioSettings(list):
 
     def __init__(self, *groups):
@@ -295,6 +353,18 @@ class RadioSettings(list):
         items = [str(self[i]) for i in range(0, len(self))]
         return "\n".join(items)
 
+    def changed(self):
+        """Returns True if any setting in the tree has been changed"""
+        for group in self:
+            if group.changed():
+                return True
+        return False
+
+    def clear_changed(self):
+        """Marks every setting in the tree as unchanged"""
+        for group in self:
+            group.clear_changed()
+
 
 class RadioSettingGroup(object):
 
@@ -328,6 +398,20 @@ class RadioSettingGroup(object):
         """Sets the docstring for the group"""
         self.__doc__ = doc
 
+    def changed(self):
+        """Returns True if any of the settings in the group (or its
+        subgroups) have been changed"""
+        for element in self._elements.values():
+            if element.changed():
+                return True
+        return False
+
+    def clear_changed(self):
+        """Marks all of the settings in the group (and its subgroups)
+        as unchanged"""
+        for element in self._elements.values():
+            element.clear_changed()
+
     def __str__(self):
         string = "group '%s': {\n" % self._name
         for element in sorted(self._elements.values()):
@@ -389,6 +473,64 @@ class RadioSettingGroup(object):
         return [self._elements[name] for name in self._element_order]
 
 
+class LazyRadioSettingGroup(RadioSettingGroup):
+
+    """A group of settings that are not built until they are needed
+
+    @builder is called (with @args) the first time the group's elements
+    are accessed, and returns the elements of the group. Until then, the
+    group cannot contain any changes, so changed() is False without
+    building it.
+
+    """
+
+    def __init__(self, name, shortname, builder, *args):
+        self._builder = lambda: builder(*args)
+        super(LazyRadioSettingGroup, self).__init__(name, shortname)
+
+    def _get_elements(self):
+        if self._builder is not None:
+            self.populate()
+        return self.__elements
+
+    def _set_elements(self, elements):
+        self.__elements = elements
+
+    def _get_element_order(self):
+        if self._builder is not None:
+            self.populate()
+        return self.__element_order
+
+    def _set_element_order(self, element_order):
+        self.__element_order = element_order
+
+    _elements = property(_get_elements, _set_elements)
+    _element_order = property(_get_element_order, _set_element_order)
+
+    def is_populated(self):
+        """Returns True if the group's elements have been built"""
+        return self._builder is None
+
+    def populate(self):
+        """Builds the group's elements, if that has not been done yet"""
+        if self._builder is None:
+            return
+        elements = list(self._builder())
+        self._builder = None
+        for element in elements:
+            self._validate(element)
+            self.append(element)
+
+    def changed(self):
+        if not self.is_populated():
+            return False
+        return super(LazyRadioSettingGroup, self).changed()
+
+    def clear_changed(self):
+        if self.is_populated():
+            super(LazyRadioSettingGroup, self).clear_changed()
+
+
 class RadioSetting(RadioSettingGroup):
 
     """A single setting, which could be an array of items like a group"""
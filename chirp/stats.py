@@ -0,0 +1,243 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Timers and counters for finding out where the time goes
+
+Code that is worth measuring wraps itself in timer(), or calls
+add_time() or count(), under a dotted name such as "job.get_memory" or
+"bitwise.parse". Each timer keeps the number of calls and their total,
+shortest and longest time. Clones run with transfer(), which meters the
+radio's serial port for the length of the clone and keeps a summary of
+its throughput and of how long the line sat idle.
+
+Everything is kept in memory for the life of the process, and
+snapshot() returns it all as a dict that can be dumped as JSON and
+attached to a bug report.
+"""
+
+import contextlib
+import json
+import logging
+import threading
+import time
+
+from chirp import pacing
+
+LOG = logging.getLogger(__name__)
+
+# Only the most recent transfers are kept
+TRANSFERS_KEPT = 20
+
+_LOCK = threading.Lock()
+_TIMERS = {}
+_COUNTERS = {}
+_TRANSFERS = []
+_ACTIVE = threading.local()
+
+
+class Timer(object):
+    """The calls made to one named piece of code and the time they took"""
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.calls += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "total": self.total,
+            "mean": self.calls and self.total / self.calls,
+            "min": self.min or 0.0,
+            "max": self.max,
+            }
+
+
+def add_time(name, seconds):
+    """Record a call to @name that took @seconds"""
+    with _LOCK:
+        timer = _TIMERS.get(name)
+        if timer is None:
+            timer = _TIMERS[name] = Timer()
+        timer.add(seconds)
+
+
+def count(name, value=1):
+    """Add @value to the counter @name"""
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + value
+
+
+@contextlib.contextmanager
+def timer(name):
+    """Time the body of a with statement as a call to @name"""
+    start = time.time()
+    try:
+        yield
+    finally:
+        add_time(name, time.time() - start)
+
+
+def instrument(cls, method, name_fn):
+    """Time every call to @method of class @cls under the name that
+    @name_fn returns for the instance. The method is wrapped in the
+    class that defines it, so other classes sharing it are timed too.
+    Calls made from inside another instrumented call of the same
+    method, such as to a parent class's method, are counted in the
+    outer call only."""
+    for owner in cls.__mro__:
+        if method in owner.__dict__:
+            break
+    else:
+        return
+    func = owner.__dict__[method]
+    if getattr(func, "_stats_name_fn", None):
+        return
+
+    def wrapper(self, *args, **kwargs):
+        if getattr(_ACTIVE, method, False):
+            return func(self, *args, **kwargs)
+        setattr(_ACTIVE, method, True)
+        start = time.time()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            add_time(name_fn(self), time.time() - start)
+            setattr(_ACTIVE, method, False)
+
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    wrapper._stats_name_fn = name_fn
+    setattr(owner, method, wrapper)
+
+
+class MeteredPipe(object):
+    """Stands in for the serial port @pipe, counting the bytes read and
+    written and the time spent doing so. Everything else, including
+    setting attributes like the baud rate, goes to @pipe."""
+
+    def __init__(self, pipe):
+        self.__dict__.update({
+            "pipe": pipe,
+            "bytes_read": 0,
+            "bytes_written": 0,
+            "read_time": 0.0,
+            "write_time": 0.0,
+            })
+
+    def __getattr__(self, name):
+        return getattr(self.pipe, name)
+
+    def __setattr__(self, name, value):
+        if name in self.__dict__:
+            self.__dict__[name] = value
+        else:
+            setattr(self.pipe, name, value)
+
+    def read(self, *args, **kwargs):
+        start = time.time()
+        data = self.pipe.read(*args, **kwargs)
+        self.read_time += time.time() - start
+        self.bytes_read += len(data)
+        return data
+
+    def write(self, data):
+        start = time.time()
+        result = self.pipe.write(data)
+        self.write_time += time.time() - start
+        self.bytes_written += len(data)
+        return result
+
+
+@contextlib.contextmanager
+def transfer(radio, direction):
+    """Meter a clone of @radio in @direction ("in" or "out") run in the
+    body of a with statement. The radio's pipe is replaced with a
+    MeteredPipe until the clone is over. A pipe that is not a serial
+    port, like the image of a radio being tested, is left alone."""
+    if not hasattr(radio.pipe, "read"):
+        yield
+        return
+
+    pipe = MeteredPipe(radio.pipe)
+    radio.pipe = pipe
+    start = time.time()
+    try:
+        yield
+    finally:
+        radio.pipe = pipe.pipe
+        elapsed = time.time() - start
+        _add_transfer(radio, direction, pipe, elapsed)
+
+
+def _add_transfer(radio, direction, pipe, elapsed):
+    total = pipe.bytes_read + pipe.bytes_written
+    # The time the bytes took on the wire at the port's settings; the
+    # rest of the clone, the line was idle
+    wire = total * pacing.char_time(pipe.pipe)
+    summary = {
+        "radio": "%s %s" % (radio.VENDOR, radio.MODEL),
+        "direction": direction,
+        "seconds": elapsed,
+        "bytes_read": pipe.bytes_read,
+        "bytes_written": pipe.bytes_written,
+        "bytes_per_second": elapsed and total / elapsed,
+        "read_wait": pipe.read_time,
+        "write_wait": pipe.write_time,
+        "wire_seconds": wire,
+        "idle_seconds": max(0.0, elapsed - wire),
+        }
+    LOG.debug("Clone %s of %s: %i bytes in %.1fs (%.0f B/s), idle %.1fs" %
+              (direction, summary["radio"], total, elapsed,
+               summary["bytes_per_second"], summary["idle_seconds"]))
+    add_time("clone.sync_%s" % direction, elapsed)
+    count("serial.bytes_read", pipe.bytes_read)
+    count("serial.bytes_written", pipe.bytes_written)
+    with _LOCK:
+        _TRANSFERS.append(summary)
+        del _TRANSFERS[:-TRANSFERS_KEPT]
+
+
+def snapshot():
+    """Return everything recorded so far as a dict of plain values"""
+    with _LOCK:
+        return {
+            "timers": dict((name, timer.as_dict())
+                           for name, timer in _TIMERS.items()),
+            "counters": dict(_COUNTERS),
+            "transfers": [dict(summary) for summary in _TRANSFERS],
+            }
+
+
+def reset():
+    """Forget everything recorded so far"""
+    with _LOCK:
+        _TIMERS.clear()
+        _COUNTERS.clear()
+        del _TRANSFERS[:]
+
+
+def dump(f):
+    """Write snapshot() to the file object @f as JSON"""
+    json.dump(snapshot(), f, indent=2, sort_keys=True, separators=(",", ": "))
+    f.write("\n")
@@ -0,0 +1,209 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Shared tables for the ways radios store tones and DTCS codes
+
+The tables are built once for each distinct list of codes and shared
+between drivers, so converting a tone or code is a dict or list lookup
+instead of a list.index() or string conversion on every memory.
+
+The encodings covered are:
+
+ - an index into a table of tones or codes (CodeTable)
+ - the 16-bit tone words of Baofeng, BTECH and similar radios, which
+   hold either tenths of a Hz or a DTCS index (IndexedToneWord)
+ - DTCS codes stored as their octal value, as in Wouxun, Kenwood and
+   some Retevis radios (dcs_to_octal() and octal_to_dcs())
+ - BCD tone fields with DTCS flags in the top byte, as in the H777 and
+   many Retevis radios (get_bcd_tone() and set_bcd_tone())
+"""
+
+from chirp import chirp_common
+
+
+class CodeTable(object):
+    """An immutable table of tones or DTCS codes that finds the index
+    of a value in constant time"""
+
+    def __init__(self, values):
+        self._values = tuple(values)
+        self._index = {}
+        for i, value in enumerate(self._values):
+            self._index.setdefault(value, i)
+
+    def index(self, value):
+        """Return the index of @value, raising ValueError like
+        list.index() if it is not in the table"""
+        try:
+            return self._index[value]
+        except (KeyError, TypeError):
+            raise ValueError("%r is not in the table" % (value,))
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __contains__(self, value):
+        try:
+            return value in self._index
+        except TypeError:
+            return False
+
+    def to_list(self):
+        """Return the values as a new list, such as for RadioFeatures"""
+        return list(self._values)
+
+
+_TABLES = {}
+
+
+def get_table(values):
+    """Return the shared CodeTable of @values"""
+    key = tuple(values)
+    try:
+        return _TABLES[key]
+    except KeyError:
+        table = _TABLES[key] = CodeTable(key)
+        return table
+
+
+TONES = get_table(chirp_common.TONES)
+DTCS_CODES = get_table(chirp_common.DTCS_CODES)
+# Many radios also accept DTCS code 645
+DTCS_CODES_645 = get_table(sorted(chirp_common.DTCS_CODES + [645]))
+
+
+class IndexedToneWord(object):
+    """The 16-bit tone words used by Baofeng, BTECH and similar radios.
+    Zero or 0xFFFF is no tone, a word of 0x0258 or more is a CTCSS tone
+    in tenths of a Hz, and anything else is the index of a DTCS code in
+    @dtcs_codes plus one, with @reverse_offset added for reverse
+    polarity. Use get_indexed_tone_word() to share one per table."""
+
+    MIN_TONE = 0x0258
+
+    def __init__(self, dtcs_codes, reverse_offset=0x69):
+        self.dtcs_codes = get_table(dtcs_codes)
+        self._words = {}
+        self._codes = {}
+        for i, code in enumerate(self.dtcs_codes):
+            for pol, word in (("N", i + 1), ("R", i + 1 + reverse_offset)):
+                self._words[(code, pol)] = word
+                self._codes[word] = (code, pol)
+
+    def decode(self, word):
+        """Return the (mode, value, polarity) of @word in the form used
+        by chirp_common.split_tone_decode()"""
+        word = int(word)
+        if word in (0, 0xFFFF):
+            return "", None, None
+        elif word >= self.MIN_TONE:
+            return "Tone", word / 10.0, None
+        try:
+            code, pol = self._codes[word]
+        except KeyError:
+            raise IndexError("Invalid DTCS tone word 0x%04X" % word)
+        return "DTCS", code, pol
+
+    def encode(self, mode, value=None, polarity=None):
+        """Return the word for a tone @mode ('', 'Tone' or 'DTCS') and
+        @value, with @polarity for DTCS"""
+        if not mode:
+            return 0
+        elif mode == "Tone":
+            return int(value * 10)
+        elif mode == "DTCS":
+            try:
+                return self._words[(value, polarity == "R" and "R" or "N")]
+            except KeyError:
+                raise ValueError("DTCS code %s is not supported" % value)
+        raise ValueError("Invalid tone mode `%s'" % mode)
+
+
+_TONE_WORDS = {}
+
+
+def get_indexed_tone_word(dtcs_codes, reverse_offset=0x69):
+    """Return the shared IndexedToneWord for @dtcs_codes and
+    @reverse_offset"""
+    key = (tuple(dtcs_codes), reverse_offset)
+    try:
+        return _TONE_WORDS[key]
+    except KeyError:
+        codec = _TONE_WORDS[key] = IndexedToneWord(dtcs_codes,
+                                                   reverse_offset)
+        return codec
+
+
+# The decimal form of every 11-bit octal value, and the reverse for the
+# three-digit codes that DTCS uses
+_OCTAL_TO_DCS = [int("%03o" % value) for value in range(0x800)]
+_DCS_TO_OCTAL = dict((code, value)
+                     for value, code in enumerate(_OCTAL_TO_DCS))
+
+
+def octal_to_dcs(value):
+    """Return the DTCS code stored as an octal value in the low 11 bits
+    of @value (0x2A for 52)"""
+    return _OCTAL_TO_DCS[int(value) & 0x07FF]
+
+
+def dcs_to_octal(code):
+    """Return DTCS @code as the octal value radios store (0x2A for 52)"""
+    try:
+        return _DCS_TO_OCTAL[code]
+    except (KeyError, TypeError):
+        return int("%i" % code, 8)
+
+
+# The decimal value of an lbcd[2] tone field that is all 0xFF
+BCD_TONE_EMPTY = 16665
+
+
+def get_bcd_tone(field):
+    """Return the (mode, value, polarity) of the lbcd[2] tone @field
+    used by the H777, many Retevis radios and similar ones. All 0xFF is
+    no tone, a CTCSS tone is stored as tenths of a Hz, and a DTCS code
+    has 8000 added (0x80 in the top byte), or 12000 (0xC0) for reverse
+    polarity."""
+    value = int(field)
+    if value == BCD_TONE_EMPTY:
+        return "", None, None
+    elif value >= 12000:
+        return "DTCS", value - 12000, "R"
+    elif value >= 8000:
+        return "DTCS", value - 8000, "N"
+    return "Tone", value / 10.0, None
+
+
+def set_bcd_tone(field, mode, value, polarity=None):
+    """Store a tone @mode ('', 'Tone' or 'DTCS') and @value, with
+    @polarity for DTCS, in the lbcd[2] tone @field like get_bcd_tone()
+    reads it"""
+    if mode == "":
+        field[0].set_raw(0xFF)
+        field[1].set_raw(0xFF)
+    elif mode == "Tone":
+        field.set_value(int(value * 10))
+    elif mode == "DTCS":
+        field.set_value(value)
+        field[1].set_bits(polarity == "N" and 0x80 or 0xC0)
+    else:
+        raise ValueError("Invalid tone mode `%s'" % mode)
@@ -41,6 +41,9 @@ class BandPlans(object):
                      bandplan_iaru_r2, bandplan_iaru_r3):
             name = plan.DESC.get("name", plan.SHORTNAME)
             self.plans[plan.SHORTNAME] = (name, plan)
+            if hasattr(plan, "index"):
+                # Already compiled by another instance
+                continue
 
             rpt_inputs = []
             for band in plan.BANDS:
@@ -55,34 +58,46 @@ class BandPlans(object):
                     rpt_inputs.append(band.inverse())
             plan.bands = list(plan.BANDS)
             plan.bands.extend(rpt_inputs)
+            plan.index = bandplan.BandIndex(plan.bands)
 
-    def get_defaults_for_frequency(self, freq):
+    def _enabled_plans(self):
+        return [details[1] for shortname, details in self.plans.items()
+                if self._config.get_bool(shortname, "bandplan")]
+
+    def get_defaults_for_frequency(self, freq, plans=None):
         freq = int(freq)
         result = bandplan.Band((freq, freq), repr(freq))
 
-        for shortname, details in self.plans.items():
-            if self._config.get_bool(shortname, "bandplan"):
-                matches = [x for x in details[1].bands if x.contains(result)]
-                # Add matches to defaults, favoring more specific matches.
-                matches = sorted(matches, key=lambda x: x.width(),
-                                 reverse=True)
-                for match in matches:
-                    result.mode = match.mode or result.mode
-                    result.step_khz = match.step_khz or result.step_khz
-                    result.offset = match.offset or result.offset
-                    result.duplex = match.duplex or result.duplex
-                    result.tones = match.tones or result.tones
-                    if match.name:
-                        result.name = '/'.join((result.name or '', match.name))
-                # Limit ourselves to one band plan match for simplicity.
-                # Note that if the user selects multiple band plans by editing
-                # the config file it will work as expected (except where plans
-                # conflict).
-                if matches:
-                    break
+        if plans is None:
+            plans = self._enabled_plans()
+        for plan in plans:
+            # Add matches to defaults, favoring more specific matches.
+            matches = plan.index.lookup(freq)
+            for match in matches:
+                result.mode = match.mode or result.mode
+                result.step_khz = match.step_khz or result.step_khz
+                result.offset = match.offset or result.offset
+                result.duplex = match.duplex or result.duplex
+                result.tones = match.tones or result.tones
+                if match.name:
+                    result.name = '/'.join((result.name or '', match.name))
+            # Limit ourselves to one band plan match for simplicity.
+            # Note that if the user selects multiple band plans by editing
+            # the config file it will work as expected (except where plans
+            # conflict).
+            if matches:
+                break
 
         return result
 
+    def get_defaults_for_frequencies(self, freqs):
+        """Return a list of the defaults for each of @freqs, like
+        get_defaults_for_frequency(), looking up the enabled band plans
+        once for all of them"""
+        plans = self._enabled_plans()
+        return [self.get_defaults_for_frequency(freq, plans)
+                for freq in freqs]
+
     def select_bandplan(self, parent_window):
         plans = ["None"]
         for shortname, details in self.plans.iteritems():
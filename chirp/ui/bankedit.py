@@ -45,6 +45,9 @@ class MappingNamesJob(common.RadioJob):
 class MappingNameEditor(common.Editor):
     def refresh(self):
         def got_mappings():
+            if self._item_set_id is not None:
+                # Setting the names below is not a change by the user
+                self.listw.disconnect(self._item_set_id)
             self._keys = []
             for mapping, name in self.mappings:
                 self._keys.append(mapping.get_index())
@@ -52,7 +55,8 @@ class MappingNameEditor(common.Editor):
                                     mapping.get_index(),
                                     name)
 
-            self.listw.connect("item-set", self.mapping_changed)
+            self._item_set_id = self.listw.connect("item-set",
+                                                   self.mapping_changed)
 
         job = MappingNamesJob(self._model, self, got_mappings)
         job.set_desc(_("Retrieving %s information") % self._type)
@@ -99,6 +103,7 @@ class MappingNameEditor(common.Editor):
         self.listw.show()
 
         self.mappings = []
+        self._item_set_id = None
 
         sw = gtk.ScrolledWindow()
         sw.set_policy(gtk.POLICY_AUTOMATIC, gtk.POLICY_AUTOMATIC)
@@ -119,29 +124,30 @@ class MappingNameEditor(common.Editor):
         if self.is_focused():
             self.refresh_all_memories()
 
+    def radio_changed(self):
+        if self._loaded:
+            self.refresh()
+
     def mappings_changed(self):
         pass
 
 
 class MemoryMappingsJob(common.RadioJob):
-    def __init__(self, model, cb, number):
+    def __init__(self, model, cb, lo, hi):
         common.RadioJob.__init__(self, cb, None)
         self.__model = model
-        self.__number = number
+        self.__lo = lo
+        self.__hi = hi
 
     def execute(self, radio):
-        mem = radio.get_memory(self.__number)
-        if mem.empty:
-            mappings = []
-            indexes = []
-        else:
-            mappings = self.__model.get_memory_mappings(mem)
-            indexes = []
-            if isinstance(self.__model,
-                          chirp_common.MappingModelIndexInterface):
-                for mapping in mappings:
-                    indexes.append(self.__model.get_memory_index(mem, mapping))
-        self.cb(mem, mappings, indexes, *self.cb_args)
+        memories = []
+        for number in range(self.__lo, self.__hi + 1):
+            try:
+                memories.append(radio.get_memory(number))
+            except Exception, e:
+                LOG.error("Unable to get memory %i: %s" % (number, e))
+        table = self.__model.get_all_memory_mappings(self.__lo, self.__hi)
+        gobject.idle_add(self.cb, memories, table, *self.cb_args)
 
 
 class MappingMembershipEditor(common.Editor):
@@ -355,34 +361,47 @@ class MappingMembershipEditor(common.Editor):
         self.root = sw
         self._loaded = False
 
-    def refresh_memory(self, number):
-        def got_mem(memory, mappings, indexes):
-            iter = self._store.get_iter(self._number_to_path(memory.number))
-            row = [self.C_FILLED, not memory.empty,
-                   self.C_LOC, memory.number,
-                   self.C_FREQ, chirp_common.format_freq(memory.freq),
-                   self.C_NAME, memory.name,
-                   # Hack for only one index right now
-                   self.C_INDEX, indexes and indexes[0] or 0,
-                   ]
-            for i in range(0, len(self.mappings)):
-                row.append(i + len(self._cols))
-                row.append(self.mappings[i][0] in mappings)
-
-            self._store.set(iter, *tuple(row))
-
-        job = MemoryMappingsJob(self._model, got_mem, number)
-        job.set_desc(_("Getting {type} information "
-                       "for memory {num}").format(type=self._type, num=number))
+    def _refresh_memories(self, lo, hi):
+        start = time.time()
+
+        def got_mems(memories, table):
+            for memory in memories:
+                if memory.empty:
+                    mappings, indexes = [], []
+                else:
+                    mappings, indexes = table.get(memory.number, ([], []))
+                iter = self._store.get_iter(
+                    self._number_to_path(memory.number))
+                row = [self.C_FILLED, not memory.empty,
+                       self.C_LOC, memory.number,
+                       self.C_FREQ, chirp_common.format_freq(memory.freq),
+                       self.C_NAME, memory.name,
+                       # Hack for only one index right now
+                       self.C_INDEX, indexes and indexes[0] or 0,
+                       ]
+                for i in range(0, len(self.mappings)):
+                    row.append(i + len(self._cols))
+                    row.append(self.mappings[i][0] in mappings)
+
+                self._store.set(iter, *tuple(row))
+            LOG.debug("Got %s info for %i memories in %s" %
+                      (self._type, len(memories), (time.time() - start)))
+
+        job = MemoryMappingsJob(self._model, got_mems, lo, hi)
+        if lo == hi:
+            job.set_desc(_("Getting {type} information "
+                           "for memory {num}").format(type=self._type,
+                                                      num=lo))
+        else:
+            job.set_desc(_("Getting {type} information "
+                           "for all memories").format(type=self._type))
         self.rthread.submit(job)
 
+    def refresh_memory(self, number):
+        self._refresh_memories(number, number)
+
     def refresh_all_memories(self):
-        start = time.time()
-        (min, max) = self._rf.memory_bounds
-        for i in range(min, max+1):
-            self.refresh_memory(i)
-        LOG.debug("Got all %s info in %s" %
-                  (self._type, (time.time() - start)))
+        self._refresh_memories(*self._rf.memory_bounds)
 
     def refresh_mappings(self, and_memories=False):
         def got_mappings():
@@ -415,5 +434,11 @@ class MappingMembershipEditor(common.Editor):
         if self.is_focused():
             self.refresh_all_memories()
 
+    def radio_changed(self):
+        # The mapping names may have changed too
+        self._loaded = False
+        if self.is_focused():
+            self.focus()
+
     def mappings_changed(self):
         self.refresh_mappings()
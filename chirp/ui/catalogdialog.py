@@ -0,0 +1,206 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+
+import gtk
+import gobject
+
+from chirp import catalog, chirp_common, platform
+from chirp.ui import common, config, miscwidgets
+
+LOG = logging.getLogger(__name__)
+
+ANY = _("Any")
+
+
+def catalog_path():
+    """Return the path of the GUI's catalog index"""
+    return platform.get_platform().config_file("catalog.db")
+
+
+class CatalogDialog(gtk.Dialog):
+    """Searches the memories of all the images in a directory. @open_fn
+    is called with the path of an image when a result is activated."""
+
+    def __init__(self, open_fn=None, parent=None):
+        gtk.Dialog.__init__(self, _("Search Image Catalog"),
+                            parent=parent,
+                            buttons=(gtk.STOCK_CLOSE, gtk.RESPONSE_CLOSE))
+        self.set_default_size(700, 400)
+        self._open_fn = open_fn
+        self._catalog = catalog.Catalog(catalog_path())
+        self._scanning = False
+        self._closed = False
+        self.connect("destroy", self._destroyed)
+        self._make_ui()
+
+    def _destroyed(self, widget):
+        self._closed = True
+        self._catalog.close()
+
+    def _update(self, fn, *args):
+        """Call @fn with @args from the main loop, unless the dialog has
+        been closed by then, as it can be while a scan is running"""
+        def update():
+            if not self._closed:
+                fn(*args)
+        gobject.idle_add(update)
+
+    def _make_ui(self):
+        conf = config.get("state")
+
+        hbox = gtk.HBox(False, 3)
+        hbox.pack_start(gtk.Label(_("Directory")), 0, 0, 0)
+        self._dir = gtk.Entry()
+        self._dir.set_text(conf.get("catalog_dir") or
+                           platform.get_platform().get_last_dir())
+        hbox.pack_start(self._dir, 1, 1, 0)
+        browse = gtk.Button(_("Browse"))
+        browse.connect("clicked", self._browse)
+        hbox.pack_start(browse, 0, 0, 0)
+        self._scan = gtk.Button(_("Scan"))
+        self._scan.connect("clicked", self._start_scan)
+        hbox.pack_start(self._scan, 0, 0, 0)
+        hbox.show_all()
+        self.vbox.pack_start(hbox, 0, 0, 3)
+
+        hbox = gtk.HBox(False, 3)
+        self._freq = gtk.Entry()
+        self._tone = gtk.Entry()
+        self._name = gtk.Entry()
+        self._mode = miscwidgets.make_choice([ANY] + chirp_common.MODES,
+                                             False, ANY)
+        for label, widget, width in [(_("Frequency"), self._freq, 12),
+                                     (_("Tone"), self._tone, 6),
+                                     (_("Name"), self._name, 10),
+                                     (_("Mode"), self._mode, None)]:
+            hbox.pack_start(gtk.Label(label), 0, 0, 0)
+            if width:
+                widget.set_width_chars(width)
+                widget.connect("activate", self._search)
+            hbox.pack_start(widget, 0, 0, 0)
+        search = gtk.Button(_("Search"))
+        search.connect("clicked", self._search)
+        hbox.pack_end(search, 0, 0, 0)
+        hbox.show_all()
+        self.vbox.pack_start(hbox, 0, 0, 3)
+
+        self._store = gtk.ListStore(gobject.TYPE_STRING,
+                                    gobject.TYPE_STRING,
+                                    gobject.TYPE_INT,
+                                    gobject.TYPE_STRING,
+                                    gobject.TYPE_STRING,
+                                    gobject.TYPE_STRING,
+                                    gobject.TYPE_STRING,
+                                    gobject.TYPE_STRING)
+        view = gtk.TreeView(self._store)
+        for i, title in enumerate([_("File"), _("Radio"), _("Loc"),
+                                   _("Name"), _("Frequency"), _("Tone Mode"),
+                                   _("Tone"), _("Mode")]):
+            column = gtk.TreeViewColumn(title, gtk.CellRendererText(),
+                                        text=i)
+            column.set_sort_column_id(i)
+            column.set_resizable(True)
+            view.append_column(column)
+        view.connect("row-activated", self._activated)
+
+        sw = gtk.ScrolledWindow()
+        sw.set_policy(gtk.POLICY_AUTOMATIC, gtk.POLICY_AUTOMATIC)
+        sw.add(view)
+        sw.show_all()
+        self.vbox.pack_start(sw, 1, 1, 3)
+
+        self._status = gtk.Label("")
+        self._status.set_alignment(0.0, 0.5)
+        self._status.show()
+        self.vbox.pack_start(self._status, 0, 0, 3)
+
+    def _browse(self, button):
+        path = platform.get_platform().gui_select_dir(self._dir.get_text())
+        if path:
+            self._dir.set_text(path)
+
+    def _start_scan(self, button):
+        if self._scanning:
+            return
+        self._scanning = True
+        root = self._dir.get_text()
+        config.get("state").set("catalog_dir", root)
+        self._scan.set_sensitive(False)
+        thread = threading.Thread(target=self._scan_thread, args=(root,))
+        thread.start()
+
+    def _scan_thread(self, root):
+        # SQLite connections belong to the thread that made them
+        cat = catalog.Catalog(catalog_path())
+        try:
+            result = cat.scan(root, status_fn=lambda path: self._update(
+                self._status.set_text, _("Scanning {file}").format(
+                    file=path)))
+            message = _("Scanned {dir}: {result}").format(dir=root,
+                                                          result=result)
+        except Exception, e:
+            LOG.exception("Catalog scan failed")
+            message = _("Scan failed: {error}").format(error=e)
+        finally:
+            cat.close()
+        self._update(self._scan_done, message)
+
+    def _scan_done(self, message):
+        self._scanning = False
+        self._scan.set_sensitive(True)
+        self._status.set_text(message)
+
+    def _search(self, widget):
+        try:
+            freq = None
+            if self._freq.get_text().strip():
+                values = [chirp_common.parse_freq(v)
+                          for v in self._freq.get_text().split("-", 1)]
+                freq = len(values) == 2 and tuple(values) or values[0]
+            tone = None
+            if self._tone.get_text().strip():
+                tone = float(self._tone.get_text())
+        except ValueError, e:
+            common.show_error(_("Invalid search: {error}").format(error=e))
+            return
+
+        mode = self._mode.get_active_text()
+        hits = self._catalog.search(freq=freq, tone=tone,
+                                    name=self._name.get_text().strip(),
+                                    mode=mode != ANY and mode or None)
+        self._store.clear()
+        for hit in hits:
+            mem = hit.memory
+            if mem.tmode == "Tone":
+                tone = "%.1f" % mem.rtone
+            elif mem.tmode == "TSQL":
+                tone = "%.1f" % mem.ctone
+            elif mem.tmode == "DTCS":
+                tone = "%03i" % mem.dtcs
+            else:
+                tone = ""
+            self._store.append((hit.path, "%s %s" % (hit.vendor, hit.model),
+                                mem.number, mem.name,
+                                chirp_common.format_freq(mem.freq),
+                                mem.tmode, tone, mem.mode))
+        self._status.set_text(_("{count} memories found").format(
+            count=len(hits)))
+
+    def _activated(self, view, path, column):
+        if self._open_fn:
+            self._open_fn(self._store[path][0])
@@ -21,7 +21,7 @@ import os
 import gtk
 import gobject
 
-from chirp import platform, directory, detect, chirp_common
+from chirp import platform, directory, detect, chirp_common, stats
 from chirp.ui import miscwidgets, cloneprog, inputdialog, common, config
 
 LOG = logging.getLogger(__name__)
@@ -171,7 +171,17 @@ class CloneSettingsDialog(gtk.Dialog):
         cs.port = self.__port.get_active_text()
         if model == _("Detect"):
             try:
-                cs.radio_class = detect.DETECT_FUNCTIONS[vendor](cs.port)
+                # Probe every port at once, in case the radio is not on
+                # the one that was picked, but only look elsewhere once
+                # that one has not answered
+                ports = platform.get_platform().list_serial_ports()
+                if cs.port not in ports:
+                    ports.insert(0, cs.port)
+                found = detect.detect_radios(vendor, ports, prefer=cs.port)
+                if cs.port not in found and len(found) == 1:
+                    cs.port, = found.keys()
+                    LOG.info("Found a radio on %s instead" % cs.port)
+                cs.radio_class = found.get(cs.port)
                 if not cs.radio_class:
                     raise Exception(
                         _("Unable to detect radio on {port}").format(
@@ -250,9 +260,11 @@ class CloneThread(threading.Thread):
 
         try:
             if self.__out:
-                self.__radio.sync_out()
+                with stats.transfer(self.__radio, "out"):
+                    self.__radio.sync_out()
             else:
-                self.__radio.sync_in()
+                with stats.transfer(self.__radio, "in"):
+                    self.__radio.sync_in()
 
             emsg = None
         except Exception, e:
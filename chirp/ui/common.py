@@ -17,13 +17,14 @@ import gtk
 import gobject
 import pango
 
+import heapq
 import threading
 import time
 import os
 import traceback
 import logging
 
-from chirp import errors
+from chirp import chirp_common, errors, stats
 from chirp.ui import reporting, config
 
 LOG = logging.getLogger(__name__)
@@ -76,6 +77,12 @@ class Editor(gobject.GObject):
     def other_editor_changed(self, editor):
         pass
 
+    def radio_changed(self):
+        """Called when the radio was changed without this or any other
+        editor being involved, such as by an undo, so that everything
+        shown should be read again"""
+        self.other_editor_changed(None)
+
 gobject.type_register(Editor)
 
 
@@ -84,7 +91,19 @@ def DBG(*args):
         LOG.debug(" ".join(args))
 
 
+def _copy_result(result):
+    """Return a copy of @result that a callback can change without
+    affecting the other jobs sharing it"""
+    if isinstance(result, chirp_common.Memory):
+        return result.dupe()
+    return result
+
+
 class RadioJob:
+    # Jobs that only read from the radio. Identical ones that are waiting
+    # to run at the same time can share a single call.
+    COALESCE_FUNCS = ["get_memory", "get_raw_memory"]
+
     def __init__(self, cb, func, *args, **kwargs):
         self.cb = cb
         self.cb_args = ()
@@ -93,6 +112,9 @@ class RadioJob:
         self.kwargs = kwargs
         self.desc = "Working"
         self.target = None
+        self.tag = None
+        # Coalesced jobs that get a copy of this job's result
+        self.shared = []
         self.tb = traceback.format_stack()
 
     def __str__(self):
@@ -107,13 +129,36 @@ class RadioJob:
     def set_target(self, target):
         self.target = target
 
+    def set_tag(self, tag):
+        """Set a @tag that can be passed to RadioThread.cancel() to drop
+        this job if it has not run yet"""
+        self.tag = tag
+
+    def changes_radio(self):
+        """Return False for jobs that only read from the radio, which are
+        left out of the undo history"""
+        return not (self.func or "").startswith("get_")
+
+    def coalesce_key(self):
+        """Return a key shared by jobs that can be answered by the same
+        call, or None if this job must always run on its own"""
+        if self.func not in self.COALESCE_FUNCS or self.kwargs:
+            return None
+        key = (id(self.target), self.func, self.args)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
     def _execute(self, target, func):
         try:
             DBG("Running %s (%s %s)" % (self.func,
                                         str(self.args),
                                         str(self.kwargs)))
             DBG(self.desc)
-            result = func(*self.args, **self.kwargs)
+            with stats.timer("job.%s" % self.func):
+                result = func(*self.args, **self.kwargs)
         except errors.InvalidMemoryLocation, e:
             result = e
         except Exception, e:
@@ -125,11 +170,19 @@ class RadioJob:
                       (os.linesep, "".join(self.tb[:-1])))
             result = e
 
+        # Copy before any callback can change the result
+        for job in self.shared:
+            job.deliver(_copy_result(result))
+        self.deliver(result)
+        return result
+
+    def deliver(self, result):
+        """Pass @result to the callback, from the main loop"""
         if self.cb:
             gobject.idle_add(self.cb, result, *self.cb_args)
 
     def execute(self, radio):
-        if not self.target:
+        if self.target is None:
             self.target = radio
 
         try:
@@ -139,7 +192,7 @@ class RadioJob:
                       (self.func, self.target))
             return
 
-        self._execute(self.target, func)
+        return self._execute(self.target, func)
 
 
 class RadioThread(threading.Thread, gobject.GObject):
@@ -148,23 +201,44 @@ class RadioThread(threading.Thread, gobject.GObject):
                    (gobject.TYPE_STRING,)),
         }
 
+    # Minimum number of seconds between status updates, so that a run of
+    # quick jobs does not flood the main loop
+    STATUS_INTERVAL = 0.1
+
     def __init__(self, radio, parent=None):
         threading.Thread.__init__(self)
         gobject.GObject.__init__(self)
-        self.__queue = {}
+
+        # A heap of [priority, sequence, jobs, coalesce key] entries. The
+        # jobs in an entry share one call to the radio; an entry whose
+        # jobs have all been cancelled is left in place and skipped.
+        self.__queue = []
+        self.__sequence = 0
+        self.__counts = {}
+        self.__njobs = 0
+        self.__coalesce = {}
+        self.__running = None
+        self.__last_status = 0
+
         if parent:
             self.__runlock = parent._get_run_lock()
-            self.status = lambda msg: parent.status(msg)
+            self.status = lambda msg, force=False: parent.status(msg, force)
         else:
             self.__runlock = threading.Lock()
             self.status = self._status
 
-        self.__counter = threading.Semaphore(0)
         self.__lock = threading.Lock()
+        self.__cond = threading.Condition(self.__lock)
 
         self.__enabled = True
         self.radio = radio
 
+        # The undo history that jobs changing the radio are recorded in
+        if parent:
+            self.journal = parent.journal
+        else:
+            self.journal = None
+
     def _get_run_lock(self):
         return self.__runlock
 
@@ -174,28 +248,58 @@ class RadioThread(threading.Thread, gobject.GObject):
     def _qunlock(self):
         self.__lock.release()
 
+    def _qpush(self, priority, jobs, key):
+        entry = [priority, self.__sequence, jobs, key]
+        self.__sequence += 1
+        heapq.heappush(self.__queue, entry)
+        self.__counts[priority] = self.__counts.get(priority, 0) + 1
+        self.__njobs += 1
+        if key is not None:
+            self.__coalesce[key] = entry
+        return entry
+
+    def _qforget(self, entry):
+        """Account for @entry leaving the queue (with the lock held)"""
+        self.__counts[entry[0]] -= 1
+        self.__njobs -= 1
+        if self.__coalesce.get(entry[3]) is entry:
+            del self.__coalesce[entry[3]]
+
     def _qsubmit(self, job, priority):
-        if priority not in self.__queue:
-            self.__queue[priority] = []
+        key = job.coalesce_key()
+        entry = key is not None and self.__coalesce.get(key)
+        if entry:
+            entry[2].append(job)
+            if priority < entry[0]:
+                # Move the shared call up to the more urgent priority
+                self._qforget(entry)
+                jobs, entry[2] = entry[2], []
+                self._qpush(priority, jobs, key)
+            return
+
+        if key is None:
+            # This job may change the radio, so reads submitted after it
+            # must not share a call with reads queued before it
+            self.__coalesce.clear()
 
-        self.__queue[priority].append(job)
-        self.__counter.release()
+        self._qpush(priority, [job], key)
+        self.__cond.notify_all()
 
     def _queue_clear_below(self, priority):
-        for i in range(0, priority):
-            if i in self.__queue and len(self.__queue[i]) != 0:
+        if self.__running is not None and self.__running < priority:
+            return False
+
+        for i, count in self.__counts.items():
+            if i < priority and count:
                 return False
 
         return True
 
     def _qlock_when_idle(self, priority=10):
-        while True:
-            DBG("Attempting queue lock (%i)" % len(self.__queue))
-            self._qlock()
-            if self._queue_clear_below(priority):
-                return
-            self._qunlock()
-            time.sleep(0.1)
+        DBG("Attempting queue lock (%i)" % self.__njobs)
+        self._qlock()
+        while not self._queue_clear_below(priority):
+            self.__cond.wait()
 
     # This is the external lock, which stops any threads from running
     # so that the radio can be operated synchronously
@@ -210,57 +314,104 @@ class RadioThread(threading.Thread, gobject.GObject):
         self._qsubmit(job, priority)
         self._qunlock()
 
+    def _qdrop(self, match):
+        """Remove the jobs for which @match(priority, job) is true from the
+        queue (with the lock held) and return the number removed"""
+        count = 0
+        for entry in self.__queue:
+            if not entry[2]:
+                continue
+            keep = [job for job in entry[2] if not match(entry[0], job)]
+            count += len(entry[2]) - len(keep)
+            if not keep:
+                self._qforget(entry)
+            entry[2] = keep
+
+        self.__queue = [entry for entry in self.__queue if entry[2]]
+        heapq.heapify(self.__queue)
+        self.__cond.notify_all()
+        return count
+
     def flush(self, priority=None):
         self._qlock()
+        self._qdrop(lambda p, job: priority is None or p == priority)
+        self._qunlock()
 
-        if priority is None:
-            for i in self.__queue.keys():
-                self.__queue[i] = []
-        else:
-            self.__queue[priority] = []
-
+    def cancel(self, tag):
+        """Drop any jobs set with @tag that have not started yet"""
+        self._qlock()
+        count = self._qdrop(lambda p, job: job.tag == tag)
         self._qunlock()
+        if count:
+            LOG.debug("Cancelled %i jobs" % count)
+        return count
 
     def stop(self):
-        self.flush()
-        self.__counter.release()
+        self._qlock()
         self.__enabled = False
+        self._qdrop(lambda p, job: True)
+        self._qunlock()
 
-    def _status(self, msg):
-        jobs = 0
-        for i in dict(self.__queue):
-                jobs += len(self.__queue[i])
-        gobject.idle_add(self.emit, "status", "[%i] %s" % (jobs, msg))
+    def _status(self, msg, force=False):
+        now = time.time()
+        if not force and now - self.__last_status < self.STATUS_INTERVAL:
+            return
+        self.__last_status = now
+        gobject.idle_add(self.emit, "status", "[%i] %s" % (self.__njobs, msg))
+
+    def _execute(self, job):
+        journal = self.journal
+        if journal is None or job.target is journal or \
+                not job.changes_radio():
+            return job.execute(self.radio)
 
-    def _queue_pop(self, priority):
+        journal.begin(job.desc)
         try:
-            return self.__queue[priority].pop(0)
-        except IndexError:
-            return None
+            return job.execute(self.radio)
+        finally:
+            journal.end()
+
+    def _queue_pop(self):
+        while self.__queue:
+            entry = heapq.heappop(self.__queue)
+            if entry[2]:
+                self._qforget(entry)
+                return entry
+        return None
 
     def run(self):
         last_job_desc = "idle"
         while self.__enabled:
-            DBG("Waiting for a job")
-            if last_job_desc:
-                self.status(_("Completed") + " " + last_job_desc +
-                            " (" + _("idle") + ")")
-            self.__counter.acquire()
-
             self._qlock()
-            for i in sorted(self.__queue.keys()):
-                job = self._queue_pop(i)
-                if job:
-                    DBG("Running job at priority %i" % i)
-                    break
+            if not self.__queue and last_job_desc:
+                self.status(_("Completed") + " " + last_job_desc +
+                            " (" + _("idle") + ")", True)
+                last_job_desc = None
+            DBG("Waiting for a job")
+            while self.__enabled and not self.__queue:
+                self.__cond.wait()
+            entry = self._queue_pop()
+            if entry:
+                DBG("Running job at priority %i" % entry[0])
+                self.__running = entry[0]
             self._qunlock()
 
-            if job:
-                self.lock()
-                self.status(job.desc)
-                job.execute(self.radio)
-                last_job_desc = job.desc
+            if not entry:
+                continue
+
+            jobs = entry[2]
+            jobs[0].shared = jobs[1:]
+            self.lock()
+            try:
+                self.status(jobs[0].desc)
+                self._execute(jobs[0])
+                last_job_desc = jobs[0].desc
+            finally:
                 self.unlock()
+                self._qlock()
+                self.__running = None
+                self.__cond.notify_all()
+                self._qunlock()
 
         LOG.debug("RadioThread exiting")
 
@@ -314,6 +465,91 @@ def combo_select(box, value):
     return False
 
 
+class RowIndex(object):
+    """An index of the rows of a gtk.TreeModel by the value in @column
+
+    The index follows the model's row-inserted, row-changed and
+    row-deleted signals and holds a gtk.TreeRowReference for each row,
+    so rows stay findable as others are inserted, removed or reordered.
+    Entries for rows that have since been removed or changed value are
+    dropped when they are looked up, and all at once when there are
+    more of them than rows in the model.
+    """
+
+    # Don't bother pruning an index with fewer stale entries than this
+    MIN_PRUNE = 64
+
+    def __init__(self, model, column):
+        self._model = model
+        self._column = column
+        self._index = {}
+        self._stale = 0
+        model.connect("row-inserted", self._row_inserted)
+        model.connect("row-changed", self._row_changed)
+        model.connect("row-deleted", self._row_deleted)
+
+    def _add(self, model, key, path):
+        self._index.setdefault(key, []).append(
+            gtk.TreeRowReference(model, path))
+        # The row may still be indexed by a value it had before
+        self._stale += 1
+        if self._stale > max(len(model), self.MIN_PRUNE):
+            self._prune()
+
+    def _row_inserted(self, model, path, iter):
+        # A new row can't be indexed yet. A row added with append(row=...)
+        # has its values already, and is not followed by row-changed.
+        self._add(model, model.get(iter, self._column)[0], path)
+
+    def _row_changed(self, model, path, iter):
+        key, = model.get(iter, self._column)
+        for ref in self._index.get(key, []):
+            if ref.valid() and ref.get_path() == path:
+                return
+        self._add(model, key, path)
+
+    def _row_deleted(self, model, path):
+        if model.get_iter_first() is None:
+            self.clear()
+        else:
+            self._stale += 1
+
+    def _prune(self):
+        for key in self._index.keys():
+            self.find_all(key)
+        self._stale = 0
+
+    def clear(self):
+        """Forget all rows, such as after clearing the model"""
+        self._index = {}
+        self._stale = 0
+
+    def find_all(self, key):
+        """Return iters for all the rows with value @key, in the order
+        they were indexed"""
+        iters = []
+        live = []
+        for ref in self._index.get(key, []):
+            if not ref.valid():
+                continue
+            iter = self._model.get_iter(ref.get_path())
+            if self._model.get(iter, self._column)[0] != key:
+                continue
+            iters.append(iter)
+            live.append(ref)
+
+        if live:
+            self._index[key] = live
+        else:
+            self._index.pop(key, None)
+        return iters
+
+    def find(self, key):
+        """Return an iter for the row with value @key, or None"""
+        iters = self.find_all(key)
+        return iters and iters[0] or None
+
+
 def _add_text(d, text):
     v = gtk.TextView()
     v.get_buffer().set_text(text)
@@ -14,17 +14,21 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import tempfile
 import gtk
 import gobject
 import logging
 
-from chirp import chirp_common, directory
+from chirp import autosave, chirp_common, directory, platform, undo
 from chirp.drivers import generic_csv
 from chirp.ui import memedit, dstaredit, bankedit, common, importdialog
 from chirp.ui import inputdialog, reporting, settingsedit, radiobrowser, config
 
 LOG = logging.getLogger(__name__)
 
+# Seconds between logging unsaved changes for crash recovery
+AUTOSAVE_INTERVAL = 30
+
 
 class EditorSet(gtk.VBox):
     __gsignals__ = {
@@ -119,6 +123,8 @@ class EditorSet(gtk.VBox):
             raise Exception("Unknown source type")
 
         rthread = common.RadioThread(self.radio)
+        self.journal = undo.Journal(self.radio)
+        rthread.journal = self.journal
         rthread.setDaemon(True)
         rthread.start()
 
@@ -138,6 +144,8 @@ class EditorSet(gtk.VBox):
 
         index = 0
         for device in devices:
+            if device is not self.radio:
+                self.journal.watch(device)
             devrthread = common.RadioThread(device, rthread)
             devrthread.setDaemon(True)
             devrthread.start()
@@ -171,6 +179,19 @@ class EditorSet(gtk.VBox):
         self.tooltip_filename = None
         self.update_tab()
 
+        self._autosave = None
+        self._autosave_timer = None
+        if isinstance(self.radio, chirp_common.CloneModeRadio) and \
+                self.radio.get_mmap() is not None:
+            self._autosave_rthread = rthread
+            if tempname is None and os.path.isfile(self.filename):
+                self._autosave_base = self.filename
+            else:
+                self._autosave_base = None
+            self._autosave_tick()
+            self._autosave_timer = gobject.timeout_add_seconds(
+                AUTOSAVE_INTERVAL, self._autosave_tick)
+
     def make_label(self):
         self.label = gtk.HBox(False, 0)
 
@@ -215,6 +236,10 @@ class EditorSet(gtk.VBox):
         self.rthread.lock()
         try:
             self.radio.save(fname)
+            if self._autosave:
+                # The saved file is the new starting point
+                self.journal.take_dirty()
+                self._autosave.reset(fname)
         except:
             self.rthread.unlock()
             raise
@@ -223,6 +248,31 @@ class EditorSet(gtk.VBox):
         self.modified = False
         self.update_tab()
 
+    def _autosave_tick(self):
+        job = common.RadioJob(None, "autosave")
+        job.set_target(self)
+        job.set_desc(_("Logging unsaved changes"))
+        self._autosave_rthread.submit(job, 20)
+        return True
+
+    def autosave(self):
+        """Log the changes made since the last call, from the radio
+        thread"""
+        try:
+            if self._autosave is None:
+                fd, path = tempfile.mkstemp(
+                    suffix=".log", prefix="autosave-",
+                    dir=platform.get_platform().autosave_dir())
+                os.close(fd)
+                self._autosave = autosave.AutosaveLog(path, self.radio,
+                                                      self._autosave_base,
+                                                      self.filename)
+            else:
+                self._autosave.update(self.journal)
+        except Exception, e:
+            # Not worth interrupting the user for; try again next time
+            LOG.warning("Unable to log unsaved changes: %s" % e)
+
     def dstar_changed(self, dstared, memedit):
         memedit.set_urcall_list(dstared.editor_ucall.get_callsigns())
         memedit.set_repeater_list(dstared.editor_rcall.get_callsigns())
@@ -237,6 +287,38 @@ class EditorSet(gtk.VBox):
             if editor != target_editor:
                 editor.other_editor_changed(target_editor)
 
+    def _replay_cb(self, change, nothing_msg, done_msg):
+        if isinstance(change, Exception):
+            common.show_error(str(change), parent=self.parent_window)
+        elif change is None:
+            self.emit("usermsg", nothing_msg)
+            return
+        else:
+            self.emit("usermsg", done_msg.format(change=change))
+
+        if not isinstance(self.radio, chirp_common.LiveRadio):
+            self.modified = True
+            self.update_tab()
+        for editor in self.editors.values():
+            editor and editor.radio_changed()
+
+    def _replay(self, func, desc, nothing_msg, done_msg):
+        job = common.RadioJob(self._replay_cb, func)
+        job.set_target(self.journal)
+        job.set_cb_args(nothing_msg, done_msg)
+        job.set_desc(desc)
+        self.rthread.submit(job)
+
+    def undo(self):
+        """Undo the last change made to the radio"""
+        self._replay("undo", _("Undoing"),
+                     _("Nothing to undo"), _("Undid: {change}"))
+
+    def redo(self):
+        """Redo the last change that was undone"""
+        self._replay("redo", _("Redoing"),
+                     _("Nothing to redo"), _("Redid: {change}"))
+
     def get_tab_label(self):
         return self.label
 
@@ -404,6 +486,12 @@ class EditorSet(gtk.VBox):
         for editor in self.editors.values():
             editor and editor.prepare_close()
 
+        # Whatever was not saved by now was not wanted
+        if self._autosave_timer:
+            gobject.source_remove(self._autosave_timer)
+        if self._autosave:
+            self._autosave.remove()
+
     def get_current_editor(self):
         tabs = self.tabs
         for lab, e in self.editors.items():
@@ -0,0 +1,141 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+
+import gtk
+import gobject
+
+from chirp import fleet, platform
+
+LOG = logging.getLogger(__name__)
+
+
+class FleetDialog(gtk.Dialog):
+    """Uploads the image of @radio to the radios on several ports at
+    once, with a progress bar for each port"""
+
+    def __init__(self, radio, parent=None):
+        gtk.Dialog.__init__(self, _("Upload To Several Radios"),
+                            parent=parent,
+                            buttons=(gtk.STOCK_CLOSE, gtk.RESPONSE_CLOSE),
+                            flags=gtk.DIALOG_MODAL)
+        self._radio = radio
+        self._programmer = None
+        self._rows = {}
+        self.connect("delete-event", lambda w, e: self._programmer is not None)
+        self._make_ui()
+
+    def _make_ui(self):
+        ports = platform.get_platform().list_serial_ports()
+
+        table = gtk.Table(max(len(ports), 1), 3)
+        table.set_row_spacings(3)
+        table.set_col_spacings(10)
+        for row, port in enumerate(ports):
+            check = gtk.CheckButton(port)
+            check.connect("toggled", lambda b: self._update_start())
+            progress = gtk.ProgressBar()
+            progress.set_size_request(150, -1)
+            label = gtk.Label("")
+            label.set_alignment(0.0, 0.5)
+            table.attach(check, 0, 1, row, row + 1, xoptions=gtk.FILL)
+            table.attach(progress, 1, 2, row, row + 1, xoptions=gtk.FILL)
+            table.attach(label, 2, 3, row, row + 1)
+            self._rows[port] = (check, progress, label)
+        if not ports:
+            table.attach(gtk.Label(_("No serial ports found")), 0, 3, 0, 1)
+        table.show_all()
+        self.vbox.pack_start(table, 1, 1, 1)
+
+        self._verify = gtk.CheckButton(
+            _("Read each radio back and compare its memories"))
+        self._verify.show()
+        self.vbox.pack_start(self._verify, 0, 0, 0)
+
+        self._summary = gtk.Label("")
+        self._summary.set_alignment(0.0, 0.5)
+        self._summary.show()
+        self.vbox.pack_start(self._summary, 0, 0, 0)
+
+        self._start = gtk.Button(_("Upload"))
+        self._start.connect("clicked", self._clicked)
+        self._start.show()
+        self.action_area.pack_start(self._start, 0, 0, 0)
+        self._update_start()
+
+    def _selected_ports(self):
+        return [port for port, (check, progress, label)
+                in sorted(self._rows.items()) if check.get_active()]
+
+    def _update_start(self):
+        self._start.set_sensitive(self._programmer is not None or
+                                  bool(self._selected_ports()))
+
+    def _clicked(self, button):
+        if self._programmer is None:
+            self._begin()
+        else:
+            self._programmer.cancel()
+            self._start.set_sensitive(False)
+
+    def _begin(self):
+        ports = self._selected_ports()
+        for port, (check, progress, label) in self._rows.items():
+            check.set_sensitive(False)
+            progress.set_fraction(0.0)
+            label.set_text(port in ports and _("Waiting") or "")
+        self._verify.set_sensitive(False)
+        self._summary.set_text("")
+        self.set_response_sensitive(gtk.RESPONSE_CLOSE, False)
+        self._start.set_label(_("Cancel"))
+
+        self._programmer = fleet.FleetProgrammer(
+            self._radio, ports, verify=self._verify.get_active(),
+            status_fn=self._status)
+        thread = threading.Thread(target=self._run, args=(self._programmer,))
+        thread.start()
+
+    def _run(self, programmer):
+        results = programmer.run()
+        gobject.idle_add(self._done, programmer, results)
+
+    def _status(self, port, status):
+        gobject.idle_add(self._show_status, port, status.msg,
+                         status.cur, status.max)
+
+    def _show_status(self, port, msg, cur, maximum):
+        check, progress, label = self._rows[port]
+        label.set_text(msg)
+        if maximum:
+            progress.set_fraction(min(cur, maximum) / float(maximum))
+
+    def _done(self, programmer, results):
+        for result in results:
+            check, progress, label = self._rows[result.port]
+            label.set_text(str(result).split(": ", 1)[1])
+            if result.ok:
+                progress.set_fraction(1.0)
+        self._summary.set_text(fleet.format_report(
+            results, programmer.elapsed).splitlines()[-1])
+
+        self._programmer = None
+        for check, progress, label in self._rows.values():
+            check.set_sensitive(True)
+        self._verify.set_sensitive(True)
+        self.set_response_sensitive(gtk.RESPONSE_CLOSE, True)
+        self._start.set_label(_("Upload"))
+        self._update_start()
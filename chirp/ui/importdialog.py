@@ -16,6 +16,7 @@
 import gtk
 import gobject
 import pango
+import threading
 import logging
 
 from chirp import errors, chirp_common, import_logic
@@ -23,6 +24,9 @@ from chirp.ui import common
 
 LOG = logging.getLogger(__name__)
 
+# Number of memories prepared before they are added to the list
+POPULATE_BATCH = 50
+
 
 class WaitWindow(gtk.Window):
     def __init__(self, msg, parent=None):
@@ -61,29 +65,72 @@ class WaitWindow(gtk.Window):
         self.prog.set_fraction(fraction)
 
 
-class ImportMemoryBankJob(common.RadioJob):
-    def __init__(self, cb, dst_mem, src_radio, src_mem):
-        common.RadioJob.__init__(self, cb, None)
-        self.__dst_mem = dst_mem
+def _error_message(error_messages):
+    msg = _("Error importing memories:") + "\r\n"
+    for num, err in sorted(error_messages.items()):
+        msg += "%s: %s\r\n" % (num, err)
+    return msg
+
+
+class ImportMemoriesJob(common.RadioJob):
+    """Store the converted memories of @pairs, a list of (dst_mem,
+    src_mem), with one set_memories() call and then copy their bank
+    membership from @src_radio. If that fails, each memory is stored on
+    its own and those that fail are reported."""
+
+    def __init__(self, cb, pairs, src_radio):
+        common.RadioJob.__init__(self, cb, "set_memories")
+        self.__pairs = pairs
         self.__src_radio = src_radio
-        self.__src_mem = src_mem
+
+    def _set_each(self, error_messages):
+        stored = []
+        for dst_mem, src_mem in self.__pairs:
+            try:
+                self.target.set_memory(dst_mem)
+            except Exception, e:
+                LOG.error("Failed to set memory %i: %s", dst_mem.number, e)
+                error_messages[dst_mem.number] = str(e)
+                continue
+            stored.append((dst_mem, src_mem))
+        return stored
+
+    def _import(self):
+        error_messages = {}
+        stored = self.__pairs
+        try:
+            self.target.set_memories([dst for dst, src in stored])
+        except Exception, e:
+            LOG.warning("Setting %i memories failed (%s), setting each",
+                        len(stored), e)
+            stored = self._set_each(error_messages)
+
+        for dst_mem, src_mem in stored:
+            try:
+                import_logic.import_bank(self.target, self.__src_radio,
+                                         dst_mem, src_mem)
+            except Exception, e:
+                LOG.error("Failed to import bank of memory %i: %s",
+                          dst_mem.number, e)
+                error_messages[dst_mem.number] = str(e)
+
+        if error_messages:
+            gobject.idle_add(common.show_error,
+                             _error_message(error_messages))
 
     def execute(self, radio):
-        import_logic.import_bank(radio, self.__src_radio,
-                                 self.__dst_mem, self.__src_mem)
-        if self.cb:
-            gobject.idle_add(self.cb, *self.cb_args)
+        if self.target is None:
+            self.target = radio
+        return self._execute(self.target, self._import)
 
 
 class ImportDialog(gtk.Dialog):
 
     def _check_for_dupe(self, location):
-        iter = self.__store.get_iter_first()
-        while iter:
-            imp, loc = self.__store.get(iter, self.col_import, self.col_nloc)
-            if imp and loc == location:
+        for iter in self.__index.find_all(location):
+            imp, = self.__store.get(iter, self.col_import)
+            if imp:
                 return True
-            iter = self.__store.iter_next(iter)
 
         return False
 
@@ -103,7 +150,7 @@ class ImportDialog(gtk.Dialog):
 
     def _render(self, _, rend, model, iter, colnum):
         newloc, imp = model.get(iter, self.col_nloc, self.col_import)
-        lo, hi = self.dst_radio.get_features().memory_bounds
+        lo, hi = self.__dst_bounds
 
         rend.set_property("text", "%i" % newloc)
         if newloc in self.used_list and imp:
@@ -243,6 +290,28 @@ class ImportDialog(gtk.Dialog):
         else:
             self.dst_radio.set_banks(src_banks)
 
+    def _prepare_import(self, old, new, name, comm, src_features):
+        candidate = self.__candidates.get(old)
+        if candidate and candidate.src_mem is not None:
+            src = candidate.src_mem
+        else:
+            src = self.src_radio.get_memory(old)
+
+        if candidate and candidate.dst_mem is not None and \
+                name == src.name and comm == src.comment:
+            # Not edited in the list, so the conversion done to build it
+            # still stands
+            mem = candidate.dst_mem.dupe()
+            mem.number = new
+        else:
+            mem = import_logic.convert_mem(self.dst_radio,
+                                           src_features,
+                                           src,
+                                           {"number":  new,
+                                            "name":    name,
+                                            "comment": comm})
+        return src, mem
+
     def do_import(self, dst_rthread):
         i = 0
         error_messages = {}
@@ -250,38 +319,38 @@ class ImportDialog(gtk.Dialog):
 
         src_features = self.src_radio.get_features()
 
+        prepared = []
         for old, new, name, comm in import_list:
             i += 1
             LOG.debug("%sing %i -> %i" % (self.ACTION, old, new))
+            try:
+                prepared.append(self._prepare_import(old, new, name, comm,
+                                                     src_features))
+            except import_logic.ImportError, e:
+                LOG.error("Import error: %s", e)
+                error_messages[new] = str(e)
 
-            src = self.src_radio.get_memory(old)
+        results = self.dst_radio.validate_memories(
+            [mem for src, mem in prepared])
 
+        pairs = []
+        for (src, mem), msgs in zip(prepared, results):
             try:
-                mem = import_logic.import_mem(self.dst_radio,
-                                              src_features,
-                                              src,
-                                              {"number":  new,
-                                               "name":    name,
-                                               "comment": comm})
+                import_logic.check_validation(msgs)
             except import_logic.ImportError, e:
                 LOG.error("Import error: %s", e)
-                error_messages[new] = str(e)
+                error_messages[mem.number] = str(e)
                 continue
+            pairs.append((mem, src))
 
-            job = common.RadioJob(None, "set_memory", mem)
-            desc = _("Setting memory {number}").format(number=mem.number)
-            job.set_desc(desc)
-            dst_rthread._qsubmit(job, 0)
-
-            job = ImportMemoryBankJob(None, mem, self.src_radio, src)
-            job.set_desc(_("Importing bank information"))
+        if pairs:
+            job = ImportMemoriesJob(None, pairs, self.src_radio)
+            job.set_desc(_("Setting {count} memories").format(
+                count=len(pairs)))
             dst_rthread._qsubmit(job, 0)
 
         if error_messages.keys():
-            msg = _("Error importing memories:") + "\r\n"
-            for num, msgs in error_messages.items():
-                msg += "%s: %s" % (num, ",".join(msgs))
-            common.show_error(msg)
+            common.show_error(_error_message(error_messages))
 
         return i
 
@@ -296,6 +365,7 @@ class ImportDialog(gtk.Dialog):
                                      gobject.TYPE_STRING,   # Comment
                                      gobject.TYPE_BOOLEAN,
                                      gobject.TYPE_STRING)
+        self.__index = common.RowIndex(self.__store, self.col_nloc)
         self.__view = gtk.TreeView(self.__store)
         self.__view.show()
 
@@ -503,62 +573,58 @@ class ImportDialog(gtk.Dialog):
         self.vbox.pack_start(self.make_view(), 1, 1, 1)
         self.vbox.pack_start(self.make_controls(), 0, 0, 0)
 
-    def record_use_of(self, number):
-        lo, hi = self.dst_radio.get_features().memory_bounds
+        self.__progress = gtk.ProgressBar()
+        self.__progress.set_text(_("Preparing memory list..."))
+        self.vbox.pack_start(self.__progress, 0, 0, 0)
+
+    def _location_in_use(self, number):
+        lo, hi = self.__dst_bounds
 
         if number < lo or number > hi:
-            return
+            return False
 
         try:
-            mem = self.dst_radio.get_memory(number)
-            if mem and not mem.empty and number not in self.used_list:
-                self.used_list.append(number)
+            with self.__dst_lock:
+                mem = self.dst_radio.get_memory(number)
+            return bool(mem and not mem.empty)
         except errors.InvalidMemoryLocation:
             LOG.error("Location %i empty or at limit of destination radio" %
                       number)
         except errors.InvalidDataError, e:
             LOG.error("Got error from radio, assuming %i beyond limits: %s" %
                       (number, e))
+        return False
 
-    def populate_list(self):
-        start, end = self.src_radio.get_features().memory_bounds
-        for i in range(start, end+1):
-            if end > 50 and i % (end/50) == 0:
-                self.ww.set(float(i) / end)
-            try:
-                mem = self.src_radio.get_memory(i)
-            except errors.InvalidMemoryLocation, e:
-                continue
-            except Exception, e:
+    def record_use_of(self, number):
+        if number not in self.used_list and self._location_in_use(number):
+            self.used_list.add(number)
+
+    def _add_candidates(self, candidates, used, fraction):
+        if self.__stop.is_set():
+            return
+
+        for candidate in candidates:
+            self.__candidates[candidate.number] = candidate
+            if candidate.error is not None:
                 self.__store.append(row=(False,
-                                         i,
-                                         i,
+                                         candidate.number,
+                                         candidate.number,
                                          "ERROR",
                                          chirp_common.format_freq(0),
                                          "",
                                          False,
-                                         str(e),
+                                         candidate.error,
                                          ))
-                self.record_use_of(i)
-                continue
-            if mem.empty:
                 continue
 
-            self.ww.set(float(i) / end)
-            try:
-                msgs = self.dst_radio.validate_memory(
-                        import_logic.import_mem(self.dst_radio,
-                                                self.src_radio.get_features(),
-                                                mem))
-            except import_logic.DestNotCompatible:
-                msgs = self.dst_radio.validate_memory(mem)
+            mem = candidate.src_mem
+            msgs = candidate.msgs
             errs = [x for x in msgs
                     if isinstance(x, chirp_common.ValidationError)]
             if errs:
                 msg = _("Cannot be imported because") + ":\r\n"
                 msg += ",".join(errs)
             else:
-                errs = []
                 msg = "Memory can be imported into target"
 
             self.__store.append(row=(not bool(msgs),
@@ -570,7 +636,53 @@ class ImportDialog(gtk.Dialog):
                                      not bool(errs),
                                      msg
                                      ))
-            self.record_use_of(mem.number)
+
+        self.used_list.update(used)
+        self.__progress.set_fraction(fraction)
+
+    def _populate_done(self, error):
+        self.__progress.hide()
+        self.set_response_sensitive(gtk.RESPONSE_OK, True)
+        if error and not self.__stop.is_set():
+            common.show_error(_("Unable to read all memories: "
+                                "{error}").format(error=error), self)
+
+    def _populate(self):
+        start, end = self.src_radio.get_features().memory_bounds
+        error = None
+        try:
+            for batch in import_logic.iter_import_candidates(
+                    self.dst_radio, self.src_radio, POPULATE_BATCH):
+                if self.__stop.is_set():
+                    break
+                # The destination thread is locked while we are open, so
+                # its radio is ours to read
+                used = [c.number for c in batch
+                        if self._location_in_use(c.number)]
+                fraction = float(batch[-1].number - start + 1) / \
+                    (end - start + 1)
+                gobject.idle_add(self._add_candidates, batch, used, fraction)
+        except Exception, e:
+            LOG.exception("Failed to prepare memory list")
+            error = e
+        gobject.idle_add(self._populate_done, error)
+
+    def populate_list(self):
+        """Start reading and converting the source memories in the
+        background. The rows are added as they are ready, and the
+        action button is enabled once they all are."""
+        self.set_response_sensitive(gtk.RESPONSE_OK, False)
+        self.__progress.show()
+        self.__thread = threading.Thread(target=self._populate)
+        self.__thread.setDaemon(True)
+        self.__thread.start()
+
+    def _stop_populate(self, dialog, response):
+        if response != gtk.RESPONSE_OK:
+            self.__stop.set()
+        if self.__thread:
+            self.__thread.join()
+            self.__thread = None
 
     TITLE = _("Import From File")
     ACTION = _("Import")
@@ -621,21 +733,21 @@ class ImportDialog(gtk.Dialog):
 
         self.src_radio = src_radio
         self.dst_radio = dst_radio
+        self.__dst_bounds = dst_radio.get_features().memory_bounds
 
-        self.used_list = []
-        self.not_used_list = []
+        self.used_list = set()
+        self.__candidates = {}
+        self.__thread = None
+        self.__stop = threading.Event()
+        # Locations are checked from both the list and the populate thread
+        self.__dst_lock = threading.Lock()
 
         self.build_ui()
         self.set_default_size(600, 400)
-
-        self.ww = WaitWindow(_("Preparing memory list..."), parent=parent)
-        self.ww.show()
-        self.ww.grind()
+        self.connect("response", self._stop_populate)
 
         self.populate_list()
 
-        self.ww.hide()
-
 
 class ExportDialog(ImportDialog):
     TITLE = _("Export To File")
@@ -28,13 +28,14 @@ import gobject
 import sys
 
 from chirp.ui import inputdialog, common
-from chirp import platform, directory, util
+from chirp import platform, directory, diff
 from chirp.drivers import generic_csv, repeaterbook
 from chirp.drivers import ic9x, kenwood_live, idrp, vx7, vx5, vx6
 from chirp.drivers import icf, ic9x_icf
-from chirp import CHIRP_VERSION, chirp_common, detect, errors
+from chirp import CHIRP_VERSION, chirp_common, detect, errors, probecache
+from chirp import autosave
 from chirp.ui import editorset, clone, miscwidgets, config, reporting, fips
-from chirp.ui import bandplans
+from chirp.ui import bandplans, catalogdialog, fleetdialog, statsdialog
 
 gobject.threads_init()
 
@@ -115,7 +116,7 @@ class ChirpMain(gtk.Window):
         for i in ["save", "saveas"]:
             set_action_sensitive(i, save_sens)
 
-        for i in ["upload"]:
+        for i in ["upload", "fleetupload"]:
             set_action_sensitive(i, upload_sens)
 
         for i in ["cancelq"]:
@@ -124,7 +125,7 @@ class ChirpMain(gtk.Window):
         for i in ["export", "close", "columns", "irbook", "irfinder",
                   "move_up", "move_dn", "exchange", "iradioreference",
                   "cut", "copy", "paste", "delete", "viewdeveloper",
-                  "all", "properties"]:
+                  "all", "properties", "undo", "redo"]:
             set_action_sensitive(i, eset is not None)
 
     def ev_status(self, editorset, msg):
@@ -231,8 +232,8 @@ class ChirpMain(gtk.Window):
 
         def _show_diff(mem_b, mem_a):
             # Step 3: Show the diff
-            diff = common.simple_diff(mem_a, mem_b)
-            common.show_diff_blob(diffwintitle, diff)
+            result = common.simple_diff(mem_a, mem_b)
+            common.show_diff_blob(diffwintitle, result)
 
         def _get_mem_b(mem_a):
             # Step 2: Get memory b
@@ -250,21 +251,29 @@ class ChirpMain(gtk.Window):
         elif isinstance(eset_a.rthread.radio, chirp_common.CloneModeRadio) and\
                 isinstance(eset_b.rthread.radio, chirp_common.CloneModeRadio):
             # Diff whole (can do this without a job, since both are clone-mode)
+            addrfmt = None
             try:
                 addrfmt = CONF.get('hexdump_addrfmt', section='developer',
                                    raw=True)
             except:
                 pass
-            a = util.hexprint(eset_a.rthread.radio._mmap.get_packed(),
-                              addrfmt=addrfmt)
-            b = util.hexprint(eset_b.rthread.radio._mmap.get_packed(),
-                              addrfmt=addrfmt)
+            radio_a = eset_a.rthread.radio
+            radio_b = eset_b.rthread.radio
             if sel_chan_a == -2:
                 diffsonly = True
             else:
                 diffsonly = False
-            common.show_diff_blob(diffwintitle,
-                                  common.simple_diff(a, b, diffsonly))
+            ranges = diff.compare(radio_a._mmap, radio_b._mmap)
+            result = diff.hexdiff(radio_a._mmap, radio_b._mmap, diffsonly,
+                                  addrfmt=addrfmt, ranges=ranges)
+            memobj = getattr(radio_a, "_memobj", None)
+            if ranges and memobj is not None and \
+                    radio_a.__class__ == radio_b.__class__:
+                changes = diff.compare_fields(memobj, radio_a._mmap,
+                                              radio_b._mmap, ranges=ranges)
+                result = diff.format_fields(changes) + os.linesep + \
+                    os.linesep + result
+            common.show_diff_blob(diffwintitle, result)
         else:
             common.show_error("Cannot diff whole live-mode radios!")
 
@@ -447,6 +456,46 @@ of file.
             if not CONF.get_bool("live_mode", "noconfirm"):
                 self.do_live_warning(radio)
 
+    def do_recover(self):
+        """Offer to recover the changes logged by a session that did not
+        close normally"""
+        paths = autosave.find_logs(platform.get_platform().autosave_dir())
+        if not paths:
+            return False
+
+        names = [autosave.read_log(path)[0]["filename"] or _("Untitled")
+                 for path in paths]
+        msg = _("CHIRP did not close normally. Recover the unsaved "
+                "changes to these images?") + os.linesep * 2 + \
+            os.linesep.join(names)
+        if not common.ask_yesno_question(msg, self):
+            for path in paths:
+                os.remove(path)
+            return False
+
+        for path in paths:
+            try:
+                radio, header = autosave.recover(path)
+                eset = editorset.EditorSet(
+                    radio, self,
+                    tempname=header["filename"] or _("Recovered") + ".img")
+            except Exception, e:
+                common.log_exception()
+                common.show_error(
+                    _("Unable to recover {file}: {error}").format(
+                        file=autosave.read_log(path)[0]["filename"],
+                        error=e), self)
+                # Keep it out of the way, but don't throw it away
+                os.rename(path, path + ".failed")
+                continue
+
+            self._connect_editorset(eset)
+            eset.show()
+            self.tabs.append_page(eset, eset.get_tab_label())
+            os.remove(path)
+
+        return False
+
     def do_save(self, eset=None):
         if not eset:
             eset = self.get_current_editorset()
@@ -823,6 +872,32 @@ of file.
         ct = clone.CloneThread(radio, "out", cb=self.cb_cloneout, parent=self)
         ct.start()
 
+    def do_catalog(self):
+        d = catalogdialog.CatalogDialog(open_fn=self.do_open, parent=self)
+        d.connect("response", lambda d, r: d.destroy())
+        d.show()
+
+    def do_show_stats(self):
+        # Drivers are only timed from the first time anyone looks
+        directory.instrument_drivers()
+        d = statsdialog.StatsDialog(parent=self)
+        d.show()
+
+    def do_fleet_upload(self):
+        radio = self.get_current_editorset().radio
+
+        if isinstance(radio, chirp_common.ExperimentalRadio) and \
+                not self._confirm_experimental(radio.__class__):
+            # User does not want to proceed with experimental driver
+            return
+
+        # The same instructions apply to every radio in the fleet
+        self._show_instructions(radio, radio.get_prompts().pre_upload)
+
+        d = fleetdialog.FleetDialog(radio, parent=self)
+        d.run()
+        d.destroy()
+
     def do_close(self, tab_child=None):
         if tab_child:
             eset = tab_child
@@ -1813,6 +1888,10 @@ of file.
             self.do_saveas()
         elif action.startswith("download"):
             self.do_download(*args)
+        elif action == "catalog":
+            self.do_catalog()
+        elif action == "fleetupload":
+            self.do_fleet_upload()
         elif action.startswith("upload"):
             self.do_upload(*args)
         elif action == "close":
@@ -1861,12 +1940,18 @@ of file.
             self.do_toggle_clone_information(_action)
         elif action == "clone_instructions":
             self.do_toggle_clone_instructions(_action)
+        elif action == "undo":
+            self.get_current_editorset().undo()
+        elif action == "redo":
+            self.get_current_editorset().redo()
         elif action in ["cut", "copy", "paste", "delete",
                         "move_up", "move_dn", "exchange", "all",
                         "devshowraw", "devdiffraw", "properties"]:
             self.get_current_editorset().get_current_editor().hotkey(_action)
         elif action == "devdifftab":
             self.do_diff_radio()
+        elif action == "devstats":
+            self.do_show_stats()
         elif action == "language":
             self.do_change_language()
         elif action == "loadmod":
@@ -1888,6 +1973,7 @@ of file.
         <separator/>
         <menuitem action="clearrecent"/>
       </menu>
+      <menuitem action="catalog"/>
       <menuitem action="save"/>
       <menuitem action="saveas"/>
       <menuitem action="loadmod"/>
@@ -1899,6 +1985,9 @@ of file.
       <menuitem action="quit"/>
     </menu>
     <menu action="edit">
+      <menuitem action="undo"/>
+      <menuitem action="redo"/>
+      <separator/>
       <menuitem action="cut"/>
       <menuitem action="copy"/>
       <menuitem action="paste"/>
@@ -1920,12 +2009,14 @@ of file.
         <menuitem action="devshowraw"/>
         <menuitem action="devdiffraw"/>
         <menuitem action="devdifftab"/>
+        <menuitem action="devstats"/>
       </menu>
       <menuitem action="language"/>
     </menu>
     <menu action="radio" name="radio">
       <menuitem action="download"/>
       <menuitem action="upload"/>
+      <menuitem action="fleetupload"/>
       <menu action="importsrc" name="importsrc">
         <menuitem action="idmrmarc"/>
         <menu action="iradioref" name="iradioref">
@@ -1982,6 +2073,8 @@ of file.
             ('open', gtk.STOCK_OPEN, None, None, None, self.mh),
             ('openstock', None, _("Open Stock Config"), None, None, self.mh),
             ('recent', None, _("Open _Recent"), None, None, self.mh),
+            ('catalog', None, _("Search Image Catalog..."), None, None,
+             self.mh),
             ('clearrecent', None, _("Clear Recently Opened"), None, None,
              self.mh),
             ('save', gtk.STOCK_SAVE, None, None, None, self.mh),
@@ -1990,6 +2083,9 @@ of file.
             ('close', gtk.STOCK_CLOSE, None, None, None, self.mh),
             ('quit', gtk.STOCK_QUIT, None, None, None, self.mh),
             ('edit', None, _("_Edit"), None, None, self.mh),
+            ('undo', gtk.STOCK_UNDO, None, "%sz" % CTRL_KEY, None, self.mh),
+            ('redo', gtk.STOCK_REDO, None,
+             "%s<Shift>z" % CTRL_KEY, None, self.mh),
             ('cut', None, _("_Cut"), "%sx" % CTRL_KEY, None, self.mh),
             ('copy', None, _("_Copy"), "%sc" % CTRL_KEY, None, self.mh),
             ('paste', None, _("_Paste"),
@@ -2012,12 +2108,15 @@ of file.
              "%s<Shift>d" % CTRL_KEY, None, self.mh),
             ('devdifftab', None, _("Diff Tabs"),
              "%s<Shift>t" % CTRL_KEY, None, self.mh),
+            ('devstats', None, _("Show Statistics"), None, None, self.mh),
             ('language', None, _("Change Language"), None, None, self.mh),
             ('radio', None, _("_Radio"), None, None, self.mh),
             ('download', None, _("Download From Radio"),
              "%sd" % ALT_KEY, None, self.mh),
             ('upload', None, _("Upload To Radio"),
              "%su" % ALT_KEY, None, self.mh),
+            ('fleetupload', None, _("Upload To Several Radios..."),
+             None, None, self.mh),
             ('import', None, _("Import"), "%si" % ALT_KEY, None, self.mh),
             ('export', None, _("Export"), "%se" % ALT_KEY, None, self.mh),
             ('importsrc', None, _("Import From Data Source"),
@@ -2261,6 +2360,12 @@ of file.
     def __init__(self, *args, **kwargs):
         gtk.Window.__init__(self, *args, **kwargs)
 
+        # Remember which probe found a radio on each port between runs
+        probecache.set_store(config.get("detect"))
+
+        # Reopened and identical images skip detection and layout parsing
+        chirp_common.enable_image_cache()
+
         def expose(window, event):
             allocation = window.get_allocation()
             CONF.set_int("window_w", allocation.width, "state")
@@ -2347,3 +2452,5 @@ of file.
 
         if not CONF.get_bool("skip_update_check", "state"):
             reporting.check_for_updates(updates_callback)
+
+        gobject.idle_add(self.do_recover)
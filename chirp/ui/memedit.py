@@ -15,6 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import threading
+import time
 
 import gtk
 import pango
@@ -31,7 +32,8 @@ import logging
 
 from chirp.ui import common, shiftdialog, miscwidgets, config, memdetail
 from chirp.ui import bandplans
-from chirp import chirp_common, errors, directory, import_logic
+from chirp import chirp_common, errors, directory, import_logic, memops
+from chirp import stats
 
 LOG = logging.getLogger(__name__)
 
@@ -60,6 +62,84 @@ def iter_prev(store, iter):
     return store.get_iter((row - 1,))
 
 
+class MoveMemoriesJob(common.RadioJob):
+    """Move the memories at @locations (in row order) one row up (@delta
+    of -1) or down (1), with the one pushed off the end of the run moved
+    to the other end. Delivers the memories now at @locations."""
+
+    def __init__(self, cb, locations, delta):
+        common.RadioJob.__init__(self, cb, "shift_memories", locations, delta)
+
+    def _move(self, locations, delta):
+        radio = self.target
+        if delta < 0:
+            moving, spare, dest = locations[1:], locations[0], locations[-1]
+        else:
+            moving, spare, dest = locations[:-1], locations[-1], locations[0]
+
+        victim = radio.get_memory(spare)
+        if locations[-1] - locations[0] == len(locations) - 1:
+            radio.shift_memories(moving[0], moving[-1], delta)
+        else:
+            # Empty memories are hidden between the rows, so move each
+            # one to the location of its neighbor
+            position = dict((n, i) for i, n in enumerate(locations))
+            mems = [radio.get_memory(n) for n in moving]
+            for mem in mems:
+                mem.number = locations[position[mem.number] + delta]
+            radio.set_memories(mems)
+
+        victim.number = dest
+        radio.set_memories([victim])
+
+        return [radio.get_memory(n) for n in locations]
+
+    def execute(self, radio):
+        if self.target is None:
+            self.target = radio
+        return self._execute(self.target, self._move)
+
+
+class ApplyFieldsJob(common.RadioJob):
+    """Copy @fields from @src_memory to each of the memories at @locations
+    with @copy_field(src, dst, field), and store them all at once.
+    Delivers the updated memories."""
+
+    def __init__(self, cb, copy_field, src_memory, fields, locations):
+        common.RadioJob.__init__(self, cb, "set_memories", src_memory,
+                                 fields, locations)
+        self.__copy_field = copy_field
+
+    def _apply(self, src_memory, fields, locations):
+        mems = [self.target.get_memory(n) for n in locations]
+        for mem in mems:
+            for field in fields:
+                self.__copy_field(src_memory, mem, field)
+        self.target.set_memories(mems)
+        return mems
+
+    def execute(self, radio):
+        if self.target is None:
+            self.target = radio
+        return self._execute(self.target, self._apply)
+
+
+class ArrangeMemoriesJob(common.RadioJob):
+    """Sort, de-duplicate or compact the memories at @lo through @hi with
+    memops.rearrange() and @kwargs. Delivers the changed locations."""
+
+    def __init__(self, cb, lo, hi, **kwargs):
+        common.RadioJob.__init__(self, cb, "move_memories", lo, hi, **kwargs)
+
+    def _arrange(self, lo, hi, **kwargs):
+        return memops.rearrange(self.target, lo, hi, **kwargs)
+
+    def execute(self, radio):
+        if self.target is None:
+            self.target = radio
+        return self._execute(self.target, self._arrange)
+
+
 class MemoryEditor(common.Editor):
     cols = [
         (_("Loc"),            TYPE_INT,      gtk.CellRendererText,),
@@ -540,10 +620,9 @@ class MemoryEditor(common.Editor):
     def _delete_rows_and_shift(self, paths, all=False):
         iter = self.store.get_iter(paths[0])
         starting_loc, = self.store.get(iter, self.col(_("Loc")))
-        for i in range(0, len(paths)):
-            sd = shiftdialog.ShiftDialog(self.rthread)
-            sd.delete(starting_loc, quiet=True, all=all)
-            sd.destroy()
+        sd = shiftdialog.ShiftDialog(self.rthread)
+        sd.delete(starting_loc, quiet=True, all=all, count=len(paths))
+        sd.destroy()
 
         self.prefill()
         return True  # We changed memories
@@ -551,99 +630,45 @@ class MemoryEditor(common.Editor):
     def _move_up_down(self, paths, action):
         if action.endswith("up"):
             delta = -1
-            donor_path = paths[-1]
             victim_path = paths[0]
         else:
             delta = 1
-            donor_path = paths[0]
             victim_path = paths[-1]
 
         try:
             victim_path = (victim_path[0] + delta,)
             if victim_path[0] < 0:
                 raise ValueError()
-            donor_loc = self.store.get(self.store.get_iter(donor_path),
-                                       self.col(_("Loc")))[0]
-            victim_loc = self.store.get(self.store.get_iter(victim_path),
-                                        self.col(_("Loc")))[0]
+            self.store.get_iter(victim_path)
         except ValueError:
             self.emit("usermsg", "No room to %s" % (action.replace("_", " ")))
             return False  # No change
 
-        class Context:
-            pass
-        ctx = Context()
-
-        ctx.victim_mem = None
-        ctx.donor_loc = donor_loc
-        ctx.done_count = 0
-        ctx.path_count = len(paths)
-
-        # Steps:
-        # 1. Grab the victim (the one that will need to be saved and moved
-        #    from the front to the back or back to the front) and save it
-        # 2. Grab each memory along the way, storing it in the +delta
-        #    destination location after we get it
-        # 3. If we're the final move, then schedule storing the victim
-        #    in the hole we created
-
-        def update_selection():
+        if delta < 0:
+            rows = [victim_path] + list(paths)
+        else:
+            rows = list(paths) + [victim_path]
+        locations = [self.store.get(self.store.get_iter(path),
+                                    self.col(_("Loc")))[0]
+                     for path in rows]
+
+        def moved(mems):
+            if isinstance(mems, Exception):
+                common.show_error(str(mems))
+                self.prefill()
+                return
+            for mem in mems:
+                self.set_memory(mem)
             sel = self.view.get_selection()
             sel.unselect_all()
             for path in paths:
-                gobject.idle_add(sel.select_path, (path[0]+delta,))
-
-        def save_victim(mem, ctx):
-            ctx.victim_mem = mem
+                sel.select_path((path[0] + delta,))
 
-        def store_victim(mem, dest):
-            old = mem.number
-            mem.number = dest
-            job = common.RadioJob(None, "set_memory", mem)
-            job.set_desc(
-                _("Moving memory from {old} to {new}").format(old=old,
-                                                              new=dest))
-            self.rthread.submit(job)
-            self._set_memory(self.store.get_iter(donor_path), mem)
-            update_selection()
-
-        def move_mem(mem, delta, ctx, iter):
-            old = mem.number
-            mem.number += delta
-            job = common.RadioJob(None, "set_memory", mem)
-            job.set_desc(
-                _("Moving memory from {old} to {new}").format(old=old,
-                                                              new=old+delta))
-            self.rthread.submit(job)
-            self._set_memory(iter, mem)
-            ctx.done_count += 1
-            if ctx.done_count == ctx.path_count:
-                store_victim(ctx.victim_mem, ctx.donor_loc)
-
-        job = common.RadioJob(lambda m: save_victim(m, ctx),
-                              "get_memory", victim_loc)
-        job.set_desc(_("Getting memory {number}").format(number=victim_loc))
+        job = MoveMemoriesJob(moved, locations, delta)
+        job.set_desc(_("Moving memories {first}-{last}").format(
+            first=locations[0], last=locations[-1]))
         self.rthread.submit(job)
 
-        for i in range(len(paths)):
-            path = paths[i]
-            if delta > 0:
-                dest = i+1
-            else:
-                dest = i-1
-
-            if dest < 0 or dest >= len(paths):
-                dest = victim_path
-            else:
-                dest = paths[dest]
-
-            iter = self.store.get_iter(path)
-            loc, = self.store.get(iter, self.col(_("Loc")))
-            job = common.RadioJob(move_mem, "get_memory", loc)
-            job.set_cb_args(delta, ctx, self.store.get_iter(dest))
-            job.set_desc("Getting memory %i" % loc)
-            self.rthread.submit(job)
-
         return True  # We (scheduled some) change to the memories
 
     def _exchange_memories(self, paths):
@@ -680,6 +705,27 @@ class MemoryEditor(common.Editor):
         # We (scheduled some) change to the memories
         return True
 
+    def _arrange_memories(self, selected, **kwargs):
+        lo, hi = self._features.memory_bounds
+        if len(selected) > 1:
+            lo = max(lo, min(selected))
+            hi = min(hi, max(selected))
+
+        def arranged(result):
+            if isinstance(result, Exception):
+                common.show_error(str(result))
+            else:
+                self.emit("usermsg", _("Changed {count} memories").format(
+                    count=len(result)))
+            self.prefill()
+
+        job = ArrangeMemoriesJob(arranged, lo, hi, **kwargs)
+        job.set_desc(_("Arranging memories {first}-{last}").format(
+            first=lo, last=hi))
+        self.rthread.submit(job)
+
+        return True  # We (scheduled some) change to the memories
+
     def _show_raw(self, cur_pos):
         def idle_show_raw(result):
             gobject.idle_add(common.show_diff_blob,
@@ -732,20 +778,11 @@ class MemoryEditor(common.Editor):
             setattr(dst_memory, field, getattr(src_memory, field))
 
     def _apply_multiple(self, src_memory, fields, locations):
-        for location in locations:
-            def apply_and_set(memory):
-                for field in fields:
-                    self._copy_field(src_memory, memory, field)
-                    cb = (memory.number == locations[-1] and
-                          self._set_memory_cb or None)
-                    job = common.RadioJob(cb, "set_memory", memory)
-                    job.set_desc(_("Writing memory {number}").format(
-                            number=memory.number))
-                    self.rthread.submit(job)
-            job = common.RadioJob(apply_and_set, "get_memory", location)
-            job.set_desc(_("Getting original memory {number}").format(
-                    number=location))
-            self.rthread.submit(job)
+        job = ApplyFieldsJob(self._set_memory_cb, self._copy_field,
+                             src_memory, fields, locations)
+        job.set_desc(_("Writing {count} memories").format(
+            count=len(locations)))
+        self.rthread.submit(job)
 
     def edit_memory(self, memory, locations):
         if len(locations) > 1:
@@ -801,6 +838,14 @@ class MemoryEditor(common.Editor):
             changed = self._move_up_down(paths, action)
         elif action == "exchange":
             changed = self._exchange_memories(paths)
+        elif action == "sort_freq":
+            changed = self._arrange_memories(selected, sort=["freq"])
+        elif action == "sort_name":
+            changed = self._arrange_memories(selected, sort=["name"])
+        elif action == "dedupe":
+            changed = self._arrange_memories(selected, dedupe=True)
+        elif action == "compact":
+            changed = self._arrange_memories(selected, compact=True)
         elif action in ["cut", "copy"]:
             changed = self.copy_selection(action == "cut")
         elif action == "paste":
@@ -860,6 +905,12 @@ class MemoryEditor(common.Editor):
     <menuitem action="move_up"/>
     <menuitem action="move_dn"/>
     <menuitem action="exchange"/>
+    <menu action="arrange">
+      <menuitem action="sort_freq"/>
+      <menuitem action="sort_name"/>
+      <menuitem action="dedupe"/>
+      <menuitem action="compact"/>
+    </menu>
     <separator/>
     <menuitem action="properties"/>
     %s
@@ -885,6 +936,11 @@ class MemoryEditor(common.Editor):
             ("move_up", _("Move up")),
             ("move_dn", _("Move down")),
             ("exchange", _("Exchange memories")),
+            ("arrange", _("Arrange")),
+            ("sort_freq", _("Sort by frequency")),
+            ("sort_name", _("Sort by name")),
+            ("dedupe", _("Remove duplicates")),
+            ("compact", _("Close up empty rows")),
             ("properties", _("P_roperties")),
             ("devshowraw", _("Show Raw Memory")),
             ("devdiffraw", _("Diff Raw Memories")),
@@ -950,6 +1006,7 @@ class MemoryEditor(common.Editor):
     def make_editor(self):
         types = tuple([x[1] for x in self.cols])
         self.store = gtk.ListStore(*types)
+        self._row_index = common.RowIndex(self.store, self.col(_("Loc")))
 
         self.view = gtk.TreeView(self.store)
         self.view.get_selection().set_mode(gtk.SELECTION_MULTIPLE)
@@ -1053,33 +1110,45 @@ class MemoryEditor(common.Editor):
                 _("Internal Error: Column {name} not found").format(
                     name=caption))
 
-    def _prefill(self, num):
-        def handler(mem, number):
+    def _prefill(self, num, batch):
+        def handler(mem, number, batch):
             if not isinstance(mem, Exception):
                 if not mem.empty or self.show_empty:
                     gobject.idle_add(self.set_memory, mem)
             else:
                 mem = chirp_common.Memory(number, True, "Error")
                 gobject.idle_add(self.set_memory, mem)
+            self._prefill_done(batch)
 
         job = common.RadioJob(handler, "get_memory", num)
         job.set_desc(_("Getting memory {number}").format(number=num))
-        job.set_cb_args(num)
+        job.set_cb_args(num, batch)
+        job.set_tag(self._prefill_tag)
         self.rthread.submit(job, 2)
 
+    def _prefill_done(self, batch):
+        # @batch is [start time, memories still to come] of one prefill
+        batch[1] -= 1
+        if batch[1] == 0 and batch is self._prefill_batch:
+            stats.add_time("gui.prefill", time.time() - batch[0])
+
     def prefill(self):
+        # Anything still queued from the last prefill is out of date now
+        self.rthread.cancel(self._prefill_tag)
         self.store.clear()
+        self._row_index.clear()
         self._rows_in_store = 0
 
         lo = int(self.lo_limit_adj.get_value())
         hi = int(self.hi_limit_adj.get_value())
 
-        for i in range(lo, hi+1):
-            self._prefill(i)
-
+        numbers = range(lo, hi+1)
         if self.show_special:
-            for i in self._features.valid_special_chans:
-                self._prefill(i)
+            numbers += list(self._features.valid_special_chans)
+
+        self._prefill_batch = [time.time(), len(numbers)]
+        for i in numbers:
+            self._prefill(i, self._prefill_batch)
 
     def _restore(self, iter, vals):
         for col, val in enumerate(vals):
@@ -1111,33 +1180,24 @@ class MemoryEditor(common.Editor):
         self.store.set(iter, self.col("_hide_cols"), hide)
 
     def set_memory(self, memory):
-        iter = self.store.get_iter_first()
-
-        while iter is not None:
-            loc, = self.store.get(iter, self.col(_("Loc")))
-            if loc == memory.number:
-                return self._set_memory(iter, memory)
-
-            iter = self.store.iter_next(iter)
+        iter = self._row_index.find(memory.number)
+        if iter is not None:
+            return self._set_memory(iter, memory)
 
         iter = self.store.append()
         self._rows_in_store += 1
         self._set_memory(iter, memory)
 
     def clear_memory(self, number):
-        iter = self.store.get_iter_first()
-        while iter:
-            loc, = self.store.get(iter, self.col(_("Loc")))
-            if loc == number:
-                LOG.debug("Deleting %i" % number)
-                # FIXME: Make the actual remove happen on callback
-                self.store.remove(iter)
-                job = common.RadioJob(None, "erase_memory", number)
-                job.set_desc(
-                    _("Erasing memory {number}").format(number=number))
-                self.rthread.submit()
-                break
-            iter = self.store.iter_next(iter)
+        iter = self._row_index.find(number)
+        if iter is not None:
+            LOG.debug("Deleting %i" % number)
+            # FIXME: Make the actual remove happen on callback
+            self.store.remove(iter)
+            job = common.RadioJob(None, "erase_memory", number)
+            job.set_desc(
+                _("Erasing memory {number}").format(number=number))
+            self.rthread.submit(job)
 
     def _set_mem_vals(self, mem, vals, iter):
         power_levels = {"": None}
@@ -1353,6 +1413,8 @@ class MemoryEditor(common.Editor):
 
         self.need_refresh = False
         self._in_editing = False
+        self._prefill_tag = object()
+        self._prefill_batch = None
 
         self.lo_limit_adj = self.hi_limit_adj = None
         self.store = self.view = None
@@ -1454,6 +1516,7 @@ class MemoryEditor(common.Editor):
         iter = store.get_iter(paths[0])
 
         always = False
+        pasted = []
 
         try:
             src_features, mem_list = pickle.loads(text)
@@ -1535,10 +1598,12 @@ class MemoryEditor(common.Editor):
 
             self._set_memory(iter, mem)
             iter = store.iter_next(iter)
+            pasted.append(mem)
 
-            job = common.RadioJob(self._set_memory_cb, "set_memory", mem)
-            job.set_desc(
-                _("Writing memory {number}").format(number=mem.number))
+        if pasted:
+            job = common.RadioJob(self._set_memory_cb, "set_memories", pasted)
+            job.set_desc(_("Writing {count} memories").format(
+                count=len(pasted)))
             self.rthread.submit(job)
 
     def paste_selection(self):
@@ -1556,6 +1621,10 @@ class MemoryEditor(common.Editor):
     def other_editor_changed(self, target_editor):
         self.need_refresh = True
 
+    def radio_changed(self):
+        self.prefill()
+        self.need_refresh = False
+
 
 class DstarMemoryEditor(MemoryEditor):
     def _get_cols_to_hide(self, iter):
@@ -68,11 +68,28 @@ class SettingsEditor(common.Editor):
 
         self._changed = False
         self._settings = None
+        # Tabs whose widgets have not been built yet, by notebook page
+        self._unbuilt_tabs = {}
+        features = self.rthread.radio.get_features()
+        self._changed_only = features.can_set_changed_only
 
+        self._load_settings()
+
+    def _load_settings(self):
         job = common.RadioJob(self._get_settings_cb, "get_settings")
         job.set_desc("Getting radio settings")
         self.rthread.submit(job)
 
+    def radio_changed(self):
+        # The settings objects hold the old values, so start over
+        self._settings = None
+        self._changed = False
+        self._unbuilt_tabs = {}
+        self._store.clear()
+        while self._notebook.get_n_pages():
+            self._notebook.remove_page(-1)
+        self._load_settings()
+
     def _save_settings(self):
         if self._settings is None:
             return
@@ -84,8 +101,14 @@ class SettingsEditor(common.Editor):
                 self.emit("changed")
                 self._changed = False
 
-        job = common.RadioJob(setting_cb, "set_settings",
-                              self._settings)
+        if self._changed_only:
+            # Only the settings touched since the last save are applied
+            # (and marked unchanged) by the radio
+            job = common.RadioJob(setting_cb, "set_settings",
+                                  self._settings, changed_only=True)
+        else:
+            job = common.RadioJob(setting_cb, "set_settings",
+                                  self._settings)
         job.set_desc("Setting radio settings")
         self.rthread.submit(job)
 
@@ -123,6 +146,10 @@ class SettingsEditor(common.Editor):
         # Notebook tab
         tab = self._notebook.append_page(sw, gtk.Label(_(group.get_name())))
 
+        return tab, sw
+
+    def _build_ui_table(self, group, sw):
+
         # Settings table
         table = gtk.Table(len(group), 2, False)
         table.set_resize_mode(gtk.RESIZE_IMMEDIATE)
@@ -203,14 +230,23 @@ class SettingsEditor(common.Editor):
 
             row += 1
 
-        return tab
-
     def _build_ui_group(self, group, parent):
-        tab = self._build_ui_tab(group)
+        tab, sw = self._build_ui_tab(group)
 
         iter = self._store.append(parent)
         self._store.set(iter, 0, group.get_shortname(), 1, tab)
 
+        # The widgets are built when the tab is first shown
+        self._unbuilt_tabs[tab] = (group, sw, iter)
+
+        if isinstance(group, settings.LazyRadioSettingGroup) and \
+                not group.is_populated():
+            # Subgroups are not known until the group has been built
+            return
+
+        self._build_ui_subgroups(group, iter)
+
+    def _build_ui_subgroups(self, group, iter):
         for element in group:
             if not isinstance(element, settings.RadioSetting):
                 self._build_ui_group(element, iter)
@@ -224,11 +260,42 @@ class SettingsEditor(common.Editor):
         for group in settings:
             self._build_ui_group(group, None)
         self._view.expand_all()
+        self._view.get_selection().select_path((0,))
 
     def _get_settings_cb(self, settings):
         gobject.idle_add(self._build_ui, settings)
 
+    def _group_populated_cb(self, result, group, sw, iter):
+        if isinstance(result, Exception):
+            common.show_error(_("Error reading settings: %s") % result)
+            return
+
+        self._build_ui_table(group, sw)
+        self._build_ui_subgroups(group, iter)
+        self._view.expand_row(self._store.get_path(iter), True)
+
+    def _show_tab(self, tab):
+        try:
+            group, sw, iter = self._unbuilt_tabs.pop(tab)
+        except KeyError:
+            return
+
+        if isinstance(group, settings.LazyRadioSettingGroup) and \
+                not group.is_populated():
+            # Let the radio thread build the group, since that reads from
+            # the radio's memory
+            job = common.RadioJob(self._group_populated_cb, "populate")
+            job.set_target(group)
+            job.set_cb_args(group, sw, iter)
+            job.set_desc("Getting radio settings")
+            self.rthread.submit(job)
+        else:
+            self._build_ui_table(group, sw)
+
     def _view_changed_cb(self, selection):
         (lst, iter) = selection.get_selected()
+        if iter is None:
+            return
         tab, = self._store.get(iter, 1)
         self._notebook.set_current_page(tab)
+        self._show_tab(tab)
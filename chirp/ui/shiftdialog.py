@@ -19,7 +19,7 @@ import gobject
 import threading
 import logging
 
-from chirp import errors, chirp_common
+from chirp import errors, chirp_common, memops
 
 LOG = logging.getLogger(__name__)
 
@@ -56,24 +56,17 @@ class ShiftDialog(gtk.Dialog):
         gobject.idle_add(self._status, msg, prog)
 
     def _shift_memories(self, delta, memories):
-        count = 0.0
-        for i in memories:
-            src = i.number
-            dst = src + delta
+        lo = memories[0].number
+        hi = memories[-1].number
 
-            LOG.info("Moving %i to %i" % (src, dst))
-            self.status(_("Moving {src} to {dst}").format(src=src,
-                                                          dst=dst),
-                        count / len(memories))
+        LOG.info("Moving %i-%i by %i" % (lo, hi, delta))
+        self.status(_("Moving {src} to {dst}").format(
+            src="%i-%i" % (lo, hi), dst="%i-%i" % (lo + delta, hi + delta)),
+            0)
 
-            i.number = dst
-            if i.empty:
-                self.rthread.radio.erase_memory(i.number)
-            else:
-                self.rthread.radio.set_memory(i)
-            count += 1.0
+        self.rthread.radio.shift_memories(lo, hi, delta)
 
-        return int(count)
+        return len(memories)
 
     def _get_mems_until_hole(self, start, endokay=False, all=False):
         mems = []
@@ -103,26 +96,27 @@ class ShiftDialog(gtk.Dialog):
 
     def _insert_hole(self, start):
         mems = self._get_mems_until_hole(start)
-        mems.reverse()
         if mems:
-            ret = self._shift_memories(1, mems)
-            if ret:
-                # Clear the hole we made
-                self.rthread.radio.erase_memory(start)
-            return ret
+            # This also clears the hole we made
+            return self._shift_memories(1, mems)
         else:
             LOG.warn("No memory list?")
             return 0
 
-    def _delete_hole(self, start, all=False):
-        mems = self._get_mems_until_hole(start+1, endokay=True, all=all)
+    def _delete_hole(self, start, all=False, count=1):
+        mems = self._get_mems_until_hole(start + count, endokay=True, all=all)
         if mems:
-            count = self._shift_memories(-1, mems)
-            self.rthread.radio.erase_memory(count+start)
-            return count
-        else:
-            LOG.warn("No memory list?")
-            return 0
+            LOG.info("Moving %i-%i by %i" % (mems[0].number, mems[-1].number,
+                                             -count))
+            self.status(_("Moving {src} to {dst}").format(
+                src="%i-%i" % (mems[0].number, mems[-1].number),
+                dst="%i-%i" % (start, start + len(mems) - 1)), 0)
+        # Fewer memories may follow than are deleted, so those deleted
+        # that nothing moves into are erased too
+        moves = memops.plan_delete(start, count,
+                                   [mem.number for mem in mems])
+        self.rthread.radio.move_memories(moves)
+        return len(mems)
 
     def finished(self):
         if self.quiet:
@@ -154,9 +148,10 @@ class ShiftDialog(gtk.Dialog):
         self.thread.start()
         gtk.Dialog.run(self)
 
-    def delete(self, newhole, quiet=False, all=False):
+    def delete(self, newhole, quiet=False, all=False, count=1):
         self.quiet = quiet
         self.thread = threading.Thread(target=self.threadfn,
-                                       args=(newhole, self._delete_hole, all))
+                                       args=(newhole, self._delete_hole, all,
+                                             count))
         self.thread.start()
         gtk.Dialog.run(self)
@@ -0,0 +1,141 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import gtk
+import gobject
+
+from chirp import platform, stats
+
+LOG = logging.getLogger(__name__)
+
+# Seconds between updates while the dialog is open
+REFRESH_INTERVAL = 1
+
+RESPONSE_RESET = 1
+RESPONSE_SAVE = 2
+
+
+class StatsDialog(gtk.Dialog):
+    """Shows the timers, counters and clone transfers in chirp.stats,
+    updated while the dialog is open"""
+
+    def __init__(self, parent=None):
+        gtk.Dialog.__init__(self, _("Statistics"),
+                            parent=parent,
+                            buttons=(_("Reset"), RESPONSE_RESET,
+                                     gtk.STOCK_SAVE, RESPONSE_SAVE,
+                                     gtk.STOCK_CLOSE, gtk.RESPONSE_CLOSE))
+        self.set_default_size(640, 480)
+        self._make_ui()
+        self.connect("response", self._response)
+        self._refresh()
+        self._timer = gobject.timeout_add_seconds(REFRESH_INTERVAL,
+                                                  self._refresh)
+        self.connect("destroy", lambda w: gobject.source_remove(self._timer))
+
+    def _make_view(self, columns):
+        """Return a store and a scrolled view of it with @columns, a list
+        of (title, format). The first column is text, and the rest are
+        numbers shown with their format."""
+        store = gtk.ListStore(gobject.TYPE_STRING,
+                              *([gobject.TYPE_DOUBLE] * (len(columns) - 1)))
+        view = gtk.TreeView(store)
+        for i, (title, fmt) in enumerate(columns):
+            rend = gtk.CellRendererText()
+            if i:
+                rend.set_property("xalign", 1.0)
+                col = gtk.TreeViewColumn(title, rend)
+                col.set_cell_data_func(rend, self._render, (i, fmt))
+            else:
+                col = gtk.TreeViewColumn(title, rend, text=i)
+            col.set_sort_column_id(i)
+            col.set_resizable(True)
+            view.append_column(col)
+        sw = gtk.ScrolledWindow()
+        sw.set_policy(gtk.POLICY_AUTOMATIC, gtk.POLICY_AUTOMATIC)
+        sw.add(view)
+        sw.show_all()
+        return store, sw
+
+    def _render(self, col, rend, model, iter, data):
+        column, fmt = data
+        rend.set_property("text", fmt % model.get_value(iter, column))
+
+    def _make_ui(self):
+        notebook = gtk.Notebook()
+
+        self._timers, sw = self._make_view(
+            [(_("Name"), None), (_("Calls"), "%i"), (_("Total (ms)"), "%.2f"),
+             (_("Mean (ms)"), "%.2f"), (_("Max (ms)"), "%.2f")])
+        notebook.append_page(sw, gtk.Label(_("Timers")))
+
+        self._counters, sw = self._make_view(
+            [(_("Name"), None), (_("Count"), "%i")])
+        notebook.append_page(sw, gtk.Label(_("Counters")))
+
+        self._transfers, sw = self._make_view(
+            [(_("Clone"), None), (_("Seconds"), "%.1f"), (_("Bytes"), "%i"),
+             (_("Bytes/s"), "%.0f"), (_("Idle (s)"), "%.1f")])
+        notebook.append_page(sw, gtk.Label(_("Clones")))
+
+        notebook.show()
+        self.vbox.pack_start(notebook, 1, 1, 1)
+
+    def _refresh(self):
+        snapshot = stats.snapshot()
+
+        self._timers.clear()
+        for name, timer in sorted(snapshot["timers"].items()):
+            self._timers.append([name, timer["calls"],
+                                 timer["total"] * 1000, timer["mean"] * 1000,
+                                 timer["max"] * 1000])
+
+        self._counters.clear()
+        for name, value in sorted(snapshot["counters"].items()):
+            self._counters.append([name, value])
+
+        self._transfers.clear()
+        for summary in reversed(snapshot["transfers"]):
+            self._transfers.append([
+                "%s (%s)" % (summary["radio"], summary["direction"]),
+                summary["seconds"],
+                summary["bytes_read"] + summary["bytes_written"],
+                summary["bytes_per_second"],
+                summary["idle_seconds"]])
+
+        return True
+
+    def _save(self):
+        fname = platform.get_platform().gui_save_file(
+            default_name="chirp_stats",
+            types=[(_("JSON Files") + " (*.json)", "json")])
+        if not fname:
+            return
+        try:
+            with open(fname, "w") as f:
+                stats.dump(f)
+        except IOError, e:
+            LOG.error("Unable to save statistics to %s: %s" % (fname, e))
+
+    def _response(self, dialog, response):
+        if response == RESPONSE_RESET:
+            stats.reset()
+            self._refresh()
+        elif response == RESPONSE_SAVE:
+            self._save()
+        else:
+            self.destroy()
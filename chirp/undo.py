@@ -0,0 +1,263 @@
+# Copyright 2026 agent <agent@local>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""An undo and redo history of the changes made to a radio
+
+Each change is recorded as a delta, not as a copy of the radio: for
+radios with a memory map, the bytes a change overwrote and the bytes it
+wrote in their place; for other radios (live radios and CSV files), the
+memories a change touched as they were before and after. Undoing or
+redoing a change writes back just those, so it costs as much as the
+change did, no matter how big the image is.
+"""
+
+import logging
+
+from chirp import chirp_common, memmap
+
+LOG = logging.getLogger(__name__)
+
+
+def _get_mmap(device):
+    try:
+        mmap = device.get_mmap()
+    except AttributeError:
+        return None
+    if isinstance(mmap, memmap.MemoryMap):
+        return mmap
+    return None
+
+
+def _put_memory(device, memory):
+    if memory.empty:
+        device.erase_memory(memory.number)
+    else:
+        device.set_memory(memory)
+
+
+class Change(object):
+    """The changes made to a radio by one operation described by @desc"""
+
+    def __init__(self, desc):
+        self.desc = desc
+        # {id(mmap): (mmap, {offset: old byte})}
+        self._old_bytes = {}
+        # {(id(device), number): (device, old memory)}
+        self._old_memories = {}
+        # {(id(device), number): new memory}, for the writes that worked
+        self._new_memories = {}
+        # (mmap, offset, old bytes, new bytes) for each run of changed
+        # bytes, and (device, old memory, new memory), once finished
+        self.ranges = []
+        self.memories = []
+
+    def __str__(self):
+        return self.desc
+
+    def record_bytes(self, mmap, pos, old):
+        """Note that the bytes @old at @pos in @mmap are about to be
+        overwritten. Only the first write to each byte is kept."""
+        saved = self._old_bytes.setdefault(id(mmap), (mmap, {}))[1]
+        for i, byte in enumerate(old):
+            saved.setdefault(pos + i, byte)
+
+    def record_memory(self, device, number):
+        """Note that memory @number of @device is about to be changed"""
+        key = (id(device), number)
+        if key in self._old_memories:
+            return
+        try:
+            self._old_memories[key] = (device,
+                                       device.get_memory(number).dupe())
+        except Exception, e:
+            LOG.warning("Unable to record memory %s for undo: %s" %
+                        (number, e))
+
+    def record_new_memory(self, device, number, memory):
+        """Note that memory @number of @device is now @memory"""
+        key = (id(device), number)
+        if key in self._old_memories:
+            self._new_memories[key] = memory
+
+    def finish(self):
+        """Work out what the change did, now that it is done"""
+        for mmap, saved in self._old_bytes.values():
+            # Bytes written with the value they already had are left out
+            runs = []
+            for pos in sorted(saved):
+                if mmap.get(pos) == saved[pos]:
+                    continue
+                if runs and pos == runs[-1][0] + len(runs[-1][1]):
+                    runs[-1][1] += saved[pos]
+                else:
+                    runs.append([pos, saved[pos]])
+            for pos, old in runs:
+                self.ranges.append((mmap, pos, old, mmap.get(pos, len(old))))
+
+        for key, (device, old) in sorted(self._old_memories.items()):
+            new = self._new_memories.get(key)
+            if new is None:
+                # The write failed, so only the radio knows what it left
+                new = device.get_memory(key[1]).dupe()
+            self.memories.append((device, old, new))
+
+        self._old_bytes = self._old_memories = self._new_memories = None
+
+    def size(self):
+        """Return the number of bytes and memories changed"""
+        return (sum(len(old) for mmap, pos, old, new in self.ranges) +
+                len(self.memories))
+
+    def undo(self):
+        for mmap, pos, old, new in reversed(self.ranges):
+            mmap.set(pos, old)
+        for device, old, new in reversed(self.memories):
+            _put_memory(device, old)
+
+    def redo(self):
+        for mmap, pos, old, new in self.ranges:
+            mmap.set(pos, new)
+        for device, old, new in self.memories:
+            _put_memory(device, new)
+
+
+class Journal(object):
+    """The undo history of @radio, keeping the last @depth changes.
+
+    Changes are recorded between begin() and end(). Radios with a
+    memory map report each write to it; for the others, set_memory()
+    and erase_memory() are wrapped to note the memory they change.
+    Changes made outside of begin() and end() are not recorded, and
+    leave the history in a state that can not be undone correctly, so
+    everything that changes the radio should be done in a transaction.
+    """
+
+    def __init__(self, radio, depth=100):
+        self._devices = []
+        self._depth = depth
+        self._undo = []
+        self._redo = []
+        self._current = None
+        self._attached = []
+        self._dirty = []
+        self.watch(radio)
+
+    def watch(self, device):
+        """Also record the changes made to @device, a sub-device of the
+        radio"""
+        self._devices.append(device)
+        if _get_mmap(device) is None:
+            self._wrap(device, "set_memory", lambda memory: memory.number,
+                       lambda memory: memory.dupe())
+            self._wrap(device, "erase_memory", lambda number: number,
+                       lambda number: chirp_common.Memory(number,
+                                                          empty=True))
+
+    def _wrap(self, device, name, number_fn, new_fn):
+        # The memory is read before it is changed, but what it is
+        # changed to is taken from the call, not read back
+        method = getattr(device, name)
+
+        def wrapper(arg, *args, **kwargs):
+            change = self._current
+            if change is None:
+                return method(arg, *args, **kwargs)
+            number = number_fn(arg)
+            change.record_memory(device, number)
+            result = method(arg, *args, **kwargs)
+            change.record_new_memory(device, number, new_fn(arg))
+            return result
+
+        setattr(device, name, wrapper)
+
+    def record(self, mmap, pos, old):
+        """Called by a MemoryMap before @old at @pos is overwritten"""
+        self._current.record_bytes(mmap, pos, old)
+
+    def begin(self, desc):
+        """Start recording a change described by @desc"""
+        if self._current is not None:
+            raise Exception("Change %s is already being recorded" %
+                            self._current)
+        self._current = Change(desc)
+        for device in self._devices:
+            mmap = _get_mmap(device)
+            if mmap is not None and mmap not in self._attached:
+                mmap.set_journal(self)
+                self._attached.append(mmap)
+
+    def end(self):
+        """Stop recording, and keep the change if it changed anything"""
+        change, self._current = self._current, None
+        for mmap in self._attached:
+            mmap.set_journal(None)
+        self._attached = []
+
+        try:
+            change.finish()
+        except Exception, e:
+            # Called as the change's work ends, maybe with an error of
+            # its own that this must not hide
+            LOG.error("Unable to record %s for undo: %s" % (change, e))
+            return
+        if not change.size():
+            return
+        LOG.debug("Recorded %s (%i)" % (change, change.size()))
+        self._mark_dirty(change)
+        self._undo.append(change)
+        del self._undo[:-self._depth]
+        self._redo = []
+
+    def _mark_dirty(self, change):
+        self._dirty.extend((mmap, pos, len(new))
+                           for mmap, pos, old, new in change.ranges)
+
+    def take_dirty(self):
+        """Return a (mmap, pos, length) for each run of bytes changed,
+        undone or redone since the last call"""
+        dirty, self._dirty = self._dirty, []
+        return dirty
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """Undo the last change and return it, or None if there is none"""
+        if not self._undo:
+            return None
+        change = self._undo.pop()
+        change.undo()
+        self._mark_dirty(change)
+        self._redo.append(change)
+        return change
+
+    def redo(self):
+        """Redo the last undone change and return it, or None if there is
+        none"""
+        if not self._redo:
+            return None
+        change = self._redo.pop()
+        change.redo()
+        self._mark_dirty(change)
+        self._undo.append(change)
+        return change
+
+    def clear(self):
+        """Forget all changes, for example after the radio is reloaded"""
+        self._undo = []
+        self._redo = []
@@ -16,8 +16,9 @@
 import struct
 
 
-def hexprint(data, addrfmt=None):
-    """Return a hexdump-like encoding of @data"""
+def hexprint(data, addrfmt=None, offset=0):
+    """Return a hexdump-like encoding of @data, with addresses starting
+    at @offset"""
     if addrfmt is None:
         addrfmt = '%(addr)03i'
 
@@ -32,7 +33,7 @@ def hexprint(data, addrfmt=None):
     out = ""
 
     for block in range(0, (len(data)/block_size)):
-        addr = block * block_size
+        addr = offset + block * block_size
         try:
             out += addrfmt % locals()
         except (OverflowError, ValueError, TypeError, KeyError):